@@ -2,13 +2,46 @@
 Competitor Analysis API Module
 Provides endpoints for competitor analysis and comparisons.
 """
+import time
 from flask import Blueprint, request, jsonify
 from utils.dataforseo_client import DataForSEOClient
+from utils.projection import projected, CompetitorRow, IntersectionRow
+from utils.keyword_intersection import extract_ranked_rows, intersect_domains
+from utils.gap_matrix import CATEGORIES, GapMatrix, get_cached_matrix, sort_and_filter_items
+from utils import deadlines
+from utils.fan_out import DEFAULT_KEY_TIMEOUT, batch_status, fan_out, parse_options
 
 bp = Blueprint('competitor_analysis', __name__)
 client = DataForSEOClient()
 
+MAX_GAP_COMPETITORS = 20
+# ranked_keywords/live returns at most this many keywords per task
+MAX_RANKED_KEYWORDS = 1000
+MAX_COMMON_KEYWORDS = 10000
+
+def apply_item_order(response, data):
+    """
+    Sort and filter the items of a fetched response when requested.
+
+    The response may be the object held by the response cache, so tasks and
+    results are copied rather than changed in place.
+    """
+    if not data.get('sort_by') and not data.get('filters') or not isinstance(response, dict):
+        return response
+    tasks = []
+    for task in response.get('tasks') or []:
+        results = []
+        for result in task.get('result') or []:
+            if result.get('items'):
+                result = dict(result, items=sort_and_filter_items(
+                    result['items'], data.get('sort_by'), data.get('order', 'desc'), data.get('filters')
+                ))
+            results.append(result)
+        tasks.append(dict(task, result=results) if task.get('result') else task)
+    return dict(response, tasks=tasks)
+
 @bp.route('/competitors', methods=['POST'])
+@projected(CompetitorRow)
 def get_competitors():
     """Get list of competitors for a domain"""
     data = request.get_json()
@@ -20,9 +53,10 @@ def get_competitors():
     limit = data.get('limit', 10)
     
     response = client.get_competitors(domain, location, limit)
-    return jsonify(response)
+    return response
 
 @bp.route('/gap-analysis', methods=['POST'])
+@projected(IntersectionRow)
 def gap_analysis():
     """Compare two domains for keyword gaps using DataForSEO Labs"""
     data = request.get_json()
@@ -35,66 +69,182 @@ def gap_analysis():
     limit = data.get('limit', 100)
     
     response = client.get_domain_intersection(domain1, domain2, location, limit)
-    return jsonify(response)
+    try:
+        response = apply_item_order(response, data)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    return response
+
+@bp.route('/gap-matrix', methods=['POST'])
+def gap_matrix():
+    """Classify a target's keywords against up to 20 competitors, ranked by opportunity"""
+    data = request.get_json()
+    if not data or 'target' not in data or not data.get('competitors'):
+        return jsonify({"error": "Target and at least one competitor are required"}), 400
+    
+    target = data['target']
+    competitors = [domain for domain in dict.fromkeys(data['competitors']) if domain != target]
+    if len(competitors) > MAX_GAP_COMPETITORS:
+        return jsonify({"error": f"At most {MAX_GAP_COMPETITORS} competitors are supported"}), 400
+    location = data.get('location', 'United States')
+    try:
+        keyword_limit = max(1, min(int(data.get('keyword_limit', 1000)), MAX_RANKED_KEYWORDS))
+    except (ValueError, TypeError):
+        return jsonify({"error": "keyword_limit must be an integer"}), 400
+    category = data.get('category')
+    if category is not None and category not in CATEGORIES:
+        return jsonify({"error": f"category must be one of {', '.join(CATEGORIES)}"}), 400
+    
+    errors = {}
+    
+    def build():
+        results = client.get_ranked_keywords_many([target] + competitors, location, keyword_limit)
+        domain_rows = {}
+        for domain in [target] + competitors:
+            response = results[domain]
+            task = (response.get('tasks') or [{}])[0]
+            if response.get('status_code') != 20000 or task.get('status_code') != 20000:
+                errors[domain] = task.get('status_message') or response.get('status_message')
+                continue
+            domain_rows[domain] = extract_ranked_rows(response)
+        if target not in domain_rows or len(domain_rows) < 2:
+            return None, False
+        # Competitors that failed are left out; such a partial matrix is not cached
+        matrix = GapMatrix(target, [domain for domain in competitors if domain in domain_rows], domain_rows)
+        return matrix, not errors
+    
+    # Re-sorting, re-filtering or paging the same analysis reuses the built matrix
+    matrix = get_cached_matrix((target, tuple(competitors), location, keyword_limit), build)
+    if matrix is None:
+        return jsonify({"error": "Could not fetch keywords for the target and a competitor", "errors": errors}), 502
+    
+    try:
+        indices, total = matrix.select(
+            category=category,
+            filters=data.get('filters'),
+            sort_by=data.get('sort_by', 'opportunity'),
+            order=data.get('order', 'desc'),
+            offset=data.get('offset', 0),
+            limit=data.get('limit', 100)
+        )
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "domains": matrix.domains,
+        "keyword_count": len(matrix.keywords),
+        "summary": matrix.summary(),
+        "total": total,
+        "keywords": matrix.rows(indices),
+        "errors": errors
+    })
 
 @bp.route('/common-keywords', methods=['POST'])
 def common_keywords():
-    """Get keywords that both domains rank for"""
+    """Get keywords that all (or at least min_domains of) the domains rank for"""
     data = request.get_json()
     if not data or 'domains' not in data or len(data['domains']) < 2:
         return jsonify({"error": "At least two domains are required"}), 400
     
-    domains = data['domains']
+    domains = list(dict.fromkeys(data['domains']))
     location = data.get('location', 'United States')
+    try:
+        keyword_limit = max(1, min(int(data.get('keyword_limit', 1000)), MAX_RANKED_KEYWORDS))
+        min_domains = int(data['min_domains']) if data.get('min_domains') is not None else None
+        limit = max(1, min(int(data.get('limit', 1000)), MAX_COMMON_KEYWORDS))
+    except (ValueError, TypeError):
+        return jsonify({"error": "keyword_limit, min_domains and limit must be integers"}), 400
     
-    # We'll need to get keywords for each domain and then find the intersection
-    results = {}
+    # Ranked keywords for every domain are fetched together, then intersected here
+    results = client.get_ranked_keywords_many(domains, location, keyword_limit)
     
+    domain_rows = {}
+    errors = {}
     for domain in domains:
-        response = client.get_ranked_keywords(domain, location, 1000)
-        results[domain] = response
+        response = results[domain]
+        task = (response.get('tasks') or [{}])[0]
+        if response.get('status_code') != 20000 or task.get('status_code') != 20000:
+            errors[domain] = task.get('status_message') or response.get('status_message')
+            continue
+        domain_rows[domain] = extract_ranked_rows(response)
     
-    return jsonify({"domains": results})
+    if len(domain_rows) < 2:
+        return jsonify({"error": "Could not fetch keywords for at least two domains", "errors": errors}), 502
+    
+    intersection = intersect_domains(domain_rows, min_domains, limit)
+    intersection["errors"] = errors
+    return jsonify(intersection)
 
 @bp.route('/competitor-backlinks', methods=['POST'])
 def competitor_backlinks():
-    """Compare backlink profiles of competitors"""
+    """
+    Compare backlink profiles of competitors
+    
+    backlinks/overview/live takes up to 100 tasks per POST, so every domain
+    goes out in one batched request rather than one call per domain. The
+    request's timeout therefore bounds the batch as a whole: when it runs
+    out, every domain not already answered from the cache is reported with
+    status "timeout", instead of only the slowest one as with fan-out routes.
+    """
     data = request.get_json()
     if not data or 'domains' not in data:
         return jsonify({"error": "At least one domain is required"}), 400
     
     domains = data['domains']
     limit = data.get('limit', 10)
+    try:
+        _, timeout = parse_options(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    results = {}
+    # Run the batch under the requested timeout, never past the request deadline
+    timeout = timeout if timeout is not None else DEFAULT_KEY_TIMEOUT
+    request_deadline = deadlines.current()
+    if request_deadline is not None:
+        timeout = min(timeout, request_deadline - time.monotonic())
+    started = time.monotonic()
+    token = deadlines.start(timeout)
+    try:
+        results = client.get_backlinks_many(list(dict.fromkeys(domains)), limit)
+    finally:
+        deadlines.reset(token)
+    status = batch_status(results, time.monotonic() - started)
     
-    for domain in domains:
-        response = client.get_backlinks(domain, limit)
-        results[domain] = response
-    
-    return jsonify({"domains": results})
+    return jsonify({"domains": results, "status": status})
 
 @bp.route('/domain-comparison', methods=['POST'])
 def domain_comparison():
-    """Compare two domains"""
-    data = request.get_json()
-    if not data or 'domain1' not in data or 'domain2' not in data:
-        return jsonify({"error": "Both domains are required"}), 400
+    """Compare two or more domains"""
+    data = request.get_json() or {}
+    domains = list(data.get('domains') or [])
+    if 'domain1' in data and 'domain2' in data:
+        domains = [data['domain1'], data['domain2']] + domains
+    domains = list(dict.fromkeys(domains))
+    if len(domains) < 2:
+        return jsonify({"error": "At least two domains are required"}), 400
     
-    domain1 = data['domain1']
-    domain2 = data['domain2']
     location = data.get('location', 'United States')
+    try:
+        max_workers, timeout = parse_options(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    # Get domain analytics for both domains
-    domain1_data = client.get_domain_analytics(domain1, location)
-    domain2_data = client.get_domain_analytics(domain2, location)
+    # Get domain analytics for every domain concurrently
+    results, status = fan_out(
+        lambda domain: client.get_domain_analytics(domain, location),
+        domains,
+        max_workers=max_workers,
+        timeout=timeout
+    )
     
-    return jsonify({
-        "domain1": domain1_data,
-        "domain2": domain2_data
-    })
+    response = {"domains": results, "status": status}
+    if 'domain1' in data and 'domain2' in data:
+        response["domain1"] = results[data['domain1']]
+        response["domain2"] = results[data['domain2']]
+    return jsonify(response)
 
 @bp.route('/keyword-overlap', methods=['POST'])
+@projected(IntersectionRow)
 def keyword_overlap():
     """Find keyword overlap between two domains"""
     data = request.get_json()
@@ -108,4 +258,8 @@ def keyword_overlap():
     
     # Use domain intersection to find common keywords
     response = client.get_domain_intersection(domain1, domain2, location, limit)
-    return jsonify(response)
\ No newline at end of file
+    try:
+        response = apply_item_order(response, data)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    return response
\ No newline at end of file
@@ -4,11 +4,13 @@ Provides endpoints for domain analytics and insights.
 """
 from flask import Blueprint, request, jsonify
 from utils.dataforseo_client import DataForSEOClient
+from utils.projection import projected, BacklinkSummaryRow, CompetitorRow, DomainOverviewRow, RankedKeywordRow
 
 bp = Blueprint('domain_analytics', __name__)
 client = DataForSEOClient()
 
 @bp.route('/overview', methods=['POST'])
+@projected(DomainOverviewRow)
 def domain_overview():
     """Get domain overview data"""
     data = request.get_json()
@@ -20,9 +22,10 @@ def domain_overview():
     limit = data.get('limit', 10)
     
     response = client.get_domain_analytics(domain, location, limit)
-    return jsonify(response)
+    return response
 
 @bp.route('/backlinks', methods=['POST'])
+@projected(BacklinkSummaryRow)
 def backlinks():
     """Get domain backlinks data"""
     data = request.get_json()
@@ -34,7 +37,7 @@ def backlinks():
     target_type = data.get('target_type', 'domain')
     
     response = client.get_backlinks(target, limit, target_type)
-    return jsonify(response)
+    return response
 
 @bp.route('/traffic', methods=['POST'])
 def traffic_analytics():
@@ -50,6 +53,7 @@ def traffic_analytics():
     return jsonify(response)
 
 @bp.route('/keywords', methods=['POST'])
+@projected(RankedKeywordRow)
 def domain_keywords():
     """Get domain ranking keywords using DataForSEO Labs"""
     data = request.get_json()
@@ -61,9 +65,10 @@ def domain_keywords():
     limit = data.get('limit', 100)
     
     response = client.get_ranked_keywords(domain, location, limit)
-    return jsonify(response)
+    return response
 
 @bp.route('/competitors', methods=['POST'])
+@projected(CompetitorRow)
 def domain_competitors():
     """Get competitors for a domain"""
     data = request.get_json()
@@ -75,4 +80,4 @@ def domain_competitors():
     limit = data.get('limit', 10)
     
     response = client.get_domain_competitors(domain, location, limit)
-    return jsonify(response)
+    return response
@@ -2,10 +2,25 @@
 Keyword Research API Module
 Provides endpoints for keyword research, suggestions, and analysis.
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, url_for
+from concurrent.futures import ThreadPoolExecutor
 from utils.dataforseo_client import DataForSEOClient
-import os
-import openai
+from utils.projection import projected, DifficultyRow, KeywordRow, RelatedKeywordRow, SearchVolumeRow
+from utils.keyword_chunking import dedupe_keywords
+from utils.keyword_facets import classify_items, DEFAULT_LONG_TAIL_WORDS
+from utils.opportunity_scoring import OpportunityTable
+from utils.keyword_crawler import KeywordCrawler, DEFAULT_MAX_COST, SOURCES as EXPANSION_SOURCES
+from utils.jobs import JobCancelled, get_default_registry
+from utils.serp_clustering import (
+    fetch_url_sets, cluster_url_sets, METHODS as CLUSTER_METHODS,
+    DEFAULT_TOP_N, DEFAULT_THRESHOLD, DEFAULT_NUM_PERM, DEFAULT_MIN_CLUSTER_SIZE, MAX_NUM_PERM
+)
+from utils.keyword_join import (
+    index_search_volume, index_difficulty, index_overview, index_serp_features,
+    join_keyword_rows, source_status
+)
+from utils.ai_keywords import llm_configured, generate_keyword_suggestions, suggest_with_metrics
+from utils import deadlines
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -14,10 +29,41 @@ load_dotenv()
 bp = Blueprint('keyword_research', __name__)
 client = DataForSEOClient()
 
-# Initialize OpenAI API
-openai_api_key = os.environ.get('OPENAI_API_KEY')
+MAX_EXPAND_KEYWORDS = 100000
+MAX_EXPAND_CONCURRENCY = 16
+MAX_EXPAND_DEPTH = 10
+MAX_EXPAND_PER_KEYWORD_LIMIT = 1000
+MAX_CLUSTER_KEYWORDS = 50000
+MAX_CLUSTER_TOP_N = 100
+# Clusters per streamed event
+CLUSTER_EVENT_SIZE = 500
+MAX_OPPORTUNITY_PAGE = 1000
+# keyword_ideas/live returns at most this many keywords per task
+MAX_KEYWORD_IDEAS = 1000
+MAX_LONG_TAIL_WORDS = 10
+# /analyze runs one billed live SERP per keyword for SERP features
+MAX_SERP_FEATURES_KEYWORDS = 100
+
+def job_response(job_id, stream):
+    """
+    Point the caller at a job's status and stream URLs (202), or stream its
+    events as NDJSON when the caller asked for it. Streaming holds a worker
+    for the whole job, so it is opt-in.
+    """
+    if stream:
+        return Response(
+            get_default_registry().stream(job_id),
+            mimetype='application/x-ndjson',
+            headers={'X-Job-Id': job_id}
+        )
+    return jsonify({
+        "job_id": job_id,
+        "status_url": url_for('keyword_research.job_status', job_id=job_id),
+        "stream_url": url_for('keyword_research.job_stream', job_id=job_id)
+    }), 202
 
 @bp.route('/search-volume', methods=['POST'])
+@projected(SearchVolumeRow)
 def search_volume():
     """Get search volume data for a list of keywords"""
     data = request.get_json()
@@ -29,9 +75,10 @@ def search_volume():
     language = data.get('language', 'English')
     
     response = client.get_search_volume(keywords, location, language)
-    return jsonify(response)
+    return response
 
 @bp.route('/suggestions', methods=['POST'])
+@projected(KeywordRow)
 def suggestions():
     """Get keyword suggestions for a seed keyword"""
     data = request.get_json()
@@ -43,9 +90,10 @@ def suggestions():
     language = data.get('language', 'English')
     
     response = client.get_keyword_suggestions(keyword, location, language)
-    return jsonify(response)
+    return response
 
 @bp.route('/ideas', methods=['POST'])
+@projected(KeywordRow)
 def keyword_ideas():
     """Get keyword ideas for a seed keyword"""
     data = request.get_json()
@@ -58,9 +106,104 @@ def keyword_ideas():
     limit = data.get('limit', 100)
     
     response = client.get_keyword_ideas(keyword, location, language, limit)
-    return jsonify(response)
+    return response
+
+@bp.route('/explore', methods=['POST'])
+def explore():
+    """Get keyword ideas for a seed once, with question, long-tail and commercial facets derived locally"""
+    data = request.get_json()
+    if not data or 'keyword' not in data:
+        return jsonify({"error": "Keyword is required"}), 400
+    
+    keyword = data['keyword']
+    location = data.get('location', 'United States')
+    language = data.get('language', 'English')
+    try:
+        limit = max(1, min(int(data.get('limit', 1000)), MAX_KEYWORD_IDEAS))
+        facet_limit = max(0, int(data['facet_limit'])) if data.get('facet_limit') is not None else None
+        long_tail_words = max(1, min(int(data.get('long_tail_words', DEFAULT_LONG_TAIL_WORDS)), MAX_LONG_TAIL_WORDS))
+    except (ValueError, TypeError):
+        return jsonify({"error": "limit, facet_limit and long_tail_words must be integers"}), 400
+    
+    # One broad fetch; smaller /ideas requests for the same seed are then
+    # answered from the cached response
+    response = client.get_keyword_ideas(keyword, location, language, limit)
+    task = (response.get('tasks') or [{}])[0]
+    if response.get('status_code') != 20000 or task.get('status_code') != 20000:
+        return jsonify({
+            "error": task.get('status_message') or response.get('status_message'),
+            "status_code": task.get('status_code', response.get('status_code'))
+        }), 502
+    
+    items = ((task.get('result') or [{}])[0] or {}).get('items') or []
+    tagged, facets, counts = classify_items(items, long_tail_words, facet_limit)
+    
+    return jsonify({
+        "seed": keyword,
+        "total": len(tagged),
+        "counts": counts,
+        "facets": facets,
+        "items": tagged,
+        "cost": response.get('cost')
+    })
+
+@bp.route('/opportunities', methods=['POST'])
+def opportunities():
+    """Score keywords server-side and return one page of the ranking with segment counts"""
+    data = request.get_json()
+    if not data or not (data.get('items') or data.get('keywords') or data.get('keyword')):
+        return jsonify({"error": "Keyword rows, keywords or a seed keyword are required"}), 400
+    
+    try:
+        offset = max(0, int(data.get('offset', 0)))
+        limit = max(1, min(int(data.get('limit', 50)), MAX_OPPORTUNITY_PAGE))
+        ideas_limit = max(1, min(int(data.get('ideas_limit', 1000)), MAX_KEYWORD_IDEAS))
+    except (ValueError, TypeError):
+        return jsonify({"error": "offset, limit and ideas_limit must be integers"}), 400
+    location = data.get('location', 'United States')
+    language = data.get('language', 'English')
+    cost = 0
+    if data.get('items'):
+        items = data['items']
+    else:
+        # Seed: score its keyword ideas; keyword list: score its overview rows
+        if data.get('keywords'):
+            response = client.get_keyword_overview(dedupe_keywords(data['keywords']), location, language)
+        else:
+            response = client.get_keyword_ideas(data['keyword'], location, language, ideas_limit)
+        task = (response.get('tasks') or [{}])[0]
+        if response.get('status_code') != 20000 or task.get('status_code') != 20000:
+            return jsonify({
+                "error": task.get('status_message') or response.get('status_message'),
+                "status_code": task.get('status_code', response.get('status_code'))
+            }), 502
+        items = [
+            item for task in response.get('tasks') or [] if task.get('status_code') == 20000
+            for result in task.get('result') or [] for item in (result or {}).get('items') or []
+        ]
+        cost = response.get('cost')
+    
+    table = OpportunityTable(items)
+    try:
+        table.score(data.get('weights'))
+        mask = table.mask(data.get('filters'))
+        page = table.select(mask, data.get('sort_by', 'opportunity_score'), data.get('order', 'desc'), offset, limit)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "total": len(table),
+        "matching": int(mask.sum()),
+        "aggregates": table.aggregates(mask),
+        "weights": table.weights,
+        "offset": offset,
+        "limit": limit,
+        "keywords": table.rows(page),
+        "cost": cost
+    })
 
 @bp.route('/overview', methods=['POST'])
+@projected(KeywordRow)
 def keyword_overview():
     """Get comprehensive keyword overview data"""
     data = request.get_json()
@@ -72,9 +215,10 @@ def keyword_overview():
     language = data.get('language', 'English')
     
     response = client.get_keyword_overview(keywords, location, language)
-    return jsonify(response)
+    return response
 
 @bp.route('/difficulty', methods=['POST'])
+@projected(DifficultyRow)
 def difficulty():
     """Get keyword difficulty data for a list of keywords"""
     data = request.get_json()
@@ -86,34 +230,69 @@ def difficulty():
     language = data.get('language', 'English')
     
     response = client.get_keyword_difficulty(keywords, location, language)
-    return jsonify(response)
+    return response
 
 @bp.route('/analyze', methods=['POST'])
 def analyze():
-    """Comprehensive keyword analysis (combines multiple endpoints)"""
+    """Comprehensive keyword analysis (combines multiple endpoints into one row per keyword)"""
     data = request.get_json()
     if not data or 'keywords' not in data:
         return jsonify({"error": "Keywords are required"}), 400
     
-    keywords = data['keywords']
+    keywords = dedupe_keywords(data['keywords'])
     location = data.get('location', 'United States')
     language = data.get('language', 'English')
+    include_overview = data.get('include_overview', False)
+    include_serp_features = data.get('include_serp_features', False)
+    try:
+        serp_features_limit = max(1, min(int(data.get('serp_features_limit', 20)), MAX_SERP_FEATURES_KEYWORDS))
+    except (ValueError, TypeError):
+        return jsonify({"error": "serp_features_limit must be an integer"}), 400
     
-    # Get search volume
-    volume_response = client.get_search_volume(keywords, location, language)
+    calls = {
+        "search_volume": lambda: client.get_search_volume(keywords, location, language),
+        "difficulty": lambda: client.get_keyword_difficulty(keywords, location, language)
+    }
+    if include_overview:
+        calls["overview"] = lambda: client.get_keyword_overview(keywords, location, language)
+    if include_serp_features:
+        # One live SERP per keyword, so only the first few keywords are looked up
+        calls["serp_features"] = lambda: client.get_serp_data_many(
+            keywords[:serp_features_limit], location, language, depth=10, mode="live"
+        )
     
-    # Get keyword difficulty
-    difficulty_response = client.get_keyword_difficulty(keywords, location, language)
+    # All sources are fetched concurrently, then joined by keyword
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        futures = {name: pool.submit(deadlines.bind(call)) for name, call in calls.items()}
+    responses = {name: future.result() for name, future in futures.items()}
     
-    # Combine results
-    results = {
-        "search_volume": volume_response,
-        "difficulty": difficulty_response
+    indexes = [
+        index_search_volume(responses["search_volume"]),
+        index_difficulty(responses["difficulty"])
+    ]
+    sources = {
+        "search_volume": source_status(responses["search_volume"]),
+        "difficulty": source_status(responses["difficulty"])
     }
+    if include_overview:
+        indexes.append(index_overview(responses["overview"]))
+        sources["overview"] = source_status(responses["overview"])
+    if include_serp_features:
+        serp_index = index_serp_features(responses["serp_features"])
+        indexes.append(serp_index)
+        sources["serp_features"] = {
+            "success": bool(serp_index),
+            "keyword_count": len(responses["serp_features"]),
+            "succeeded": len(serp_index)
+        }
     
-    return jsonify(results)
+    return jsonify({
+        "keywords": join_keyword_rows(keywords, indexes),
+        "sources": sources
+    })
 
 @bp.route('/related', methods=['POST'])
+@projected(RelatedKeywordRow)
 def related_keywords():
     """Get related keywords for a seed keyword"""
     data = request.get_json()
@@ -126,9 +305,10 @@ def related_keywords():
     limit = data.get('limit', 50)
     
     response = client.get_related_keywords(keyword, location, language, limit)
-    return jsonify(response)
+    return response
 
 @bp.route('/questions', methods=['POST'])
+@projected(KeywordRow)
 def questions():
     """Get question-based keywords for a seed keyword"""
     data = request.get_json()
@@ -142,9 +322,10 @@ def questions():
     
     # Use keyword ideas with question filter
     response = client.get_keyword_questions(keyword, location, language, limit)
-    return jsonify(response)
+    return response
 
 @bp.route('/long-tail', methods=['POST'])
+@projected(KeywordRow)
 def long_tail():
     """Get long-tail keywords for a seed keyword"""
     data = request.get_json()
@@ -157,7 +338,155 @@ def long_tail():
     limit = data.get('limit', 50)
     
     response = client.get_long_tail_keywords(keyword, location, language, limit)
-    return jsonify(response)
+    return response
+
+@bp.route('/expand', methods=['POST'])
+def expand():
+    """Start a breadth-first keyword expansion crawl from seed keywords"""
+    data = request.get_json()
+    if not data or not (data.get('seeds') or data.get('keyword')):
+        return jsonify({"error": "Seed keywords are required"}), 400
+    
+    seeds = data.get('seeds') or [data['keyword']]
+    sources = data.get('sources', list(EXPANSION_SOURCES))
+    if not sources or any(source not in EXPANSION_SOURCES for source in sources):
+        return jsonify({"error": f"sources must be a subset of {', '.join(EXPANSION_SOURCES)}"}), 400
+    try:
+        max_cost = float(data['max_cost']) if data.get('max_cost') is not None else DEFAULT_MAX_COST
+        concurrency = int(data['concurrency']) if data.get('concurrency') is not None else None
+        max_depth = int(data['max_depth']) if data.get('max_depth') is not None else None
+        max_keywords = int(data['max_keywords']) if data.get('max_keywords') else MAX_EXPAND_KEYWORDS
+        per_keyword_limit = int(data['per_keyword_limit']) if data.get('per_keyword_limit') else None
+    except (TypeError, ValueError):
+        return jsonify({
+            "error": "max_cost, concurrency, max_depth, max_keywords and per_keyword_limit must be numbers"
+        }), 400
+    if not max_cost >= 0:
+        return jsonify({"error": "max_cost must not be negative"}), 400
+    if concurrency is not None and concurrency < 1:
+        return jsonify({"error": "concurrency must be at least 1"}), 400
+    if max_depth is not None and max_depth < 0:
+        return jsonify({"error": "max_depth must not be negative"}), 400
+    params = {
+        "seeds": seeds,
+        "location": data.get('location', 'United States'),
+        "language": data.get('language', 'English'),
+        "max_depth": min(max_depth, MAX_EXPAND_DEPTH) if max_depth is not None else None,
+        "max_keywords": max(1, min(max_keywords, MAX_EXPAND_KEYWORDS)),
+        "max_cost": max_cost,
+        "concurrency": min(concurrency, MAX_EXPAND_CONCURRENCY) if concurrency is not None else None,
+        "per_keyword_limit": max(1, min(per_keyword_limit, MAX_EXPAND_PER_KEYWORD_LIMIT)) if per_keyword_limit else None,
+        "sources": sources
+    }
+    
+    def run(job):
+        crawler = KeywordCrawler(client, **params)
+        summary = crawler.run(
+            lambda rows: job.emit({"type": "keywords", "keywords": rows}),
+            should_stop=job.cancelled,
+            on_progress=lambda progress: job.progress(**progress)
+        )
+        job.progress(**summary)
+        if summary["stop_reason"] == "cancelled":
+            raise JobCancelled()
+        return summary
+    
+    job_id = get_default_registry().start("expand", run, params)
+    if job_id is None:
+        return jsonify({"error": "Too many jobs running, try again later"}), 429
+    return job_response(job_id, data.get('stream', False))
+
+@bp.route('/cluster', methods=['POST'])
+def cluster():
+    """Start a job clustering keywords by the overlap of their top-ranking URLs"""
+    data = request.get_json()
+    if not data or 'keywords' not in data:
+        return jsonify({"error": "Keywords are required"}), 400
+    
+    keywords = dedupe_keywords(data['keywords'])
+    if len(keywords) < 2:
+        return jsonify({"error": "At least two distinct keywords are required"}), 400
+    if len(keywords) > MAX_CLUSTER_KEYWORDS:
+        return jsonify({"error": f"At most {MAX_CLUSTER_KEYWORDS} keywords can be clustered at once"}), 400
+    threshold = data.get('threshold', DEFAULT_THRESHOLD)
+    if not isinstance(threshold, (int, float)) or not 0 < threshold <= 1:
+        return jsonify({"error": "threshold must be a number between 0 and 1"}), 400
+    method = data.get('method', 'pivot')
+    if method not in CLUSTER_METHODS:
+        return jsonify({"error": f"method must be one of {', '.join(CLUSTER_METHODS)}"}), 400
+    mode = data.get('mode', 'queued')
+    if mode not in ('queued', 'live'):
+        return jsonify({"error": "mode must be queued or live"}), 400
+    try:
+        top_n = int(data.get('top_n') or DEFAULT_TOP_N)
+        min_cluster_size = int(data.get('min_cluster_size') or DEFAULT_MIN_CLUSTER_SIZE)
+        num_perm = int(data.get('num_perm') or DEFAULT_NUM_PERM)
+    except (TypeError, ValueError):
+        return jsonify({"error": "top_n, min_cluster_size and num_perm must be integers"}), 400
+    params = {
+        "keyword_count": len(keywords),
+        "location": data.get('location', 'United States'),
+        "language": data.get('language', 'English'),
+        "top_n": max(1, min(top_n, MAX_CLUSTER_TOP_N)),
+        "threshold": threshold,
+        "method": method,
+        "min_cluster_size": max(1, min_cluster_size),
+        "num_perm": max(1, min(num_perm, MAX_NUM_PERM)),
+        "mode": mode
+    }
+    
+    def run(job):
+        job.progress(phase="fetching", fetched=0, total=len(keywords), cost=0)
+        url_sets, failed, cost = fetch_url_sets(
+            client, keywords, params["location"], params["language"], params["top_n"], mode,
+            on_progress=lambda fetched, total, cost: job.progress(
+                phase="fetching", fetched=fetched, total=total, cost=round(cost, 4)
+            ),
+            should_stop=job.cancelled
+        )
+        job.check_cancelled()
+        if failed:
+            job.emit({"type": "failed", "keywords": failed})
+        
+        job.progress(phase="clustering", fetched=len(url_sets), total=len(keywords), cost=round(cost, 4))
+        clusters, stats = cluster_url_sets(
+            url_sets, threshold, method, params["min_cluster_size"], params["num_perm"]
+        )
+        for start in range(0, len(clusters), CLUSTER_EVENT_SIZE):
+            job.emit({"type": "clusters", "clusters": clusters[start:start + CLUSTER_EVENT_SIZE]})
+        
+        summary = dict(stats, failed=len(failed), cost=round(cost, 4))
+        job.progress(phase="done", **summary)
+        return summary
+    
+    job_id = get_default_registry().start("cluster", run, params)
+    if job_id is None:
+        return jsonify({"error": "Too many jobs running, try again later"}), 429
+    return job_response(job_id, data.get('stream', False))
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Get the status, progress and (when finished) result of a background job"""
+    status = get_default_registry().status(job_id, include_result=True)
+    if not status:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(status)
+
+@bp.route('/jobs/<job_id>/stream', methods=['GET'])
+def job_stream(job_id):
+    """Stream a background job's events as NDJSON, resuming after ?after=<seq>"""
+    if not get_default_registry().status(job_id):
+        return jsonify({"error": "Job not found"}), 404
+    after = request.args.get('after', -1, type=int)
+    return Response(get_default_registry().stream(job_id, after), mimetype='application/x-ndjson')
+
+@bp.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a running background job"""
+    registry = get_default_registry()
+    if not registry.status(job_id):
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify({"job_id": job_id, "cancelled": registry.cancel(job_id)})
 
 @bp.route('/ai-suggestions', methods=['POST'])
 def ai_suggestions():
@@ -173,25 +502,25 @@ def ai_suggestions():
     industry = data.get('industry', '')
     
     # Check if OpenAI API key is configured
-    if not openai_api_key:
+    if not llm_configured():
         return jsonify({"error": "OpenAI API key is not configured"}), 500
     
     try:
-        # Get AI-generated keyword suggestions
-        ai_keywords = generate_ai_keyword_suggestions(keyword, industry, limit)
+        # Metric lookups start while the model is still streaming keywords
+        ai_keywords, metrics_response, cached = suggest_with_metrics(
+            client, keyword, industry, limit, location, language
+        )
         
         if len(ai_keywords) == 0:
             return jsonify({"error": "Could not generate keyword suggestions"}), 500
         
-        # Get metrics for the AI-generated keywords
-        metrics_response = client.get_keyword_overview(ai_keywords, location, language)
-        
         # Add source info to differentiate from regular keywords
         result = {
             "source": "ai",
             "seed_keyword": keyword,
             "ai_keywords": ai_keywords,
-            "metrics": metrics_response
+            "metrics": metrics_response,
+            "cached": cached
         }
         
         return jsonify(result)
@@ -210,44 +539,8 @@ def generate_ai_keyword_suggestions(keyword, industry='', limit=15):
     Returns:
         list: List of AI-generated related keywords
     """
-    client = openai.OpenAI(api_key=openai_api_key)
-    
-    industry_context = f" in the {industry} industry" if industry else ""
-    
-    # Prompt with clear instructions to generate diverse but relevant keywords
-    system_prompt = """You are a professional SEO keyword researcher. 
-    Generate semantically related keywords that would be valuable for content creation and SEO.
-    Focus on a mix of:
-    1. Related terms with high search intent
-    2. Questions people might ask about this topic
-    3. Long-tail variations with commercial/informational intent
-    4. Industry-specific terminology
-    
-    Return ONLY a JSON array of strings with no explanation, introduction or other text.
-    Example output format: {"keywords": ["keyword one", "keyword two", "keyword three"...]}
-    """
-    
-    user_prompt = f"Generate {limit} semantically related keywords for '{keyword}'{industry_context}. Make sure they're diverse but relevant."
-
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
-        
-        # Extract the keyword array from the JSON response
-        import json
-        result = json.loads(response.choices[0].message.content)
-        
-        # Return the keywords array, or empty list if not found
-        return result.get("keywords", []) if isinstance(result, dict) and "keywords" in result else []
-        
+        return generate_keyword_suggestions(keyword, industry, limit)
     except Exception as e:
         print(f"Error generating AI keywords: {str(e)}")
         return []
@@ -0,0 +1,168 @@
+"""
+Rank Tracking API Module
+Provides endpoints for rank-tracking projects, their daily checks and
+position history.
+"""
+from flask import Blueprint, request, jsonify, url_for
+from utils.dataforseo_client import DataForSEOClient
+from utils.jobs import get_default_registry
+from utils.rank_store import get_default_rank_store, day_number, day_date
+from utils.rank_scheduler import RankScheduler, SCHEDULER_ENABLED
+
+bp = Blueprint('rank_tracking', __name__)
+client = DataForSEOClient()
+scheduler = RankScheduler(client, get_default_rank_store(), get_default_registry())
+
+MAX_TRACKED_KEYWORDS = 50000
+MAX_DEPTH = 100
+MAX_MOVERS = 500
+
+def start_scheduler():
+    """
+    Start the daily check loop in this process when RANK_TRACKING_SCHEDULER_ENABLED is set
+
+    Called from gunicorn.conf.py's post_worker_init hook and from app.py's
+    __main__, never at import. Every worker may run the loop; checks are
+    claimed through the rank store, so each project is checked once a day.
+    """
+    if SCHEDULER_ENABLED:
+        scheduler.start()
+
+def parse_day(value, default):
+    """Day number from an ISO date query parameter, or default when absent."""
+    return day_number(value) if value else default
+
+@bp.route('/projects', methods=['POST'])
+def create_project():
+    """Register a project: a domain, the keywords to track and where to check them"""
+    data = request.get_json()
+    if not data or not data.get('domain') or not data.get('keywords'):
+        return jsonify({"error": "Domain and keywords are required"}), 400
+    if len(data['keywords']) > MAX_TRACKED_KEYWORDS:
+        return jsonify({"error": f"At most {MAX_TRACKED_KEYWORDS} keywords can be tracked per project"}), 400
+
+    try:
+        depth = max(10, min(int(data.get('depth', MAX_DEPTH)), MAX_DEPTH))
+    except (ValueError, TypeError):
+        return jsonify({"error": "depth must be an integer"}), 400
+
+    project = get_default_rank_store().create_project(
+        data.get('name') or data['domain'],
+        data['domain'],
+        data['keywords'],
+        data.get('location', 'United States'),
+        data.get('language', 'English'),
+        depth
+    )
+    return jsonify(project), 201
+
+@bp.route('/projects', methods=['GET'])
+def list_projects():
+    """List rank-tracking projects"""
+    return jsonify({"projects": get_default_rank_store().projects()})
+
+@bp.route('/projects/<int:project_id>', methods=['GET'])
+def get_project(project_id):
+    """Get a project with its recent check runs"""
+    store = get_default_rank_store()
+    project = store.project(project_id)
+    if project is None:
+        return jsonify({"error": "Project not found"}), 404
+    return jsonify(dict(project, runs=store.runs(project_id, request.args.get('runs', 30, type=int))))
+
+@bp.route('/projects/<int:project_id>', methods=['PATCH'])
+def update_project(project_id):
+    """Pause or resume a project's daily checks"""
+    data = request.get_json()
+    if not data or 'active' not in data:
+        return jsonify({"error": "active is required"}), 400
+    store = get_default_rank_store()
+    if not store.set_active(project_id, data['active']):
+        return jsonify({"error": "Project not found"}), 404
+    return jsonify(store.project(project_id))
+
+@bp.route('/projects/<int:project_id>/keywords', methods=['POST', 'DELETE'])
+def project_keywords(project_id):
+    """Add keywords to (POST) or stop tracking keywords in (DELETE) a project"""
+    data = request.get_json()
+    if not data or not data.get('keywords'):
+        return jsonify({"error": "Keywords are required"}), 400
+    store = get_default_rank_store()
+    project = store.project(project_id)
+    if project is None:
+        return jsonify({"error": "Project not found"}), 404
+
+    if request.method == 'DELETE':
+        return jsonify({"removed": store.remove_keywords(project_id, data['keywords'])})
+    if project["keyword_count"] + len(data['keywords']) > MAX_TRACKED_KEYWORDS:
+        return jsonify({"error": f"At most {MAX_TRACKED_KEYWORDS} keywords can be tracked per project"}), 400
+    return jsonify({"added": store.add_keywords(project_id, data['keywords'])})
+
+@bp.route('/projects/<int:project_id>/check', methods=['POST'])
+def check_project(project_id):
+    """Run today's check now instead of waiting for the scheduler"""
+    store = get_default_rank_store()
+    project = store.project(project_id)
+    if project is None:
+        return jsonify({"error": "Project not found"}), 404
+
+    data = request.get_json(silent=True) or {}
+    job_id = scheduler.check(project, retry=data.get('retry', False))
+    if job_id is None:
+        return jsonify({
+            "error": "Today's check is already running or done, or no job slot is free",
+            "status": store.run(project_id, day_number())
+        }), 409
+    return jsonify({
+        "job_id": job_id,
+        "status_url": url_for('keyword_research.job_status', job_id=job_id),
+        "stream_url": url_for('keyword_research.job_stream', job_id=job_id)
+    }), 202
+
+@bp.route('/projects/<int:project_id>/history', methods=['GET'])
+def keyword_history(project_id):
+    """Get one keyword's daily positions and ranking URLs (?keyword=&from=&to=)"""
+    keyword = request.args.get('keyword')
+    if not keyword:
+        return jsonify({"error": "Keyword is required"}), 400
+    store = get_default_rank_store()
+    if store.project(project_id) is None:
+        return jsonify({"error": "Project not found"}), 404
+
+    try:
+        end = parse_day(request.args.get('to'), day_number())
+        start = parse_day(request.args.get('from'), end - 365)
+    except ValueError:
+        return jsonify({"error": "from and to must be ISO dates (YYYY-MM-DD)"}), 400
+    history = store.history(project_id, keyword, start, end)
+    if history is None:
+        return jsonify({"error": "Keyword is not tracked"}), 404
+    return jsonify(history)
+
+@bp.route('/projects/<int:project_id>/movers', methods=['GET'])
+def movers(project_id):
+    """Compare a project's positions between two checked days (?to=&from=&days=7&limit=50)"""
+    store = get_default_rank_store()
+    project = store.project(project_id)
+    if project is None:
+        return jsonify({"error": "Project not found"}), 404
+
+    try:
+        to_day = store.latest_day(project_id, parse_day(request.args.get('to'), None))
+        if to_day is None:
+            return jsonify({"error": "Project has no finished checks yet"}), 404
+        requested_from = parse_day(request.args.get('from'), to_day - request.args.get('days', 7, type=int))
+    except ValueError:
+        return jsonify({"error": "from and to must be ISO dates (YYYY-MM-DD)"}), 400
+    # Compare with the latest check on or before the requested day, or the
+    # oldest one since when history does not reach back that far
+    requested_from = min(requested_from, to_day - 1)
+    from_day = store.latest_day(project_id, requested_from)
+    if from_day is None:
+        from_day = store.earliest_day(project_id, requested_from)
+    if from_day is None or from_day >= to_day:
+        return jsonify({"error": "No earlier check to compare with"}), 404
+
+    limit = max(1, min(request.args.get('limit', 50, type=int), MAX_MOVERS))
+    result = store.movers(project_id, from_day, to_day, project["depth"], limit)
+    return jsonify(dict(result, project_id=project_id, **{"from": day_date(from_day), "to": day_date(to_day)}))
@@ -4,11 +4,33 @@ Provides endpoints for SERP (Search Engine Results Page) analysis.
 """
 from flask import Blueprint, request, jsonify
 from utils.dataforseo_client import DataForSEOClient
+from utils.projection import projected, SerpItemRow
+from utils.serp_parser import parse_response
+from utils.serp_archive import get_default_serp_archive, archive_response
 
 bp = Blueprint('serp', __name__)
 client = DataForSEOClient()
 
+MAX_SNAPSHOTS = 1000
+
+def archive_disabled():
+    """503 for snapshot routes when SERP_ARCHIVE_DB is unset or archiving is switched off."""
+    return jsonify({"error": "The SERP archive is disabled; set SERP_ARCHIVE_DB to a file on persistent storage"}), 503
+
+def compact_serp(response):
+    """Parsed SERP with the call's cost, or a 502 carrying the upstream error."""
+    parsed = parse_response(response)
+    if parsed is None:
+        task = (response.get('tasks') or [{}])[0]
+        return jsonify({
+            "error": task.get('status_message') or response.get('status_message'),
+            "status_code": task.get('status_code', response.get('status_code'))
+        }), 502
+    parsed["cost"] = response.get('cost')
+    return jsonify(parsed)
+
 @bp.route('/analysis', methods=['POST'])
+@projected(SerpItemRow)
 def serp_analysis():
     """Get SERP data for a keyword"""
     data = request.get_json()
@@ -21,11 +43,12 @@ def serp_analysis():
     depth = data.get('depth', 10)
     
     response = client.get_serp_data(keyword, location, language, depth)
-    return jsonify(response)
+    archive_response(response)
+    return response
 
 @bp.route('/features', methods=['POST'])
 def serp_features():
-    """Get SERP features (knowledge graph, featured snippets, etc.)"""
+    """Get SERP feature flags, featured snippet owner, PAA questions and organic positions"""
     data = request.get_json()
     if not data or 'keyword' not in data:
         return jsonify({"error": "Keyword is required"}), 400
@@ -43,11 +66,12 @@ def serp_features():
     }]
     
     response = client.make_request("serp/google/organic/live/advanced", req_data)
-    return jsonify(response)
+    archive_response(response)
+    return compact_serp(response)
 
 @bp.route('/local-pack', methods=['POST'])
 def local_pack():
-    """Get local pack results for a keyword"""
+    """Get local pack entries for a keyword, with the rest of the compact SERP"""
     data = request.get_json()
     if not data or 'keyword' not in data:
         return jsonify({"error": "Keyword is required"}), 400
@@ -56,7 +80,7 @@ def local_pack():
     location = data.get('location', 'United States')
     language = data.get('language', 'English')
     
-    # Using regular SERP API but filtering for local pack
+    # Regular SERPs carry local pack entries as local_pack items
     req_data = [{
         "keyword": keyword,
         "location_name": location,
@@ -65,8 +89,64 @@ def local_pack():
     }]
     
     response = client.make_request("serp/google/organic/live/regular", req_data)
-    
-    # Process to extract just local pack data
-    # Full implementation would need additional processing
-    
-    return jsonify(response)
+    return compact_serp(response)
+
+@bp.route('/snapshots', methods=['GET'])
+def list_snapshots():
+    """List a keyword's archived SERP snapshots, newest first (?keyword=&location_code=&language_code=&limit=)"""
+    keyword = request.args.get('keyword')
+    if not keyword:
+        return jsonify({"error": "Keyword is required"}), 400
+    limit = max(1, min(request.args.get('limit', 100, type=int), MAX_SNAPSHOTS))
+    archive = get_default_serp_archive()
+    if archive is None:
+        return archive_disabled()
+    snapshots = archive.snapshots(
+        keyword, request.args.get('location_code', type=int), request.args.get('language_code'), limit
+    )
+    return jsonify({"keyword": keyword, "snapshots": snapshots})
+
+@bp.route('/snapshots/<int:snapshot_id>', methods=['GET'])
+def get_snapshot(snapshot_id):
+    """Get an archived SERP result"""
+    archive = get_default_serp_archive()
+    if archive is None:
+        return archive_disabled()
+    snapshot = archive.snapshot(snapshot_id)
+    if snapshot is None:
+        return jsonify({"error": "Snapshot not found"}), 404
+    return jsonify(snapshot)
+
+@bp.route('/snapshots/diff', methods=['GET'])
+def diff_snapshots():
+    """Organic results that entered, left or moved between two snapshots (?from=&to=, or ?keyword= for the latest two)"""
+    archive = get_default_serp_archive()
+    if archive is None:
+        return archive_disabled()
+    from_id = request.args.get('from', type=int)
+    to_id = request.args.get('to', type=int)
+    if from_id is None or to_id is None:
+        keyword = request.args.get('keyword')
+        if not keyword:
+            return jsonify({"error": "from and to snapshot ids, or a keyword, are required"}), 400
+        latest = archive.latest(keyword, request.args.get('location_code', type=int),
+                                request.args.get('language_code'))
+        if latest is None:
+            return jsonify({"error": "Keyword has fewer than two snapshots"}), 404
+        from_id, to_id = latest
+
+    try:
+        diff = archive.diff(from_id, to_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if diff is None:
+        return jsonify({"error": "Snapshot not found"}), 404
+    return jsonify(diff)
+
+@bp.route('/snapshots/stats', methods=['GET'])
+def snapshot_stats():
+    """Get the archive's snapshot counts and storage reduction"""
+    archive = get_default_serp_archive()
+    if archive is None:
+        return archive_disabled()
+    return jsonify(archive.stats())
@@ -4,22 +4,45 @@ SEO Dashboard Backend Application
 A Flask application that serves as the backend for our SEO dashboard tool.
 """
 import os
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, g
 from flask_cors import CORS
 from dotenv import load_dotenv
-from api import keyword_research_api, domain_analytics_api, competitor_analysis_api, serp_api
+from api import keyword_research_api, domain_analytics_api, competitor_analysis_api, serp_api, rank_tracking_api
+from utils import deadlines, response_encoding
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
+app.json = response_encoding.json_provider(app)
 CORS(app)
 
+@app.before_request
+def start_deadline():
+    """Give every request a deadline that upstream DataForSEO calls must fit in"""
+    seconds = request.headers.get('X-Request-Deadline', type=float)
+    g.deadline_token = deadlines.start(seconds)
+
+@app.teardown_request
+def clear_deadline(exc=None):
+    token = g.pop('deadline_token', None)
+    if token is not None:
+        deadlines.reset(token)
+
+@app.after_request
+def compress_response(response):
+    """Compress responses for clients that accept gzip or brotli"""
+    compressor = response_encoding.get_default_compressor()
+    if compressor is None:
+        return response
+    return compressor.compress(response, request.accept_encodings)
+
 # Register API blueprints
 app.register_blueprint(keyword_research_api.bp, url_prefix='/api/keyword-research')
 app.register_blueprint(domain_analytics_api.bp, url_prefix='/api/domain-analytics')
 app.register_blueprint(competitor_analysis_api.bp, url_prefix='/api/competitor-analysis')
 app.register_blueprint(serp_api.bp, url_prefix='/api/serp')
+app.register_blueprint(rank_tracking_api.bp, url_prefix='/api/rank-tracking')
 
 @app.route('/api/status', methods=['GET'])
 def status():
@@ -66,6 +89,32 @@ def test_connection():
             "message": str(e)
         }), 500
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """DataForSEO client metrics (cache, coalescing, rate limits, retries, hedging and keyword store) and response compression"""
+    from utils.response_cache import get_default_cache
+    from utils.singleflight import get_default_singleflight
+    from utils.rate_limiter import get_default_rate_limiter
+    from utils.hedging import get_default_hedger, latency_tracker
+    from utils.keyword_store import get_default_keyword_store
+    
+    cache = get_default_cache()
+    singleflight = get_default_singleflight()
+    rate_limiter = get_default_rate_limiter()
+    hedger = get_default_hedger()
+    keyword_store = get_default_keyword_store()
+    compressor = response_encoding.get_default_compressor()
+    return jsonify({
+        "cache": cache.stats() if cache is not None else None,
+        "singleflight": singleflight.stats() if singleflight is not None else None,
+        "rate_limiter": rate_limiter.stats() if rate_limiter is not None else None,
+        "calls": deadlines.call_stats.stats(),
+        "latency": latency_tracker.stats(),
+        "hedging": hedger.stats() if hedger is not None else None,
+        "keyword_store": keyword_store.stats() if keyword_store is not None else None,
+        "compression": compressor.stats() if compressor is not None else None
+    })
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint for deployment platforms"""
@@ -92,7 +141,8 @@ def root():
             "keyword_research": "/api/keyword-research/*",
             "domain_analytics": "/api/domain-analytics/*",
             "competitor_analysis": "/api/competitor-analysis/*",
-            "serp": "/api/serp/*"
+            "serp": "/api/serp/*",
+            "rank_tracking": "/api/rank-tracking/*"
         }
     }), 200
 
@@ -101,4 +151,7 @@ if __name__ == '__main__':
     # Use 0.0.0.0 to listen on all interfaces for Railway
     # Disable debug mode in production
     debug_mode = os.environ.get('DEBUG', 'False').lower() == 'true'
+    # Under the reloader only the serving child runs the rank scheduler
+    if not debug_mode or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        rank_tracking_api.start_scheduler()
     app.run(debug=debug_mode, host='0.0.0.0', port=port)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+AI suggestions benchmark
+Times /ai-suggestions' two phases run one after the other (generate the full
+keyword list, then look up its metrics) against the streamed pipeline that
+starts metric lookups while keywords are still being generated, and against
+a repeat request answered from the suggestion cache. Uses the stub LLM server
+and a stub keyword_overview endpoint with a fixed latency.
+
+Usage:
+    python benchmarks/ai_suggestions_benchmark.py [--keywords 15] [--token-delay 0.06] [--metrics-latency 0.8]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from stub_llm_server import start_server
+
+class StubOverviewHandler(BaseHTTPRequestHandler):
+    """keyword_overview stub answering every keyword after a fixed delay"""
+    protocol_version = 'HTTP/1.1'
+    latency = 0.8
+
+    def do_POST(self):
+        tasks = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        time.sleep(self.latency)
+        body = json.dumps({
+            "status_code": 20000,
+            "status_message": "Ok.",
+            "cost": 0.01,
+            "tasks": [{
+                "status_code": 20000,
+                "status_message": "Ok.",
+                "data": task,
+                "result": [{"items": [
+                    {"keyword": keyword, "keyword_info": {"search_volume": 100}} for keyword in task.get('keywords', [])
+                ]}]
+            } for task in tasks]
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<28} {time.perf_counter() - start:7.2f}s")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--keywords', type=int, default=15)
+    parser.add_argument('--token-delay', type=float, default=0.06)
+    parser.add_argument('--metrics-latency', type=float, default=0.8)
+    args = parser.parse_args()
+
+    llm = start_server(token_delay=args.token_delay)
+    os.environ['OPENAI_BASE_URL'] = f"http://127.0.0.1:{llm.server_address[1]}/v1"
+    StubOverviewHandler.latency = args.metrics_latency
+    overview = ThreadingHTTPServer(('127.0.0.1', 0), StubOverviewHandler)
+    threading.Thread(target=overview.serve_forever, daemon=True).start()
+
+    from utils.dataforseo_client import DataForSEOClient
+    from utils.ai_keywords import stream_keyword_suggestions, suggest_with_metrics
+    client = DataForSEOClient("user", "pass", base_url=f"http://127.0.0.1:{overview.server_address[1]}/v3",
+                              cache=False, keyword_store=False)
+
+    def serial():
+        keywords = list(stream_keyword_suggestions("coffee grinder", limit=args.keywords))
+        return client.get_keyword_overview(keywords)
+
+    timed("serial (generate, then metrics)", serial)
+    result = timed("streamed pipeline", lambda: suggest_with_metrics(client, "espresso machine", limit=args.keywords))
+    timed("repeat (cached list)", lambda: suggest_with_metrics(client, "espresso machine", limit=args.keywords))
+    print(f"keywords: {len(result[0])}, metric rows: {len(result[1]['tasks'][0]['result'][0]['items'])}")
+
+    client.close()
+    overview.shutdown()
+    llm.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Gap matrix benchmark
+Builds a keyword gap matrix for a target and 20 competitors with 50k ranked
+keywords each (synthetic data), then times classification, re-sorting and
+filtering against a plain-Python per-keyword loop doing the same work.
+
+Usage:
+    python benchmarks/gap_matrix_benchmark.py [--competitors 20] [--keywords 50000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils.gap_matrix import GapMatrix
+
+def synthetic_rows(domains, keywords_per_domain, vocabulary_size, seed=7):
+    """domain -> {keyword: (position, volume, url)}, drawn from a shared vocabulary"""
+    rng = random.Random(seed)
+    volumes = [int(rng.paretovariate(1.2) * 50) for _ in range(vocabulary_size)]
+    domain_rows = {}
+    for domain in domains:
+        picks = rng.sample(range(vocabulary_size), keywords_per_domain)
+        domain_rows[domain] = {
+            f"keyword {i}": (rng.randint(1, 100), volumes[i], f"https://{domain}/page-{i % 500}")
+            for i in picks
+        }
+    return domain_rows
+
+def python_baseline(target, competitors, domain_rows):
+    """Reference implementation: one dict lookup per keyword per domain, returns the full table"""
+    vocabulary = set()
+    for rows in domain_rows.values():
+        vocabulary.update(rows)
+    table = []
+    for keyword in vocabulary:
+        target_row = domain_rows[target].get(keyword)
+        competitor_positions = [domain_rows[d][keyword][0] for d in competitors if keyword in domain_rows[d]]
+        volume = max(rows[keyword][1] for rows in domain_rows.values() if keyword in rows)
+        best = min(competitor_positions) if competitor_positions else None
+        if target_row is None:
+            category = "missing"
+        elif best is None:
+            category = "unique"
+        else:
+            category = "weak" if target_row[0] > best else "shared"
+        table.append((keyword, category, volume, len(competitor_positions), best))
+    table.sort(key=lambda row: (-row[2] * row[3]))
+    return table
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<34} {(time.perf_counter() - start) * 1000:9.1f}ms")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--competitors', type=int, default=20)
+    parser.add_argument('--keywords', type=int, default=50000)
+    args = parser.parse_args()
+
+    target = "target.com"
+    competitors = [f"competitor{i}.com" for i in range(args.competitors)]
+    domain_rows = synthetic_rows([target] + competitors, args.keywords, args.keywords * 3)
+    print(f"{len(competitors) + 1} domains x {args.keywords} ranked keywords each")
+
+    table = timed("python loop: classify + sort", lambda: python_baseline(target, competitors, domain_rows))
+    timed("python loop: filter + re-sort table", lambda: sorted(
+        (row for row in table if row[2] >= 500 and row[3] >= 3),
+        key=lambda row: row[4] if row[4] is not None else float('inf'))[:100])
+    matrix = timed("matrix: build + classify", lambda: GapMatrix(target, competitors, domain_rows))
+    print(f"  {len(matrix.keywords)} keywords, {matrix.summary()}, "
+          f"{matrix.positions.nbytes / 1e6:.1f}MB of positions")
+    timed("matrix: top 100 by opportunity", lambda: matrix.select(limit=100))
+    timed("matrix: missing, top 100 by volume",
+          lambda: matrix.select(category="missing", sort_by="search_volume", limit=100))
+    timed("matrix: filtered + sorted by rank", lambda: matrix.select(
+        filters=[["search_volume", ">=", 500], ["competitor_count", ">=", 3]],
+        sort_by="best_competitor_position", order="asc", limit=100))
+    timed("matrix: full sort, page 50", lambda: matrix.select(sort_by="keyword", offset=5000, limit=100))
+    indices, _ = matrix.select(limit=100)
+    timed("matrix: materialize 100 rows", lambda: matrix.rows(indices))
+
+if __name__ == '__main__':
+    main()
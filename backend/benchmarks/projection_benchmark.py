@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Projection benchmark
+Serializes real-size Labs responses (ranked_keywords and keyword_ideas with
+1000 rows) in full and through each predefined view, and reports body size,
+projection plus encoding time and peak memory allocated while building the
+body.
+
+Usage:
+    python benchmarks/projection_benchmark.py [--rows 1000] [--repeat 20]
+"""
+import argparse
+import copy
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from flask import Flask
+from utils import response_encoding
+from utils.projection import project, KeywordRow, RankedKeywordRow
+from response_encoding_benchmark import ranked_keywords, timed
+
+def keyword_ideas(rng, rows):
+    """A keyword_ideas/live envelope: ranked_keywords' keyword_data blocks as items"""
+    response = ranked_keywords(rng, rows)
+    result = response["tasks"][0]["result"][0]
+    result["items"] = [dict(item["keyword_data"], serp_info=copy.deepcopy(item["ranked_serp_element"]))
+                       for item in result["items"]]
+    return response
+
+def measure(provider, build, repeat):
+    """(median seconds, body bytes, peak bytes allocated) of serializing build()"""
+    seconds, body = timed(lambda: provider.dumpb(build()), repeat)
+    tracemalloc.start()
+    provider.dumpb(build())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, len(body), peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    cases = {
+        "ranked_keywords": (ranked_keywords(rng, args.rows), RankedKeywordRow),
+        "keyword_ideas": (keyword_ideas(rng, args.rows), KeywordRow),
+    }
+    app = Flask(__name__)
+    provider = response_encoding.json_provider(app)
+    with app.app_context():
+        for name, (response, row_type) in cases.items():
+            print(f"{name} x{args.rows}:")
+            full_time, full_bytes, full_peak = measure(provider, lambda: response, args.repeat)
+            print(f"  {'full':10} {full_bytes / 1e3:8.1f}KB  {full_time * 1000:6.2f}ms  peak {full_peak / 1e6:5.2f}MB")
+            for view, fields in row_type.VIEWS.items():
+                seconds, size, peak = measure(provider, lambda: project(response, row_type, fields), args.repeat)
+                print(f"  {view:10} {size / 1e3:8.1f}KB  {seconds * 1000:6.2f}ms  peak {peak / 1e6:5.2f}MB"
+                      f"  ({full_bytes / size:.1f}x smaller, {full_peak / peak:.1f}x less memory)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Rank store benchmark
+Records a year of synthetic daily checks for one project in a temporary rank
+store, then reports the file size and the time of keyword history and
+day-over-day movers queries.
+
+Usage:
+    python benchmarks/rank_store_benchmark.py [--keywords 10000] [--days 365]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils.rank_store import RankStore, NOT_RANKED
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--keywords', type=int, default=10000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    path = os.path.join(tempfile.mkdtemp(), 'ranks.db')
+    store = RankStore(path)
+    keywords = [f"keyword {i}" for i in range(args.keywords)]
+    project = store.create_project("bench", "example.com", keywords)
+    ids = [keyword_id for keyword_id, _ in store.project_keywords(project["id"])]
+    positions = {keyword_id: rng.randint(0, 100) for keyword_id in ids}
+
+    first_day = 20000
+    start = time.perf_counter()
+    for day in range(first_day, first_day + args.days):
+        store.claim_run(project["id"], day)
+        results = []
+        for keyword_id in ids:
+            position = max(0, min(100, positions[keyword_id] + rng.randint(-3, 3)))
+            positions[keyword_id] = position
+            url = f"https://example.com/page/{keyword_id % 500}" if position != NOT_RANKED else None
+            results.append((keyword_id, position, url))
+        store.record(project["id"], day, results)
+        store.finish_run(project["id"], day, "done", checked=len(results))
+    elapsed = time.perf_counter() - start
+    rows = args.keywords * args.days
+    store._db().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    size = os.path.getsize(path)
+    print(f"recorded {rows:,} positions in {elapsed:.1f}s ({rows / elapsed:,.0f}/s), "
+          f"{size / 1e6:.1f}MB ({size / rows:.1f} bytes per position)")
+
+    sample = rng.sample(keywords, min(args.queries, len(keywords)))
+    start = time.perf_counter()
+    for keyword in sample:
+        store.history(project["id"], keyword)
+    elapsed = time.perf_counter() - start
+    print(f"history: {elapsed / len(sample) * 1000:.2f}ms per keyword ({args.days} days)")
+
+    last_day = first_day + args.days - 1
+    for span in (1, 7, 30):
+        if span >= args.days:
+            break
+        start = time.perf_counter()
+        result = store.movers(project["id"], last_day - span, last_day, 100)
+        elapsed = time.perf_counter() - start
+        print(f"movers over {span} days: {elapsed * 1000:.1f}ms ({result['counts']['compared']:,} keywords compared)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Response encoding benchmark
+Encodes real-size DataForSEO envelopes (1000-row ranked_keywords, a
+depth-100 advanced SERP) with Flask's stdlib provider and with orjson,
+compresses them with gzip and brotli, and reports body sizes, encode and
+compress times, estimated transfer times, and the end-to-end request time
+through the Flask app with and without the compressed-body cache.
+
+jsonify() times are measured through each provider's response().
+
+Usage:
+    python benchmarks/response_encoding_benchmark.py [--rows 1000] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from flask import Flask, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+from utils import response_encoding
+from serp_archive_benchmark import initial_page, response as serp_response
+
+# Link speeds (Mbit/s) the transfer estimates are given for
+LINKS = (10, 50)
+
+def ranked_keywords(rng, rows):
+    """A ranked_keywords/live envelope with rows items, shaped like the labs API"""
+    items = []
+    for i in range(rows):
+        keyword = f"keyword {rng.randrange(10 ** 6)} {i}"
+        items.append({
+            "se_type": "google",
+            "keyword_data": {
+                "se_type": "google", "keyword": keyword, "location_code": 2840, "language_code": "en",
+                "keyword_info": {
+                    "se_type": "google", "last_updated_time": "2024-01-01 00:00:00 +00:00",
+                    "competition": round(rng.random(), 4), "competition_level": rng.choice(["LOW", "MEDIUM", "HIGH"]),
+                    "cpc": round(rng.random() * 10, 2), "search_volume": rng.randrange(10, 100000),
+                    "low_top_of_page_bid": round(rng.random() * 5, 2), "high_top_of_page_bid": round(rng.random() * 15, 2),
+                    "categories": [rng.randrange(10000, 14000) for _ in range(4)],
+                    "monthly_searches": [{"year": 2023, "month": m, "search_volume": rng.randrange(10, 100000)}
+                                         for m in range(1, 13)],
+                    "search_volume_trend": {"monthly": rng.randrange(-50, 50), "quarterly": rng.randrange(-50, 50),
+                                            "yearly": rng.randrange(-50, 50)}
+                },
+                "keyword_properties": {"se_type": "google", "core_keyword": None, "synonym_clustering_algorithm": "text_processing",
+                                       "keyword_difficulty": rng.randrange(100), "detected_language": "en",
+                                       "is_another_language": False},
+                "search_intent_info": {"se_type": "google", "main_intent": rng.choice(["informational", "commercial"]),
+                                       "foreign_intent": None, "last_updated_time": "2024-01-01 00:00:00 +00:00"}
+            },
+            "ranked_serp_element": {
+                "se_type": "google", "check_url": f"https://www.google.com/search?q={keyword}",
+                "serp_item": {"se_type": "google", "type": "organic", "rank_group": rng.randrange(1, 100),
+                              "rank_absolute": rng.randrange(1, 120), "position": "left", "xpath": "/html[1]/body[1]/div[5]",
+                              "domain": "www.example.com", "title": f"Title for {keyword}",
+                              "url": f"https://www.example.com/{i}", "breadcrumb": "https://www.example.com > page",
+                              "is_image": False, "is_video": False, "is_featured_snippet": False,
+                              "etv": round(rng.random() * 100, 3), "estimated_paid_traffic_cost": round(rng.random() * 50, 3),
+                              "rank_changes": {"previous_rank_absolute": rng.randrange(1, 120), "is_new": False,
+                                               "is_up": True, "is_down": False}},
+                "se_results_count": rng.randrange(10 ** 5, 10 ** 9), "last_updated_time": "2024-01-01 00:00:00 +00:00"
+            }
+        })
+    return {"version": "0.1.20240101", "status_code": 20000, "status_message": "Ok.", "time": "1.2 sec.", "cost": 0.11,
+            "tasks_count": 1, "tasks_error": 0, "tasks": [{
+                "id": "01011200-0000-0000-0000-000000000000", "status_code": 20000, "status_message": "Ok.",
+                "time": "1.1 sec.", "cost": 0.11, "result_count": 1, "path": ["v3", "dataforseo_labs", "google",
+                                                                           "ranked_keywords", "live"],
+                "data": {"target": "example.com", "limit": rows}, "result": [{
+                    "se_type": "google", "target": "example.com", "location_code": 2840, "language_code": "en",
+                    "total_count": rows * 10, "items_count": rows, "items": items}]}]}
+
+def timed(fn, repeat):
+    """Median seconds of fn() over repeat calls, and its last result"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    features, organic = initial_page(rng, 0, 100)
+    payloads = {
+        f"ranked_keywords x{args.rows}": ranked_keywords(rng, args.rows),
+        "advanced SERP depth 100": serp_response("keyword", datetime(2024, 1, 1, tzinfo=timezone.utc), features, organic)
+    }
+    app = Flask(__name__)
+    stdlib, fast = DefaultJSONProvider(app), response_encoding.json_provider(app)
+
+    for name, payload in payloads.items():
+        print(f"{name}:")
+        with app.app_context():
+            t_std, body_std = timed(lambda: stdlib.response(payload).get_data(), args.repeat)
+            t_fast, body = timed(lambda: fast.response(payload).get_data(), args.repeat)
+        assert json.loads(body_std) == json.loads(body), "orjson output differs from Flask's"
+        print(f"  encode   stdlib {t_std * 1000:7.1f}ms   {type(fast).__name__} {t_fast * 1000:6.1f}ms"
+              f"   ({t_std / t_fast:.1f}x), {len(body) / 1e6:.2f}MB")
+        sizes = {"identity": len(body)}
+        for encoding, encoder in response_encoding.ENCODERS.items():
+            t_compress, compressed = timed(lambda: encoder(body), max(3, args.repeat // 4))
+            sizes[encoding] = len(compressed)
+            print(f"  {encoding:8} {t_compress * 1000:7.1f}ms   {len(compressed) / 1e3:8.1f}KB "
+                  f"({len(body) / len(compressed):.1f}x smaller)")
+        for mbit in LINKS:
+            print(f"  transfer at {mbit} Mbit/s: " + ", ".join(
+                f"{encoding} {size * 8 / (mbit * 1e6) * 1000:.0f}ms" for encoding, size in sizes.items()))
+
+    # End to end through an app with the same hooks as app.py
+    app.json = fast
+    compressor = response_encoding.ResponseCompressor()
+    app.after_request(lambda response: compressor.compress(response, request.accept_encodings))
+    payload = payloads[f"ranked_keywords x{args.rows}"]
+    app.add_url_rule('/ranked', 'ranked', lambda: jsonify(payload))
+    client = app.test_client()
+    print("end to end, ranked_keywords:")
+    for encoding in ("identity", *response_encoding.ENCODERS):
+        headers = {"Accept-Encoding": encoding}
+        compressor.cache_max_bytes = 0
+        t_cold, response = timed(lambda: client.get('/ranked', headers=headers), args.repeat)
+        compressor.cache_max_bytes = response_encoding.DEFAULT_CACHE_MAX_BYTES
+        t_warm, _ = timed(lambda: client.get('/ranked', headers=headers), args.repeat)
+        print(f"  {encoding:8} uncached {t_cold * 1000:6.1f}ms   cached {t_warm * 1000:6.1f}ms   "
+              f"{len(response.data) / 1e3:8.1f}KB sent")
+
+if __name__ == '__main__':
+    main()
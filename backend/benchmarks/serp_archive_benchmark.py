@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+SERP archive benchmark
+Archives synthetic daily advanced SERPs (depth 100 with feature blocks) for a
+set of keywords, with results moving, entering and leaving from day to day,
+then reports the storage reduction against the raw result JSON, store
+throughput, and diff and rebuild latency.
+
+Usage:
+    python benchmarks/serp_archive_benchmark.py [--keywords 200] [--days 30] [--codec zstd|zlib]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils import serp_archive
+
+WORDS = [f"{a}{b}" for a in ("best", "cheap", "guide", "review", "top", "how", "buy", "free", "local", "new",
+                             "pro", "smart", "fast", "easy", "home", "city", "shop", "tool", "plan", "care")
+         for b in ("ing", "er", "s", "ly", "ness", "able", "ful", "est", "ed", "ion", "", "ity")]
+
+def sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+def organic_result(rng, keyword_index):
+    domain = f"site{rng.randrange(3000)}.com"
+    return {"type": "organic", "domain": domain, "url": f"https://www.{domain}/{rng.choice(WORDS)}/{keyword_index}",
+            "title": sentence(rng, 8), "description": sentence(rng, 30), "breadcrumb": f"https://www.{domain} > page",
+            "website_name": domain, "is_image": False, "is_video": False, "is_featured_snippet": False,
+            "is_malicious": False, "is_web_story": False, "amp_version": False, "rating": None, "highlighted": [],
+            "links": None, "about_this_result": None, "main_domain": domain, "relative_url": None,
+            "etv": None, "estimated_paid_traffic_cost": None, "timestamp": None, "cache_url": None}
+
+def initial_page(rng, keyword_index, depth):
+    features = [{"type": "people_also_ask", "items": [
+        {"type": "people_also_ask_element", "title": sentence(rng, 7) + "?", "seed_question": None}
+        for _ in range(4)]}, {"type": "related_searches", "items": [sentence(rng, 3) for _ in range(8)]}]
+    return features, [organic_result(rng, keyword_index) for _ in range(depth)]
+
+def next_day(rng, keyword_index, organic):
+    """Shuffle a few neighbours, rewrite a few snippets, replace a few results."""
+    organic = list(organic)
+    for _ in range(rng.randint(0, 6)):
+        i = rng.randrange(len(organic) - 1)
+        organic[i], organic[i + 1] = organic[i + 1], organic[i]
+    for _ in range(rng.randint(0, 3)):
+        i = rng.randrange(len(organic))
+        organic[i] = dict(organic[i], description=sentence(rng, 30))
+    for _ in range(rng.randint(0, 3)):
+        organic.pop(rng.randrange(len(organic)))
+        organic.insert(rng.randrange(len(organic)), organic_result(rng, keyword_index))
+    return organic
+
+def response(keyword, fetched, features, organic):
+    items = []
+    for item in features[:1] + organic[:3] + features[1:] + organic[3:]:
+        items.append(dict(item, rank_absolute=len(items) + 1, xpath=f"/html[1]/body[1]/div[{len(items) + 3}]"))
+    group = 0
+    for item in items:
+        if item["type"] == "organic":
+            group += 1
+            item["rank_group"] = group
+        else:
+            item["rank_group"] = 1
+    result = {"keyword": keyword, "type": "organic", "se_domain": "google.com", "location_code": 2840,
+              "language_code": "en", "check_url": f"https://www.google.com/search?q={keyword}&num=100",
+              "datetime": fetched.strftime("%Y-%m-%d %H:%M:%S +00:00"), "spell": None, "refinement_chips": None,
+              "item_types": sorted({item["type"] for item in items}), "se_results_count": 1000000,
+              "items_count": len(items), "items": items}
+    return {"status_code": 20000, "tasks": [{"status_code": 20000, "result": [result]}]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--keywords', type=int, default=200)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--depth', type=int, default=100)
+    parser.add_argument('--codec', choices=('zstd', 'zlib'), default='zstd' if serp_archive.zstandard else 'zlib')
+    args = parser.parse_args()
+    serp_archive.CODEC = serp_archive.CODEC_ZSTD if args.codec == 'zstd' else serp_archive.CODEC_ZLIB
+
+    rng = random.Random(7)
+    path = os.path.join(tempfile.mkdtemp(), 'serps.db')
+    archive = serp_archive.SerpArchive(path)
+    pages = [initial_page(rng, i, args.depth) for i in range(args.keywords)]
+    first = datetime(2024, 1, 1, 6, tzinfo=timezone.utc)
+    ids = [[] for _ in range(args.keywords)]
+    raw = 0
+    elapsed = 0.0
+    for day in range(args.days):
+        for i, (features, organic) in enumerate(pages):
+            if day:
+                organic = next_day(rng, i, organic)
+                pages[i] = (features, organic)
+            body = response(f"keyword {i}", first + timedelta(days=day, seconds=i), features, organic)
+            raw += len(json.dumps(body["tasks"][0]["result"][0], separators=(',', ':')).encode())
+            start = time.perf_counter()
+            ids[i].append(archive.store(body))
+            elapsed += time.perf_counter() - start
+
+    snapshots = args.keywords * args.days
+    archive._db().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    size = os.path.getsize(path)
+    stats = archive.stats()
+    print(f"{args.codec}: {snapshots} snapshots stored in {elapsed:.1f}s ({elapsed / snapshots * 1000:.2f}ms each)")
+    print(f"raw result JSON {raw / 1e6:.1f}MB -> {stats['stored_bytes'] / 1e6:.2f}MB stored "
+          f"({raw / stats['stored_bytes']:.1f}x), {size / 1e6:.2f}MB database file ({raw / size:.1f}x); "
+          f"{stats['blocks']} blocks, {stats['manifests']} manifests")
+
+    timings = []
+    for _ in range(2000):
+        series = rng.choice(ids)
+        a, b = sorted(rng.sample(series, 2))
+        start = time.perf_counter()
+        archive.diff(a, b)
+        timings.append(time.perf_counter() - start)
+    print(f"diff: median {statistics.median(timings) * 1e6:.0f}us, "
+          f"p99 {sorted(timings)[int(len(timings) * 0.99)] * 1e6:.0f}us")
+
+    timings = []
+    for _ in range(200):
+        snapshot_id = rng.choice(rng.choice(ids))
+        start = time.perf_counter()
+        archive.snapshot(snapshot_id)
+        timings.append(time.perf_counter() - start)
+    print(f"rebuild: median {statistics.median(timings) * 1000:.2f}ms")
+
+if __name__ == '__main__':
+    main()
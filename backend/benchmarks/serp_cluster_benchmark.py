@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+SERP clustering benchmark
+Clusters synthetic top-10 URL sets for 50k keywords drawn from planted topic
+groups (with noise URLs mixed in), then reports timings per stage and how
+well the planted groups were recovered. SERP fetching is not included.
+
+Usage:
+    python benchmarks/serp_cluster_benchmark.py [--keywords 50000] [--threshold 0.4]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils.serp_clustering import cluster_url_sets
+
+def synthetic_url_sets(keywords, top_n, group_size, shared, seed=7):
+    """keyword -> top URLs, keywords of one planted group sharing most of a URL pool"""
+    rng = random.Random(seed)
+    url_sets, groups = {}, {}
+    for start in range(0, keywords, group_size):
+        group = start // group_size
+        pool = [f"site{group % 997}.com/topic-{group}/page-{i}" for i in range(top_n + 4)]
+        for index in range(start, min(start + group_size, keywords)):
+            keyword = f"keyword {index}"
+            urls = rng.sample(pool, shared)
+            urls += [f"noise{rng.randrange(10 ** 6)}.com/{rng.randrange(100)}" for _ in range(top_n - shared)]
+            rng.shuffle(urls)
+            url_sets[keyword] = urls
+            groups[keyword] = group
+    return url_sets, groups
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--keywords', type=int, default=50000)
+    parser.add_argument('--top-n', type=int, default=10)
+    parser.add_argument('--group-size', type=int, default=20)
+    parser.add_argument('--shared', type=int, default=7, help="URLs per keyword drawn from its group's pool")
+    parser.add_argument('--threshold', type=float, default=0.4)
+    parser.add_argument('--method', default='pivot')
+    args = parser.parse_args()
+
+    url_sets, groups = synthetic_url_sets(args.keywords, args.top_n, args.group_size, args.shared)
+    start = time.perf_counter()
+    clusters, stats = cluster_url_sets(url_sets, args.threshold, args.method)
+    elapsed = time.perf_counter() - start
+
+    pure = sum(1 for cluster in clusters if len({groups[k] for k in cluster["keywords"]}) == 1)
+    clustered = sum(cluster["size"] for cluster in clusters)
+    print(f"keywords: {args.keywords}, distinct urls: {stats['distinct_urls']}, "
+          f"bands x rows: {stats['bands']} x {stats['rows_per_band']}")
+    for name, ms in stats["timings_ms"].items():
+        print(f"  {name:<8} {ms:9.1f}ms")
+    print(f"total        {elapsed * 1000:9.1f}ms")
+    print(f"candidate pairs: {stats['candidate_pairs']}, linked: {stats['linked_pairs']}, "
+          f"all pairs: {args.keywords * (args.keywords - 1) // 2}")
+    print(f"clusters: {len(clusters)} ({pure} single-group), keywords clustered: {clustered}, "
+          f"planted groups: {len(set(groups.values()))}")
+
+if __name__ == '__main__':
+    main()
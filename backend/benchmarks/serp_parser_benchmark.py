@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+SERP parser benchmark
+Parses synthetic advanced SERP results (depth 20 plus feature blocks, shaped
+like stored DataForSEO responses) and reports SERPs parsed per second.
+
+Usage:
+    python benchmarks/serp_parser_benchmark.py [--serps 5000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils.serp_parser import parse_serp
+
+FEATURES = ("featured_snippet", "people_also_ask", "local_pack", "images", "video", "top_stories",
+            "knowledge_graph", "related_searches", "paid")
+
+def synthetic_serp(rng, index, organic=20):
+    """One advanced SERP result with a random mix of feature blocks"""
+    items = []
+    rank = 0
+    for feature in rng.sample(FEATURES, 4):
+        rank += 1
+        if feature == "people_also_ask":
+            items.append({"type": feature, "rank_absolute": rank, "items": [
+                {"type": "people_also_ask_element", "title": f"question {i} for keyword {index}?"} for i in range(4)
+            ]})
+        elif feature == "local_pack":
+            for i in range(3):
+                items.append({"type": feature, "rank_group": i + 1, "rank_absolute": rank, "title": f"business {i}",
+                              "domain": f"biz{i}.com", "phone": "+1 555 0100", "cid": str(i),
+                              "rating": {"value": 4.5, "votes_count": 120}})
+                rank += 1
+        else:
+            items.append({"type": feature, "rank_absolute": rank, "domain": "example.com",
+                          "url": "https://example.com/", "title": feature})
+    for position in range(1, organic + 1):
+        rank += 1
+        items.append({"type": "organic", "rank_group": position, "rank_absolute": rank,
+                      "domain": f"site{rng.randrange(500)}.com", "url": f"https://site.com/{index}/{position}",
+                      "title": f"result {position}", "description": "lorem ipsum " * 10,
+                      "breadcrumb": "site.com > page", "is_featured_snippet": False})
+    return {"keyword": f"keyword {index}", "se_results_count": 1000000,
+            "item_types": sorted({item["type"] for item in items}), "items": items}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--serps', type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    serps = [synthetic_serp(rng, i) for i in range(args.serps)]
+    start = time.perf_counter()
+    for result in serps:
+        parse_serp(result)
+    elapsed = time.perf_counter() - start
+    items = sum(len(result["items"]) for result in serps)
+    print(f"{args.serps} SERPs ({items} items) in {elapsed * 1000:.1f}ms: "
+          f"{args.serps / elapsed:,.0f} SERPs/s, {elapsed / args.serps * 1e6:.1f}us per SERP")
+
+if __name__ == '__main__':
+    main()
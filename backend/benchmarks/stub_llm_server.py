@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Stub LLM server
+Answers OpenAI chat completion requests (streamed or not) with a generated
+{"keywords": [...]} list, emitting one keyword every --token-delay seconds,
+so AI suggestions can be developed and timed without an API key.
+
+Usage:
+    python benchmarks/stub_llm_server.py [--port 8089] [--token-delay 0.05]
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 python app.py
+"""
+import argparse
+import json
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MODIFIERS = ("best", "how to choose", "cheap", "guide", "vs alternatives", "for beginners", "near me",
+             "reviews", "ideas", "tips", "cost", "examples", "tools", "benefits", "checklist", "trends")
+
+def stub_keywords(prompt):
+    """Keywords the stub answers a suggestion prompt with: the seed plus modifiers"""
+    limit = int((re.search(r"Generate (\d+)", prompt) or [None, 15])[1])
+    seed = (re.search(r"for '([^']*)'", prompt) or [None, "keyword"])[1]
+    return [f"{seed} {MODIFIERS[i % len(MODIFIERS)]}" + (f" {i // len(MODIFIERS)}" if i >= len(MODIFIERS) else "")
+            for i in range(limit)]
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    """Minimal /v1/chat/completions endpoint"""
+    protocol_version = 'HTTP/1.1'
+    token_delay = 0.05
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b"{}")
+        prompt = (body.get('messages') or [{}])[-1].get('content', '')
+        keywords = stub_keywords(prompt)
+        pieces = ['{"keywords": ['] + [
+            json.dumps(keyword) + (", " if i < len(keywords) - 1 else "") for i, keyword in enumerate(keywords)
+        ] + [']}']
+
+        if not body.get('stream'):
+            time.sleep(self.token_delay * len(keywords))
+            payload = json.dumps({
+                "id": "stub", "object": "chat.completion", "created": int(time.time()), "model": body.get('model'),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "".join(pieces)}}]
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for i, piece in enumerate(pieces):
+            if 0 < i < len(pieces) - 1:
+                time.sleep(self.token_delay)
+            chunk = {
+                "id": "stub", "object": "chat.completion.chunk", "created": int(time.time()), "model": body.get('model'),
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text):
+        data = text.encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(port=0, token_delay=0.05):
+    """Start the stub on a background thread and return the server"""
+    import threading
+    StubLLMHandler.token_delay = token_delay
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubLLMHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--token-delay', type=float, default=0.05)
+    args = parser.parse_args()
+    StubLLMHandler.token_delay = args.token_delay
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), StubLLMHandler)
+    print(f"Stub LLM listening on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+"""
+Gunicorn configuration
+Loaded automatically by ``gunicorn app:app`` when run from this directory.
+Starts the rank-tracking scheduler in each worker once the app is loaded,
+when RANK_TRACKING_SCHEDULER_ENABLED is set; importing the app alone never
+starts it.
+"""
+
+def post_worker_init(worker):
+    from api import rank_tracking_api
+    rank_tracking_api.start_scheduler()
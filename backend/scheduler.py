@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Rank Tracking Scheduler
+Runs the daily rank-check loop in its own process, for deployments that keep
+it out of the web workers (leave RANK_TRACKING_SCHEDULER_ENABLED off for the
+web service). RANK_TRACKING_DB must point at persistent storage.
+
+Usage:
+    python scheduler.py
+"""
+import logging
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from api import rank_tracking_api
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    rank_tracking_api.scheduler.check_store()
+    rank_tracking_api.scheduler.run_forever()
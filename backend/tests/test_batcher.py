@@ -0,0 +1,89 @@
+"""
+Batching limits: endpoints that take one task per call must never receive a
+multi-task POST, whichever path the tasks arrive through.
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils import deadlines
+from utils.batcher import MicroBatcher, max_tasks_for
+from utils.dataforseo_client import DataForSEOClient
+
+SINGLE_TASK_ENDPOINTS = [
+    "serp/google/organic/live/regular",
+    "serp/google/organic/live/advanced",
+    "keywords_data/google/search_volume/live",
+]
+
+def recording_client(batch_window=0):
+    client = DataForSEOClient("u", "p", cache=False, singleflight=False, rate_limiter=False,
+                              hedger=False, keyword_store=False, batch_window=batch_window)
+    posts = []
+
+    def post(endpoint, data):
+        posts.append((endpoint, len(data)))
+        return {"status_code": 20000, "tasks": [{"status_code": 20000, "result": []} for _ in data]}
+
+    client._post = post
+    return client, posts
+
+def test_single_task_live_endpoints_are_capped():
+    for endpoint in SINGLE_TASK_ENDPOINTS:
+        assert max_tasks_for(endpoint) == 1, endpoint
+
+def test_queued_and_labs_endpoints_still_batch():
+    assert max_tasks_for("serp/google/organic/task_post") > 1
+    assert max_tasks_for("dataforseo_labs/google/ranked_keywords/live") > 1
+    assert max_tasks_for("backlinks/overview/live") > 1
+
+def test_live_serp_many_posts_one_task_per_call():
+    client, posts = recording_client()
+    responses = client.get_serp_data_many([f"keyword {i}" for i in range(25)], mode="live")
+    assert len(responses) == 25
+    assert len(posts) == 25
+    assert all(count == 1 for _, count in posts)
+
+def test_batch_request_never_packs_single_task_endpoints():
+    client, posts = recording_client()
+    for endpoint in SINGLE_TASK_ENDPOINTS:
+        client.make_batch_request(endpoint, [{"keyword": f"k{i}"} for i in range(10)])
+    assert posts and all(count == 1 for _, count in posts)
+
+def test_micro_batcher_sends_single_task_endpoints_alone():
+    sent = []
+    batcher = MicroBatcher(lambda endpoint, tasks: sent.append(len(tasks)) or [{}] * len(tasks), window=0.05)
+    threads = [threading.Thread(target=lambda: batcher.submit(SINGLE_TASK_ENDPOINTS[0], {}).result(timeout=1))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sent == [1] * 8
+
+def test_window_flush_runs_under_the_tightest_request_deadline():
+    seen = []
+
+    def send(endpoint, tasks):
+        seen.append(deadlines.current())
+        return [{}] * len(tasks)
+
+    batcher = MicroBatcher(send, window=0.05)
+    expected = []
+
+    def submit(seconds):
+        token = deadlines.start(seconds)
+        expected.append(deadlines.current())
+        try:
+            batcher.submit("dataforseo_labs/google/ranked_keywords/live", {}).result(timeout=1)
+        finally:
+            deadlines.reset(token)
+
+    threads = [threading.Thread(target=submit, args=(seconds,)) for seconds in (5, 2, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(seen) == 1
+    assert abs(seen[0] - min(expected)) < 0.01
@@ -0,0 +1,81 @@
+"""
+Gap matrix: every keyword of the target and its competitors is classified
+as missing, weak, shared or unique for the target, and pages are sorted and
+filtered on the matrix columns.
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils import gap_matrix
+from utils.gap_matrix import GapMatrix, get_cached_matrix, page_order, sort_and_filter_items
+
+DOMAINS = {
+    "target.com": {"shoes": (5, 1000, "t1"), "boots": (1, 500, "t2"), "laces": (2, 50, "t3")},
+    "rival.com": {"shoes": (1, 1000, "r1"), "boots": (3, 500, "r2"), "socks": (2, 800, "r3")},
+    "other.com": {"socks": (4, 800, "o3")},
+}
+
+def matrix():
+    return GapMatrix("target.com", ["rival.com", "other.com"], DOMAINS)
+
+def test_keywords_are_classified_for_the_target():
+    gaps = matrix()
+    categories = dict(zip(gaps.keywords, gaps.category))
+    assert categories == {"shoes": "weak", "boots": "shared", "laces": "unique", "socks": "missing"}
+    assert gaps.summary() == {"missing": 1, "weak": 1, "shared": 1, "unique": 1}
+
+def test_missing_keywords_rank_by_clicks_to_gain():
+    gaps = matrix()
+    indices, total = gaps.select(category="missing")
+    assert total == 1
+    row = gaps.rows(indices)[0]
+    assert row["keyword"] == "socks"
+    assert row["positions"] == [None, 2, 4]
+    assert row["competitor_count"] == 2
+    assert row["opportunity"] == round(800 * 0.15, 2)
+
+def test_filters_sorting_and_paging():
+    gaps = matrix()
+    indices, total = gaps.select(filters=[["search_volume", ">=", 500]], sort_by="search_volume", order="asc")
+    assert total == 3
+    assert [row["keyword"] for row in gaps.rows(indices)] == ["boots", "socks", "shoes"]
+    indices, _ = gaps.select(sort_by="target_position", order="asc", offset=1, limit=2)
+    # Keywords the target does not rank for sort last
+    assert [row["keyword"] for row in gaps.rows(indices)] == ["laces", "shoes"]
+    with pytest.raises(ValueError):
+        gaps.select(filters=[["search_volume", "~", 1]])
+    with pytest.raises(ValueError):
+        gaps.select(sort_by="position:unknown.com")
+
+def test_page_order_matches_a_full_sort():
+    key = np.array([3.0, np.nan, 9.0, 1.0, 7.0, 5.0])
+    assert page_order(key, "desc", 0, 3).tolist() == [2, 4, 5]
+    assert page_order(key, "asc", 2, 10).tolist() == [5, 4, 2, 1]
+
+def test_cached_matrix_is_reused_and_partial_builds_are_not_cached(monkeypatch):
+    monkeypatch.setattr(gap_matrix, "_matrix_cache", type(gap_matrix._matrix_cache)())
+    builds = []
+
+    def build(cacheable):
+        def run():
+            builds.append(1)
+            return matrix(), cacheable
+        return run
+
+    first = get_cached_matrix(("t", "partial"), build(False))
+    assert get_cached_matrix(("t", "partial"), build(False)) is not first
+    first = get_cached_matrix(("t", "full"), build(True))
+    assert get_cached_matrix(("t", "full"), build(True)) is first
+    assert len(builds) == 3
+
+def test_sort_and_filter_items_on_dotted_fields():
+    items = [{"keyword_data": {"keyword_info": {"search_volume": volume}}, "id": i}
+             for i, volume in enumerate([10, None, 30, 20])]
+    ordered = sort_and_filter_items(items, "keyword_data.keyword_info.search_volume", "desc")
+    assert [item["id"] for item in ordered] == [2, 3, 0, 1]
+    filtered = sort_and_filter_items(items, filters=[["keyword_data.keyword_info.search_volume", ">", 15]])
+    assert [item["id"] for item in filtered] == [2, 3]
@@ -0,0 +1,65 @@
+"""
+Keyword chunking: oversized keyword lists are deduplicated, split at the
+endpoint's per-task limit and merged back in caller order, with failed
+chunks reported so callers can retry just those keywords.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils.keyword_chunking import chunk_keywords, dedupe_keywords, keyword_limit, merge_keyword_responses
+
+def labs(keywords, cost=0.01):
+    items = [{"keyword": keyword, "keyword_info": {"search_volume": len(keyword)}} for keyword in keywords]
+    return {"status_code": 20000, "cost": cost, "tasks": [{
+        "status_code": 20000,
+        "data": {"keywords": keywords},
+        "result": [{"items": items, "items_count": len(items)}]
+    }]}
+
+def failed(message="Internal error"):
+    return {"status_code": 20000, "cost": 0, "tasks": [{"status_code": 50000, "status_message": message}]}
+
+def test_dedupe_ignores_case_and_whitespace_and_keeps_the_first_spelling():
+    assert dedupe_keywords(["Running Shoes", "running  shoes", "boots", " ", "BOOTS"]) == ["Running Shoes", "boots"]
+
+def test_chunks_follow_the_endpoint_limit():
+    limit = keyword_limit("dataforseo_labs/google/keyword_overview/live")
+    chunks = chunk_keywords([f"k{i}" for i in range(limit * 2 + 1)], limit)
+    assert [len(chunk) for chunk in chunks] == [limit, limit, 1]
+    assert keyword_limit("dataforseo_labs/google/keyword_ideas/live") is None
+
+def test_merged_rows_follow_caller_order_and_costs_add_up():
+    keywords = ["c", "a", "b", "d"]
+    chunks = [["c", "a"], ["b", "d"]]
+    # Upstream answers each chunk in its own order
+    merged = merge_keyword_responses([labs(["a", "c"]), labs(["d", "b"])], keywords, chunks)
+    task = merged["tasks"][0]
+    assert [item["keyword"] for item in task["result"][0]["items"]] == keywords
+    assert task["result"][0]["items_count"] == 4
+    assert task["data"]["keywords"] == keywords
+    assert merged["cost"] == 0.02
+    assert not merged["partial"]
+    assert [chunk["success"] for chunk in merged["chunks"]] == [True, True]
+
+def test_failed_chunk_is_reported_with_its_keywords():
+    merged = merge_keyword_responses([labs(["a"]), failed()], ["a", "b"], [["a"], ["b"]])
+    assert merged["partial"]
+    assert [item["keyword"] for item in merged["tasks"][0]["result"][0]["items"]] == ["a"]
+    assert merged["chunks"][1]["keywords"] == ["b"]
+    assert merged["chunks"][1]["status_message"] == "Internal error"
+
+def test_every_chunk_failing_returns_the_upstream_error():
+    merged = merge_keyword_responses([failed("Rate limited"), failed()], ["a", "b"], [["a"], ["b"]])
+    assert merged["tasks"][0]["status_code"] == 50000
+    assert merged["tasks"][0]["status_message"] == "Rate limited"
+    assert len(merged["chunks"]) == 2
+
+def test_search_volume_rows_merge_as_a_flat_result():
+    def volume(keywords):
+        return {"status_code": 20000, "tasks": [{
+            "status_code": 20000,
+            "result": [{"keyword": keyword, "search_volume": 10} for keyword in keywords]
+        }]}
+    merged = merge_keyword_responses([volume(["b"]), volume(["a"])], ["a", "b"], [["b"], ["a"]])
+    assert [row["keyword"] for row in merged["tasks"][0]["result"]] == ["a", "b"]
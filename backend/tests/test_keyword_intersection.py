@@ -0,0 +1,44 @@
+"""
+Keyword intersection: shared keywords across domains, ordered by volume,
+with positions aligned to the domain order and pairwise overlaps.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils.keyword_intersection import extract_ranked_rows, intersect_domains
+
+def ranked(rows):
+    return {"status_code": 20000, "tasks": [{"status_code": 20000, "result": [{"items": [{
+        "keyword_data": {"keyword": keyword, "keyword_info": {"search_volume": volume}},
+        "ranked_serp_element": {"serp_item": {"rank_group": position, "url": f"https://x.com/{keyword}"}}
+    } for keyword, position, volume in rows]}]}]}
+
+DOMAINS = {
+    "a.com": {"shoes": (1, 900, "a1"), "boots": (4, 500, "a2"), "socks": (9, 50, "a3")},
+    "b.com": {"shoes": (3, 900, "b1"), "boots": (2, 500, "b2")},
+    "c.com": {"shoes": (7, 900, "c1"), "socks": (1, 50, "c3")},
+}
+
+def test_extract_keeps_the_first_ranking_of_each_keyword():
+    rows = extract_ranked_rows(ranked([("shoes", 2, 900), ("shoes", 8, 900), ("boots", 5, None)]))
+    assert rows == {"shoes": (2, 900, "https://x.com/shoes"), "boots": (5, None, "https://x.com/boots")}
+
+def test_keywords_shared_by_every_domain():
+    result = intersect_domains(DOMAINS)
+    assert result["min_domains"] == 3
+    assert [row["keyword"] for row in result["shared_keywords"]] == ["shoes"]
+    assert result["shared_keywords"][0]["positions"] == [1, 3, 7]
+    assert result["keyword_counts"] == {"a.com": 3, "b.com": 2, "c.com": 2}
+
+def test_min_domains_finds_partial_overlaps_by_volume():
+    result = intersect_domains(DOMAINS, min_domains=2, limit=2)
+    assert result["shared_count"] == 3
+    assert [row["keyword"] for row in result["shared_keywords"]] == ["shoes", "boots"]
+    assert result["shared_keywords"][1]["positions"] == [4, 2, None]
+
+def test_min_domains_is_clamped_and_overlaps_are_pairwise():
+    result = intersect_domains(DOMAINS, min_domains=10)
+    assert result["min_domains"] == 3
+    overlaps = {(pair["domain1"], pair["domain2"]): pair["overlap"] for pair in result["pairwise_overlap"]}
+    assert overlaps == {("a.com", "b.com"): 2, ("a.com", "c.com"): 2, ("b.com", "c.com"): 1}
@@ -0,0 +1,67 @@
+"""
+Keyword store: keyword rows seen in any response answer later keyword-list
+lookups for the same location and language, so only missing or stale
+keywords are bought again.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils.keyword_store import KeywordStore
+
+OVERVIEW = "dataforseo_labs/google/keyword_overview/live"
+DIFFICULTY = "dataforseo_labs/google/bulk_keyword_difficulty/live"
+IDEAS = "dataforseo_labs/google/keyword_ideas/live"
+SCOPE = {"location_name": "United States", "language_name": "English"}
+
+def labs(keywords):
+    items = [{"keyword": keyword, "keyword_info": {"search_volume": 100},
+              "keyword_properties": {"keyword_difficulty": 30}} for keyword in keywords]
+    return {"status_code": 20000, "tasks": [{"status_code": 20000, "result": [{"items": items}]}]}
+
+def store(tmp_path, **kwargs):
+    return KeywordStore(str(tmp_path / "keywords.db"), **kwargs)
+
+def test_stored_rows_answer_lookups_and_the_rest_are_fetched(tmp_path):
+    keywords = store(tmp_path)
+    keywords.ingest(OVERVIEW, [dict(SCOPE, keywords=["shoes", "boots"])], labs(["shoes", "boots"]))
+    rows, missing = keywords.lookup(OVERVIEW, SCOPE, ["Shoes", "sandals"])
+    assert rows["shoes"]["keyword_info"]["search_volume"] == 100
+    assert missing == ["sandals"]
+    assert keywords.counters["keywords_local"] == 1
+
+def test_keywords_a_list_call_came_back_without_are_remembered(tmp_path):
+    keywords = store(tmp_path)
+    keywords.ingest(OVERVIEW, [dict(SCOPE, keywords=["shoes", "zzqx"])], labs(["shoes"]))
+    rows, missing = keywords.lookup(OVERVIEW, SCOPE, ["zzqx"])
+    assert rows == {"zzqx": None}
+    assert missing == []
+
+def test_empty_or_failed_results_store_nothing(tmp_path):
+    keywords = store(tmp_path)
+    keywords.ingest(OVERVIEW, [dict(SCOPE, keywords=["shoes"])], labs([]))
+    failed = {"status_code": 20000, "tasks": [{"status_code": 40501, "result": None}]}
+    keywords.ingest(OVERVIEW, [dict(SCOPE, keywords=["shoes"])], failed)
+    assert keywords.lookup(OVERVIEW, SCOPE, ["shoes"]) == ({}, ["shoes"])
+
+def test_discovery_rows_answer_difficulty_in_its_shape(tmp_path):
+    keywords = store(tmp_path)
+    keywords.ingest(IDEAS, [dict(SCOPE, keywords=["shoes"])], labs(["running shoes"]))
+    rows, missing = keywords.lookup(DIFFICULTY, SCOPE, ["running shoes"])
+    assert rows["running shoes"]["keyword_difficulty"] == 30
+    assert missing == []
+
+def test_other_locations_and_stale_rows_miss(tmp_path):
+    keywords = store(tmp_path, max_age=0)
+    keywords.ingest(OVERVIEW, [dict(SCOPE, keywords=["shoes"])], labs(["shoes"]))
+    assert keywords.lookup(OVERVIEW, SCOPE, ["shoes"]) == ({}, ["shoes"])
+    fresh = store(tmp_path)
+    assert fresh.lookup(OVERVIEW, dict(SCOPE, location_name="Canada"), ["shoes"]) == ({}, ["shoes"])
+
+def test_local_response_has_the_endpoint_shape(tmp_path):
+    keywords = store(tmp_path)
+    keywords.ingest(OVERVIEW, [dict(SCOPE, keywords=["shoes"])], labs(["shoes"]))
+    rows, _ = keywords.lookup(OVERVIEW, SCOPE, ["shoes"])
+    response = keywords.local_response(OVERVIEW, SCOPE, ["shoes"], rows)
+    assert response["cost"] == 0
+    assert response["tasks"][0]["result"][0]["items"][0]["keyword"] == "shoes"
@@ -0,0 +1,67 @@
+"""
+Opportunity scoring: keyword rows of any supported shape are scored with
+one weighted product, filtered and paged server-side.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils.opportunity_scoring import OpportunityTable, flatten_row, volume_change
+
+ROWS = [
+    {"keyword": "shoes", "keyword_info": {"search_volume": 2000, "cpc": 2.5, "competition": 0.5},
+     "keyword_properties": {"keyword_difficulty": 20}},
+    {"keyword_data": {"keyword": "boots", "keyword_info": {"search_volume": 1000, "cpc": 1.0},
+                      "keyword_properties": {"keyword_difficulty": 60}}},
+    {"keyword": "socks", "searchVolume": 600, "cpc": 0.5, "difficulty": 30, "trend": "up"},
+    {"keyword": "laces", "search_volume": 100},
+    {"search_volume": 5000},
+]
+
+def test_flatten_reads_labs_wrapped_search_volume_and_dashboard_rows():
+    assert flatten_row(ROWS[1])["keyword_difficulty"] == 60
+    assert flatten_row(ROWS[2])["search_volume"] == 600
+    assert flatten_row(ROWS[2])["trend"] == 1.0
+    row = flatten_row({"keyword": "k", "competition": "HIGH", "competition_index": 80})
+    assert row["competition"] == 0.8
+
+def test_volume_change_from_trend_block_or_monthly_history():
+    assert volume_change({"search_volume_trend": {"quarterly": 25}}) == 0.25
+    months = [{"year": 2026, "month": m, "search_volume": 100 if m <= 3 else 150} for m in range(1, 7)]
+    assert volume_change({"monthly_searches": months}) == 0.5
+    assert volume_change({"monthly_searches": months[:5]}) is None
+
+def test_default_weights_reproduce_volume_ease_and_cpc():
+    table = OpportunityTable(ROWS)
+    assert len(table) == 4
+    scores = dict(zip(table.keywords, table.score()))
+    assert scores["shoes"] == pytest.approx(2.0 * 0.8 * 2.5)
+    assert scores["boots"] == pytest.approx(1.0 * 0.4 * 1.0)
+    # Missing CPC scores zero; missing difficulty counts as 50
+    assert scores["laces"] == 0
+
+def test_weights_change_the_ranking_and_unknown_weights_fail():
+    table = OpportunityTable(ROWS)
+    table.score()
+    assert [table.keywords[i] for i in table.select(table.mask(), limit=3)] == ["shoes", "boots", "socks"]
+    table.score({"cpc": 0})
+    assert [table.keywords[i] for i in table.select(table.mask(), limit=3)] == ["shoes", "socks", "boots"]
+    assert table.weights["cpc"] == 0
+    with pytest.raises(ValueError):
+        table.score({"clicks": 1})
+
+def test_filters_aggregates_and_paging():
+    table = OpportunityTable(ROWS)
+    table.score()
+    mask = table.mask([["search_volume", ">", 500], ["trend", "=", "up"]])
+    assert [table.keywords[i] for i in table.select(mask)] == ["socks"]
+    aggregates = table.aggregates(table.mask())
+    assert aggregates["quick_wins"] == 2
+    assert aggregates["high_value"] == 1
+    assert aggregates["trending"] == 1
+    page = table.rows(table.select(table.mask(), "search_volume", "asc", offset=1, limit=2))
+    assert [row["keyword"] for row in page] == ["socks", "boots"]
+    with pytest.raises(ValueError):
+        table.mask([["clicks", ">", 1]])
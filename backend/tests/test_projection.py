@@ -0,0 +1,76 @@
+"""
+Projection: routes reduce DataForSEO envelopes to the requested view or
+fields, rejecting unknown ones before any API call is made.
+"""
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils import response_encoding
+from utils.projection import KeywordRow, RankedKeywordRow, SearchVolumeRow, project, projected
+
+def ideas(*keywords, status_code=20000):
+    return {"status_code": 20000, "cost": 0.01, "tasks": [{
+        "status_code": status_code,
+        "status_message": "Ok." if status_code == 20000 else "No data",
+        "result": [{"total_count": 50, "items": [
+            {"keyword": keyword, "keyword_info": {"search_volume": 10, "cpc": 1.5}} for keyword in keywords
+        ]}]
+    }]}
+
+def test_resolve_views_fields_and_the_full_envelope():
+    assert KeywordRow.resolve() is None
+    assert KeywordRow.resolve("full") is None
+    assert KeywordRow.resolve("slim") == KeywordRow.VIEWS["slim"]
+    assert KeywordRow.resolve("all") == tuple(KeywordRow.FIELDS)
+    assert KeywordRow.resolve("slim", "keyword, cpc,keyword") == ("keyword", "cpc")
+    with pytest.raises(ValueError):
+        KeywordRow.resolve("compact")
+    with pytest.raises(ValueError):
+        KeywordRow.resolve(fields=["keyword", "clicks"])
+
+def test_project_concatenates_tasks_and_reports_failed_ones():
+    response = ideas("shoes", "boots")
+    response["tasks"] += ideas("socks")["tasks"] + ideas(status_code=40102)["tasks"]
+    projected_response = project(response, KeywordRow, ("keyword", "cpc"))
+    assert [row.__json__() for row in projected_response["items"]] == [
+        {"keyword": "shoes", "cpc": 1.5}, {"keyword": "boots", "cpc": 1.5}, {"keyword": "socks", "cpc": 1.5}
+    ]
+    assert projected_response["total_count"] == 100
+    assert projected_response["errors"] == [{"status_code": 40102, "status_message": "No data"}]
+
+def test_missing_paths_project_to_none_and_failures_pass_through():
+    item = {"keyword_data": {"keyword": "shoes"}, "ranked_serp_element": None}
+    response = {"status_code": 20000, "tasks": [{"status_code": 20000, "result": [{"items": [item]}]}]}
+    row = project(response, RankedKeywordRow, ("keyword", "position"))["items"][0]
+    assert row.__json__() == {"keyword": "shoes", "position": None}
+    failed = {"status_code": 40100, "status_message": "Unauthorized"}
+    assert project(failed, KeywordRow, ("keyword",)) is failed
+
+def test_result_rows_are_read_from_result_itself():
+    response = {"status_code": 20000, "tasks": [{"status_code": 20000, "result": [
+        {"keyword": "shoes", "search_volume": 10}, {"keyword": "boots", "search_volume": 20}
+    ]}]}
+    rows = project(response, SearchVolumeRow, ("keyword",))["items"]
+    assert [row.keyword for row in rows] == ["shoes", "boots"]
+
+def test_projected_route_validates_before_calling_and_serializes_rows():
+    app = Flask(__name__)
+    app.json = response_encoding.json_provider(app)
+    calls = []
+
+    @app.route('/ideas', methods=['POST'])
+    @projected(KeywordRow)
+    def route():
+        calls.append(1)
+        return ideas("shoes")
+
+    client = app.test_client()
+    assert client.post('/ideas?view=compact', json={}).status_code == 400
+    assert calls == []
+    body = client.post('/ideas', json={"fields": ["keyword", "search_volume"]}).get_json()
+    assert body["items"] == [{"keyword": "shoes", "search_volume": 10}]
+    assert client.post('/ideas', json={}).get_json()["tasks"][0]["result"][0]["total_count"] == 50
@@ -0,0 +1,52 @@
+"""
+Rank check claims: one worker runs each project's daily check, and a run left
+'running' by a worker that died is taken over once it goes stale.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils import rank_store
+from utils.rank_scheduler import RankScheduler
+from utils.rank_store import RankStore, day_number
+
+class RecordingRegistry:
+    def __init__(self):
+        self.started = []
+
+    def start(self, kind, fn, params=None):
+        self.started.append(params)
+        return f"job-{len(self.started)}"
+
+def scheduler(tmp_path):
+    store = RankStore(str(tmp_path / "ranks.db"))
+    project_id = store.create_project("Example", "example.com", ["shoes"])["id"]
+    return RankScheduler(None, store, RecordingRegistry(), interval=0), store, project_id
+
+def test_claim_run_is_exclusive(tmp_path):
+    store = RankStore(str(tmp_path / "ranks.db"))
+    assert store.claim_run(1, 100)
+    assert not store.claim_run(1, 100)
+    store.finish_run(1, 100, "failed")
+    assert not store.claim_run(1, 100)
+    assert store.claim_run(1, 100, retry=True)
+
+def test_tick_skips_runs_already_claimed_today(tmp_path):
+    sched, store, project_id = scheduler(tmp_path)
+    assert sched.tick() == ["job-1"]
+    assert sched.tick() == []
+    store.finish_run(project_id, day_number(), "done")
+    assert sched.tick() == []
+
+def test_tick_takes_over_stale_running_run(tmp_path):
+    sched, store, project_id = scheduler(tmp_path)
+    today = day_number()
+    assert store.claim_run(project_id, today)
+    stale = time.time() - rank_store.RUN_TIMEOUT - 1
+    store._db().execute("UPDATE runs SET started_at = ? WHERE project_id = ?", (stale, project_id))
+    store._db().commit()
+
+    assert sched.tick() == ["job-1"]
+    assert sched.registry.started == [{"project_id": project_id, "day": today}]
+    assert store.run(project_id, today) == "running"
@@ -0,0 +1,135 @@
+"""
+Response cache: every hit is a private copy, so a caller that changes the
+response it got back never changes what later callers read.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils.response_cache import ResponseCache
+
+IDEAS = "dataforseo_labs/google/keyword_ideas/live"
+
+def ideas(count):
+    items = [{"keyword": f"keyword {i}", "keyword_info": {"search_volume": 100 - i}} for i in range(count)]
+    return {"status_code": 20000, "tasks": [{
+        "status_code": 20000,
+        "data": {"keywords": ["shoes"], "limit": count},
+        "result": [{"items_count": count, "items": items}]
+    }]}
+
+def request(limit):
+    return [{"keywords": ["shoes"], "location_name": "United States", "limit": limit}]
+
+def mutate(response):
+    items = response["tasks"][0]["result"][0]["items"]
+    items[0]["keyword_info"]["search_volume"] = -1
+    items.pop()
+    response["tasks"].clear()
+
+def test_changing_a_hit_leaves_the_entry_intact(tmp_path):
+    for cache in (ResponseCache(), ResponseCache(db_path=str(tmp_path / "cache.db"))):
+        cache.set(IDEAS, request(5), ideas(5))
+        mutate(cache.get(IDEAS, request(5)))
+        assert cache.get(IDEAS, request(5)) == ideas(5)
+
+def test_changing_the_stored_response_leaves_the_entry_intact():
+    cache = ResponseCache()
+    response = ideas(5)
+    cache.set(IDEAS, request(5), response)
+    mutate(response)
+    assert cache.get(IDEAS, request(5)) == ideas(5)
+
+def test_changing_a_sliced_hit_leaves_the_superset_intact():
+    cache = ResponseCache()
+    cache.set(IDEAS, request(5), ideas(5))
+    mutate(cache.get(IDEAS, request(3)))
+    assert cache.get(IDEAS, request(5)) == ideas(5)
+
+def test_disk_hit_is_promoted_and_still_copied(tmp_path):
+    path = str(tmp_path / "cache.db")
+    ResponseCache(db_path=path).set(IDEAS, request(5), ideas(5))
+    cache = ResponseCache(db_path=path)
+    mutate(cache.get(IDEAS, request(5)))
+    assert cache.counters["disk_hits"] == 1
+    assert cache.get(IDEAS, request(5)) == ideas(5)
+    assert cache.counters["disk_hits"] == 1
+
+SERP = "serp/google/organic/live/regular"
+
+def serp(depth):
+    items = [{"type": "organic", "rank_group": i, "rank_absolute": i, "url": f"https://site{i}.com/"}
+             for i in range(1, depth + 1)]
+    return {"status_code": 20000, "tasks": [{
+        "status_code": 20000,
+        "data": {"keyword": "shoes", "depth": depth},
+        "result": [{"keyword": "shoes", "items_count": len(items), "items": items}]
+    }]}
+
+def serp_request(depth, keyword="shoes"):
+    return [{"keyword": keyword, "location_name": "United States", "depth": depth}]
+
+def test_ttl_uses_the_longest_matching_prefix():
+    cache = ResponseCache(ttls={"serp/google/": 60})
+    assert cache.ttl_for(SERP) == 60
+    assert cache.ttl_for("dataforseo_labs/google/ranked_keywords/live") == 24 * 3600
+    assert cache.ttl_for("dataforseo_labs/google/keyword_ideas/live") == 12 * 3600
+    assert cache.ttl_for("appendix/user_data") == 0
+
+def test_uncacheable_endpoints_and_failed_responses_are_not_stored():
+    cache = ResponseCache()
+    cache.set("appendix/user_data", [], ideas(1))
+    cache.set(IDEAS, request(5), dict(ideas(5), status_code=40000))
+    assert cache.get("appendix/user_data", []) is None
+    assert cache.get(IDEAS, request(5)) is None
+    assert cache.counters["stores"] == 0
+
+def test_expired_entries_miss(monkeypatch):
+    cache = ResponseCache(ttls={"dataforseo_labs/": 10})
+    now = 1000.0
+    monkeypatch.setattr("utils.response_cache.time.time", lambda: now)
+    cache.set(IDEAS, request(5), ideas(5))
+    now += 11
+    assert cache.get(IDEAS, request(5)) is None
+    assert cache.counters["expirations"] == 1
+
+def test_keyword_spelling_does_not_change_the_key():
+    cache = ResponseCache()
+    cache.set(SERP, serp_request(10, "Running  Shoes"), serp(10))
+    assert cache.get(SERP, serp_request(10, "running shoes")) is not None
+
+def test_smaller_limit_is_sliced_from_a_larger_cached_one():
+    cache = ResponseCache()
+    cache.set(IDEAS, request(5), ideas(5))
+    response = cache.get(IDEAS, request(3))
+    result = response["tasks"][0]["result"][0]
+    assert [item["keyword"] for item in result["items"]] == ["keyword 0", "keyword 1", "keyword 2"]
+    assert result["items_count"] == 3
+    assert response["tasks"][0]["data"]["limit"] == 3
+    assert cache.counters["subsumed_hits"] == 1
+    assert cache.get(IDEAS, request(6)) is None
+
+def test_smaller_depth_keeps_results_ranked_within_it():
+    cache = ResponseCache()
+    serp_100 = serp(100)
+    # A SERP feature spanning two ranks shifts rank_absolute past rank_group
+    serp_100["tasks"][0]["result"][0]["items"][5]["rank_absolute"] = 11
+    cache.set(SERP, serp_request(100), serp_100)
+    result = cache.get(SERP, serp_request(10))["tasks"][0]["result"][0]
+    assert [item["rank_group"] for item in result["items"]] == [1, 2, 3, 4, 5, 7, 8, 9, 10]
+    assert result["items_count"] == 9
+
+def test_smallest_cached_superset_is_sliced(tmp_path):
+    cache = ResponseCache(db_path=str(tmp_path / "cache.db"))
+    for depth in (100, 20, 50):
+        response = serp(depth)
+        response["tasks"][0]["result"][0]["fetched_depth"] = depth
+        cache.set(SERP, serp_request(depth), response)
+    result = cache.get(SERP, serp_request(10))["tasks"][0]["result"][0]
+    assert result["fetched_depth"] == 20
+    assert len(result["items"]) == 10
+    # The SQLite tier answers the same way after a restart
+    result = ResponseCache(db_path=str(tmp_path / "cache.db")).get(SERP, serp_request(30))["tasks"][0]["result"][0]
+    assert result["fetched_depth"] == 50
+    # Other keywords never share a superset
+    assert cache.get(SERP, serp_request(10, "boots")) is None
@@ -0,0 +1,102 @@
+"""
+SERP archive: repeated fetches are stored once, diffs compare organic
+positions, and snapshots fetched to different depths or from different
+endpoint types are never diffed against each other.
+"""
+import os
+import sqlite3
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils import serp_archive
+from utils.serp_archive import SerpArchive
+
+def serp(urls, day, depth=10, result_type="regular"):
+    items = [{"type": "organic", "rank_group": i + 1, "rank_absolute": i + 1, "url": url,
+              "domain": url.split('/')[2], "title": url, "xpath": f"/div[{i}]"} for i, url in enumerate(urls)]
+    return {"status_code": 20000, "tasks": [{
+        "status_code": 20000,
+        "path": ["v3", "serp", "google", "organic", "live", result_type],
+        "data": {"keyword": "shoes", "depth": depth},
+        "result": [{"keyword": "shoes", "se_domain": "google.com", "location_code": 2840,
+                    "language_code": "en", "datetime": f"2026-10-{day:02d} 06:00:00 +00:00",
+                    "items_count": len(items), "items": items}]
+    }]}
+
+def test_same_fetch_is_one_snapshot_and_blocks_are_shared(tmp_path):
+    archive = SerpArchive(str(tmp_path / "serps.db"))
+    first = archive.store(serp(["https://a.com/", "https://b.com/"], 1))
+    assert archive.store(serp(["https://a.com/", "https://b.com/"], 1)) == first
+    archive.store(serp(["https://b.com/", "https://a.com/"], 2))
+    stats = archive.stats()
+    assert stats["snapshots"] == 2
+    # Header plus two items, reused by the reordered SERP
+    assert stats["blocks"] == 3
+
+def test_snapshot_round_trips_without_xpath(tmp_path):
+    archive = SerpArchive(str(tmp_path / "serps.db"))
+    snapshot = archive.snapshot(archive.store(serp(["https://a.com/", "https://b.com/"], 1)))
+    assert [item["url"] for item in snapshot["result"]["items"]] == ["https://a.com/", "https://b.com/"]
+    assert [item["rank_group"] for item in snapshot["result"]["items"]] == [1, 2]
+    assert all("xpath" not in item for item in snapshot["result"]["items"])
+
+def test_diff_reports_entered_left_and_moved(tmp_path):
+    archive = SerpArchive(str(tmp_path / "serps.db"))
+    before = archive.store(serp(["https://a.com/", "https://b.com/", "https://c.com/"], 1))
+    after = archive.store(serp(["https://b.com/", "https://a.com/", "https://d.com/"], 2))
+    diff = archive.diff(before, after)
+    assert diff["entered"] == [{"url": "https://d.com/", "position": 3}]
+    assert diff["left"] == [{"url": "https://c.com/", "position": 3}]
+    assert {m["url"]: m["change"] for m in diff["moved"]} == {"https://b.com/": 1, "https://a.com/": -1}
+    assert diff["unchanged"] == 0
+
+def test_depth_and_result_type_are_separate_series(tmp_path):
+    archive = SerpArchive(str(tmp_path / "serps.db"))
+    shallow = archive.store(serp(["https://a.com/"], 1, depth=10))
+    deep = archive.store(serp(["https://a.com/", "https://b.com/"], 2, depth=100))
+    advanced = archive.store(serp(["https://a.com/"], 3, result_type="advanced"))
+    with pytest.raises(ValueError):
+        archive.diff(shallow, deep)
+    with pytest.raises(ValueError):
+        archive.diff(shallow, advanced)
+    # The newest snapshot has no earlier one in its series
+    assert archive.latest("shoes") is None
+    newer = archive.store(serp(["https://b.com/"], 4, depth=10))
+    assert archive.latest("shoes") == (shallow, newer)
+
+def test_old_series_table_is_migrated(tmp_path):
+    path = str(tmp_path / "serps.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE series (id INTEGER PRIMARY KEY, keyword TEXT NOT NULL, se_domain TEXT NOT NULL, "
+                 "location_code INTEGER NOT NULL, language_code TEXT NOT NULL, "
+                 "UNIQUE (keyword, location_code, language_code, se_domain))")
+    conn.execute("INSERT INTO series VALUES (1, 'shoes', 'google.com', 2840, 'en')")
+    conn.commit()
+    conn.close()
+    archive = SerpArchive(path)
+    archive.store(serp(["https://a.com/"], 1, depth=10))
+    archive.store(serp(["https://a.com/"], 2, depth=100))
+    assert archive._db().execute("SELECT COUNT(*) FROM series").fetchone()[0] == 3
+
+def test_dictionary_is_trained_off_the_store_call(tmp_path, monkeypatch):
+    monkeypatch.setattr(serp_archive, "TRAIN_SAMPLES", 20)
+    archive = SerpArchive(str(tmp_path / "serps.db"))
+    trained = threading.Event()
+    threads = []
+    train = archive.train
+
+    def recording_train():
+        threads.append(threading.current_thread())
+        result = train()
+        trained.set()
+        return result
+
+    archive.train = recording_train
+    for day in range(1, 4):
+        archive.store(serp([f"https://site{day}-{i}.com/" for i in range(10)], day))
+    assert trained.wait(5)
+    assert threads and threads[0] is not threading.current_thread()
+    assert archive._current
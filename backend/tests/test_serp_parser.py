@@ -0,0 +1,46 @@
+"""
+SERP parser: one pass over a SERP's items yields feature flags, the
+featured snippet owner, local pack, People Also Ask and organic arrays.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils.serp_parser import parse_response, parse_serp
+
+RESULT = {
+    "keyword": "shoes",
+    "se_results_count": 1000000,
+    "item_types": ["featured_snippet", "organic", "people_also_ask", "local_pack", "video"],
+    "items": [
+        {"type": "featured_snippet", "domain": "a.com", "url": "https://a.com/", "title": "A", "rank_absolute": 1},
+        {"type": "organic", "rank_group": 1, "rank_absolute": 2, "domain": "a.com", "url": "https://a.com/", "title": "A"},
+        {"type": "people_also_ask", "items": [{"title": "What shoes?"}, {"title": None}, {"title": "Why shoes?"}]},
+        {"type": "local_pack", "title": "Shop", "domain": "shop.com", "rating": {"value": 4.5, "votes_count": 10},
+         "rank_group": 1},
+        {"type": "organic", "rank_group": 2, "rank_absolute": 5, "domain": "b.com", "url": "https://b.com/", "title": "B"},
+    ]
+}
+
+def test_organic_results_become_parallel_arrays():
+    organic = parse_serp(RESULT)["organic"]
+    assert organic["position"] == [1, 2]
+    assert organic["rank_absolute"] == [2, 5]
+    assert organic["domain"] == ["a.com", "b.com"]
+
+def test_features_and_their_details():
+    parsed = parse_serp(RESULT)
+    assert parsed["featured_snippet"]["domain"] == "a.com"
+    assert parsed["people_also_ask"] == ["What shoes?", "Why shoes?"]
+    assert parsed["local_pack"][0]["rating"] == 4.5
+    assert parsed["local_pack"][0]["is_paid"] is False
+    assert parsed["features"]["local_pack"] and not parsed["features"]["shopping"]
+    # Features listed in item_types count even past the requested depth
+    assert parsed["features"]["video"]
+    assert parsed["item_types"][:4] == ["featured_snippet", "organic", "people_also_ask", "local_pack"]
+
+def test_failed_or_empty_responses_parse_to_none():
+    assert parse_response({"status_code": 20000, "tasks": [{"status_code": 40000}]}) is None
+    assert parse_response({"status_code": 20000, "tasks": [{"status_code": 20000, "result": []}]}) is None
+    response = {"status_code": 20000, "tasks": [{"status_code": 20000, "result": [RESULT]}]}
+    assert parse_response(response)["keyword"] == "shoes"
@@ -0,0 +1,64 @@
+"""
+Singleflight: concurrent identical calls run once, and every caller gets a
+result of its own.
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from utils.singleflight import SingleFlight
+
+def test_concurrent_callers_share_one_call_but_not_its_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(1)
+        return {"items": [1, 2, 3]}
+
+    results = []
+
+    def caller():
+        result = flight.do("key", fetch)
+        results.append(result)
+        result["items"].clear()
+
+    threads = [threading.Thread(target=caller) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while flight.counters["coalesced"] < 4:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len({id(result) for result in results}) == 5
+
+def test_followers_see_the_leaders_error():
+    flight = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def fail():
+        release.wait(1)
+        raise RuntimeError("upstream down")
+
+    def caller():
+        try:
+            flight.do("key", fail)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=caller) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while flight.counters["coalesced"] < 2:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert errors == ["upstream down"] * 3
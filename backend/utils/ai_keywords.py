@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+AI Keyword Suggestions
+This module generates related keywords with an OpenAI-compatible chat model
+through one pooled client, caches the generated lists, and starts keyword
+metric lookups while the model is still streaming its answer.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import openai
+from utils import deadlines
+from utils.keyword_chunking import normalize_keyword, merge_keyword_responses
+
+OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+# Point at any OpenAI-compatible server, e.g. a local stub when testing
+OPENAI_BASE_URL = os.environ.get('OPENAI_BASE_URL') or None
+DEFAULT_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-3.5-turbo')
+DEFAULT_TIMEOUT = float(os.environ.get('OPENAI_TIMEOUT', 30))
+SUGGESTIONS_CACHE_TTL = float(os.environ.get('AI_SUGGESTIONS_CACHE_TTL', 24 * 3600))
+MAX_CACHED_SUGGESTIONS = 1024
+# Keywords per keyword_overview call started while the model is streaming;
+# each call is billed as a task, so smaller batches overlap more but cost more
+METRICS_BATCH_SIZE = int(os.environ.get('AI_SUGGESTIONS_METRICS_BATCH', 10))
+MAX_METRIC_LOOKUPS = 4
+
+SYSTEM_PROMPT = """You are a professional SEO keyword researcher.
+    Generate semantically related keywords that would be valuable for content creation and SEO.
+    Focus on a mix of:
+    1. Related terms with high search intent
+    2. Questions people might ask about this topic
+    3. Long-tail variations with commercial/informational intent
+    4. Industry-specific terminology
+
+    Return ONLY a JSON array of strings with no explanation, introduction or other text.
+    Example output format: {"keywords": ["keyword one", "keyword two", "keyword three"...]}
+    """
+
+_llm_client = None
+_llm_client_lock = threading.Lock()
+
+def llm_configured():
+    """Whether an API key or an OpenAI-compatible base URL is configured."""
+    return bool(OPENAI_API_KEY or OPENAI_BASE_URL)
+
+def get_llm_client():
+    """
+    Get the process-wide OpenAI client
+
+    The client owns a pooled HTTP connection, so every suggestion request
+    reuses warm connections instead of opening new ones.
+
+    Returns:
+        openai.OpenAI: Shared client
+    """
+    global _llm_client
+    with _llm_client_lock:
+        if _llm_client is None:
+            _llm_client = openai.OpenAI(
+                # A stub server needs no real key, but the SDK insists on one
+                api_key=OPENAI_API_KEY or "stub",
+                base_url=OPENAI_BASE_URL,
+                timeout=DEFAULT_TIMEOUT
+            )
+    return _llm_client
+
+class KeywordListParser:
+    """
+    Incremental parser for a streamed {"keywords": ["...", ...]} answer.
+
+    feed() returns every keyword string completed by the new text, so
+    keywords can be used before the model has finished the list.
+    """
+    def __init__(self):
+        self.buffer = ""
+        self.position = None
+        self.done = False
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, text):
+        """
+        Add streamed text
+
+        Args:
+            text (str): Next piece of the model's output
+
+        Returns:
+            list: Keywords completed by this piece
+        """
+        self.buffer += text
+        keywords = []
+        if self.position is None:
+            start = self.buffer.find('[')
+            if start < 0:
+                return keywords
+            self.position = start + 1
+        while not self.done:
+            i = self.position
+            while i < len(self.buffer) and self.buffer[i] in ' \t\r\n,':
+                i += 1
+            self.position = i
+            if i >= len(self.buffer):
+                break
+            if self.buffer[i] != '"':
+                # End of the list, or something other than strings
+                self.done = True
+                break
+            try:
+                value, self.position = self._decoder.raw_decode(self.buffer, i)
+            except json.JSONDecodeError:
+                break
+            keywords.append(value)
+        return keywords
+
+def _full_parse(text):
+    """Keywords of a complete answer, for output the incremental parser could not follow."""
+    try:
+        result = json.loads(text)
+    except json.JSONDecodeError:
+        return []
+    if isinstance(result, dict):
+        result = result.get("keywords", [])
+    return [keyword for keyword in result if isinstance(keyword, str)] if isinstance(result, list) else []
+
+def stream_keyword_suggestions(keyword, industry='', limit=15):
+    """
+    Generate related keywords, yielding each one as soon as it is complete
+
+    Args:
+        keyword (str): The seed keyword
+        industry (str): Optional industry for context
+        limit (int): Maximum number of keywords to generate
+
+    Yields:
+        str: Distinct keywords, at most limit
+    """
+    industry_context = f" in the {industry} industry" if industry else ""
+    user_prompt = f"Generate {limit} semantically related keywords for '{keyword}'{industry_context}. Make sure they're diverse but relevant."
+    stream = get_llm_client().chat.completions.create(
+        model=DEFAULT_MODEL,
+        response_format={"type": "json_object"},
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ],
+        temperature=0.7,
+        max_tokens=1000,
+        stream=True
+    )
+
+    parser = KeywordListParser()
+    seen = set()
+    def fresh(candidates):
+        for candidate in candidates:
+            candidate = candidate.strip()
+            normalized = normalize_keyword(candidate)
+            if normalized and normalized not in seen and len(seen) < limit:
+                seen.add(normalized)
+                yield candidate
+
+    try:
+        for chunk in stream:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                yield from fresh(parser.feed(text))
+    finally:
+        stream.close()
+    if not seen:
+        yield from fresh(_full_parse(parser.buffer))
+
+_suggestion_cache = OrderedDict()
+_suggestion_cache_lock = threading.Lock()
+
+def _cache_key(keyword, industry, limit):
+    return normalize_keyword(keyword), (industry or '').strip().lower(), int(limit)
+
+def cached_suggestions(keyword, industry='', limit=15):
+    """
+    Get a previously generated keyword list
+
+    Returns:
+        list: Keywords, or None on a miss
+    """
+    key = _cache_key(keyword, industry, limit)
+    with _suggestion_cache_lock:
+        entry = _suggestion_cache.get(key)
+        if entry is None or entry[0] <= time.time():
+            return None
+        _suggestion_cache.move_to_end(key)
+        return list(entry[1])
+
+def remember_suggestions(keyword, industry, limit, keywords):
+    """Cache a complete generated keyword list."""
+    key = _cache_key(keyword, industry, limit)
+    with _suggestion_cache_lock:
+        _suggestion_cache[key] = (time.time() + SUGGESTIONS_CACHE_TTL, list(keywords))
+        _suggestion_cache.move_to_end(key)
+        while len(_suggestion_cache) > MAX_CACHED_SUGGESTIONS:
+            _suggestion_cache.popitem(last=False)
+
+def generate_keyword_suggestions(keyword, industry='', limit=15):
+    """
+    Generate related keywords, from the cache when the same list was generated before
+
+    Args:
+        keyword (str): The seed keyword
+        industry (str): Optional industry for context
+        limit (int): Maximum number of keywords to generate
+
+    Returns:
+        list: Generated keywords
+    """
+    keywords = cached_suggestions(keyword, industry, limit)
+    if keywords is None:
+        keywords = list(stream_keyword_suggestions(keyword, industry, limit))
+        if keywords:
+            remember_suggestions(keyword, industry, limit, keywords)
+    return keywords
+
+def suggest_with_metrics(client, keyword, industry='', limit=15, location="United States", language="English"):
+    """
+    Generate related keywords and look up their metrics
+
+    Metric lookups for each batch of METRICS_BATCH_SIZE keywords start as
+    soon as the model has streamed that batch, so the DataForSEO calls run
+    while the model is still writing the rest of the list.
+
+    Args:
+        client (DataForSEOClient): Client used for keyword_overview lookups
+        keyword (str): The seed keyword
+        industry (str): Optional industry for context
+        limit (int): Maximum number of keywords to generate
+        location (str): Location name
+        language (str): Language name
+
+    Returns:
+        tuple: (generated keywords, merged keyword_overview response or None
+            when nothing was generated, whether the list came from the cache)
+    """
+    keywords = cached_suggestions(keyword, industry, limit)
+    if keywords is not None:
+        return keywords, client.get_keyword_overview(keywords, location, language), True
+
+    keywords, chunks, futures = [], [], []
+    lookup = deadlines.bind(lambda batch: client.get_keyword_overview(batch, location, language))
+    complete = False
+    with ThreadPoolExecutor(max_workers=MAX_METRIC_LOOKUPS, thread_name_prefix="ai-metrics") as pool:
+        batch = []
+        try:
+            for suggestion in stream_keyword_suggestions(keyword, industry, limit):
+                keywords.append(suggestion)
+                batch.append(suggestion)
+                if len(batch) >= METRICS_BATCH_SIZE:
+                    chunks.append(batch)
+                    futures.append(pool.submit(lookup, batch))
+                    batch = []
+            complete = True
+        except Exception as e:
+            # Keep what was streamed before the failure, but do not cache it
+            print(f"Error generating AI keywords: {str(e)}")
+        if batch:
+            chunks.append(batch)
+            futures.append(pool.submit(lookup, batch))
+        responses = [future.result() for future in futures]
+
+    if not keywords:
+        return [], None, False
+    if complete:
+        remember_suggestions(keyword, industry, limit, keywords)
+    return keywords, merge_keyword_responses(responses, keywords, chunks), False
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Async DataForSEO API Client
+This module provides an asyncio counterpart of DataForSEOClient built on httpx,
+so callers can fan out many upstream calls over a single event loop.
+"""
+import asyncio
+import json
+import os
+import time
+import httpx
+from utils import deadlines
+from utils.hedging import latency_tracker
+from utils.dataforseo_client import DataForSEOClient, DEFAULT_POOL_MAXSIZE
+from utils.task_queue import TaskQueue
+from utils.batcher import chunked, max_tasks_for, split_batch_response
+from utils.keyword_chunking import chunk_keywords, dedupe_keywords, keyword_limit
+
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get('DATAFORSEO_MAX_CONCURRENCY', 10))
+
+class AsyncDataForSEOClient(DataForSEOClient):
+    """
+    Asyncio client for the DataForSEO API.
+
+    Every ``get_*`` method is inherited from DataForSEOClient: those methods only
+    build the task payload and hand it to ``make_request``, which here is a
+    coroutine, so each of them returns an awaitable with the same result shape
+    as the sync client. All calls share one httpx connection pool and one
+    semaphore that caps how many upstream requests are in flight at once.
+
+    Example:
+        async with AsyncDataForSEOClient() as client:
+            volume, difficulty = await client.gather_many([
+                client.get_search_volume(keywords),
+                client.get_keyword_difficulty(keywords)
+            ])
+    """
+    def __init__(self, username=None, password=None, base_url=None,
+                 max_connections=None, max_keepalive_connections=None,
+                 connect_timeout=None, read_timeout=None, max_concurrency=None, cache=None,
+                 keyword_store=None):
+        """
+        Initialize the client with credentials from environment variables or provided values.
+
+        Args:
+            username (str): DataForSEO login
+            password (str): DataForSEO password
+            base_url (str): API root, mainly useful for pointing at a stub server
+            max_connections (int): Maximum open connections in the pool
+            max_keepalive_connections (int): Idle connections kept open for reuse
+            connect_timeout (float): Seconds to wait for a connection
+            read_timeout (float): Seconds to wait for the response
+            max_concurrency (int): Maximum upstream requests in flight at once
+            cache (ResponseCache): Response cache; defaults to the shared
+                process-wide cache, pass False to disable caching
+            keyword_store (KeywordStore): Per-keyword metrics store; defaults to
+                the shared store, pass False to disable
+        """
+        super().__init__(username, password, base_url=base_url,
+                         connect_timeout=connect_timeout, read_timeout=read_timeout, cache=cache,
+                         singleflight=False, batch_window=0, keyword_store=keyword_store)
+        self.max_connections = max_connections or DEFAULT_POOL_MAXSIZE
+        self.max_keepalive_connections = max_keepalive_connections or self.max_connections
+        self.max_concurrency = max_concurrency or DEFAULT_MAX_CONCURRENCY
+        self._client = None
+        self._semaphore = None
+
+    def _create_session(self, pool_connections, pool_maxsize, pool_block, keep_alive):
+        """The httpx client is bound to an event loop, so it is created lazily in _get_client."""
+        return None
+
+    def _get_task_queue(self):
+        """
+        Queued tasks are polled from a background thread, so they use a sync
+        client sharing these credentials; wrap the returned futures with
+        ``asyncio.wrap_future`` to await them.
+        """
+        with self._task_queue_lock:
+            if self._task_queue is None:
+                self._task_queue = TaskQueue(DataForSEOClient(
+                    self.username, self.password, base_url=self.base_url, cache=self.cache or False,
+                    keyword_store=self.keyword_store or False
+                ))
+            return self._task_queue
+
+    def _get_client(self):
+        """
+        Get the shared httpx client and semaphore, creating them on the running loop
+
+        Returns:
+            httpx.AsyncClient: Pooled async HTTP client
+        """
+        if self._client is None:
+            connect_timeout, read_timeout = self.timeout
+            self._client = httpx.AsyncClient(
+                headers={
+                    'Authorization': self.auth_header,
+                    'Content-Type': 'application/json'
+                },
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections
+                ),
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def close(self):
+        """Close all pooled connections held by the client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def test_connection(self):
+        """
+        Test the connection to the DataForSEO API with the current credentials
+
+        Returns:
+            dict: Success status and message
+        """
+        try:
+            client = self._get_client()
+            async with self._semaphore:
+                response = await client.get(f"{self.base_url}/appendix/user_data")
+            if response.status_code == 200:
+                return {
+                    "success": True,
+                    "message": "Connection successful"
+                }
+            else:
+                return {
+                    "success": False,
+                    "message": f"API returned status code {response.status_code}: {response.text}"
+                }
+        except Exception as e:
+            return {
+                "success": False,
+                "message": str(e)
+            }
+
+    async def make_request(self, endpoint, data):
+        """
+        Make a request to the DataForSEO API, answering from the response cache when possible
+
+        Args:
+            endpoint (str): API endpoint to call
+            data (dict): Data to send with the request
+
+        Returns:
+            dict: Response from the API
+        """
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, data)
+            if cached is not None:
+                return cached
+
+        response = await self._post(endpoint, data)
+
+        self._remember(endpoint, data, response)
+        return response
+
+    async def _post(self, endpoint, data):
+        """
+        Send a request to the DataForSEO API over the pooled httpx client
+
+        Args:
+            endpoint (str): API endpoint to call
+            data (dict): Data to send with the request
+
+        Returns:
+            dict: Response from the API
+        """
+        return await self._send("POST", endpoint, data)
+
+    async def _send(self, method, endpoint, data=None):
+        """
+        Send one logical request within the current deadline
+
+        Same policy as the sync client: idempotent calls are retried on
+        transient failures with jittered backoff and hedged past the
+        endpoint's p95 when a hedger is configured. The deadline is the one
+        set by the caller's context (asyncio tasks inherit it).
+
+        Args:
+            method (str): HTTP method
+            endpoint (str): API endpoint to call
+            data (dict): Data to send with the request
+
+        Returns:
+            dict: Response from the API
+        """
+        idempotent = deadlines.is_idempotent(method, endpoint)
+        attempts = 1 + (self.max_retries if idempotent else 0)
+
+        for attempt in range(attempts):
+            if deadlines.remaining(endpoint) <= 0:
+                deadlines.call_stats.incr("deadline_exceeded")
+                return deadlines.deadline_exceeded(endpoint)
+
+            if idempotent and self.hedger is not None:
+                response = await self.hedger.run_async(endpoint, lambda: self._send_once(method, endpoint, data))
+            else:
+                response = await self._send_once(method, endpoint, data)
+
+            if attempt == attempts - 1 or not deadlines.is_retryable(response):
+                return response
+
+            delay = deadlines.backoff_delay(attempt)
+            if delay >= deadlines.remaining(endpoint):
+                return response
+            deadlines.call_stats.incr("retries")
+            await asyncio.sleep(delay)
+        return response
+
+    async def _send_once(self, method, endpoint, data=None):
+        """
+        Send one HTTP request, waiting for a concurrency slot and room in the
+        shared rate limits first, never past the call's remaining budget
+
+        Args:
+            method (str): HTTP method
+            endpoint (str): API endpoint to call
+            data (dict): Data to send with the request
+
+        Returns:
+            dict: Response from the API
+        """
+        url = f"{self.base_url}/{endpoint}"
+        client = self._get_client()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), max(deadlines.remaining(endpoint), 0))
+        except asyncio.TimeoutError:
+            deadlines.call_stats.incr("deadline_exceeded")
+            return deadlines.deadline_exceeded(endpoint)
+
+        slots = None
+        try:
+            if self.rate_limiter is not None:
+                # The shared limiter sleeps while queued, so wait on it off the loop
+                slots = await asyncio.to_thread(self.rate_limiter.acquire, endpoint, deadlines.remaining(endpoint))
+                if slots is None:
+                    deadlines.call_stats.incr("deadline_exceeded")
+                    return deadlines.deadline_exceeded(endpoint)
+
+            # Never wait on the socket longer than the call's remaining budget
+            read_timeout = max(min(self.timeout[1], deadlines.remaining(endpoint)), 0.001)
+            body = json.dumps(data) if data is not None else None
+            started = time.monotonic()
+            response = await client.request(
+                method, url, content=body, timeout=httpx.Timeout(read_timeout, connect=self.timeout[0])
+            )
+            result = response.json()
+            if response.is_success:
+                latency_tracker.record(endpoint, time.monotonic() - started)
+            elif not isinstance(result, dict) or result.get('status_code') == 20000:
+                result = {"status_code": response.status_code, "status_message": response.text[:500]}
+            return result
+        except httpx.TimeoutException as e:
+            deadlines.call_stats.incr("timeouts")
+            return {
+                "status_code": 504,
+                "status_message": f"Timed out calling {endpoint}: {str(e)}"
+            }
+        except Exception as e:
+            return {
+                "status_code": 500,
+                "status_message": f"Error making request: {str(e)}"
+            }
+        finally:
+            if slots:
+                self.rate_limiter.release(slots)
+            self._semaphore.release()
+
+    async def make_batch_request(self, endpoint, tasks, keys=None):
+        """
+        Send many tasks for one endpoint as concurrent multi-task POSTs
+
+        Args:
+            endpoint (str): API endpoint to call
+            tasks (list): Task objects
+            keys (list): Optional labels, one per task
+
+        Returns:
+            list|dict: Single-task responses in task order, or keyed by keys when given
+        """
+        responses = [None] * len(tasks)
+        if self.cache is not None:
+            for i, task in enumerate(tasks):
+                responses[i] = self.cache.get(endpoint, [task])
+
+        missing = [i for i, response in enumerate(responses) if response is None]
+        chunks = chunked(missing, max_tasks_for(endpoint))
+        posted = await asyncio.gather(*[
+            self._post(endpoint, [tasks[i] for i in chunk]) for chunk in chunks
+        ])
+        for chunk, response in zip(chunks, posted):
+            for i, task_response in zip(chunk, split_batch_response(response, len(chunk))):
+                responses[i] = task_response
+                self._remember(endpoint, [tasks[i]], task_response)
+
+        if keys is not None:
+            return dict(zip(keys, responses))
+        return responses
+
+    async def make_keyword_request(self, endpoint, task, keywords):
+        """
+        Make a keyword-list request, splitting it at the endpoint's keyword limit
+
+        Args:
+            endpoint (str): API endpoint to call
+            task (dict): Task fields other than keywords
+            keywords (list): Keywords to look up
+
+        Returns:
+            dict: Response from the API, with per-chunk status when it was split
+        """
+        keywords = dedupe_keywords(keywords)
+        stored, missing = self._lookup_keywords(endpoint, task, keywords)
+        limit = keyword_limit(endpoint)
+        if not stored and (not limit or len(keywords) <= limit):
+            return await self.make_request(endpoint, [dict(task, keywords=keywords)])
+
+        chunks = chunk_keywords(missing, limit or len(missing)) if missing else []
+        responses = await asyncio.gather(*[
+            self.make_request(endpoint, [dict(task, keywords=chunk)]) for chunk in chunks
+        ])
+        return self._merge_stored(endpoint, task, keywords, list(responses), chunks, stored)
+
+    async def gather_many(self, calls, return_exceptions=True):
+        """
+        Run many client calls concurrently under the shared semaphore
+
+        Args:
+            calls (list|dict): Awaitables such as ``client.get_serp_data(kw)``,
+                either as a list or as a dict keyed by any label
+            return_exceptions (bool): Return exceptions in place instead of raising
+
+        Returns:
+            list|dict: Results in the same order (or under the same keys) as calls
+        """
+        if isinstance(calls, dict):
+            keys = list(calls.keys())
+            results = await asyncio.gather(*calls.values(), return_exceptions=return_exceptions)
+            return dict(zip(keys, results))
+        return await asyncio.gather(*calls, return_exceptions=return_exceptions)
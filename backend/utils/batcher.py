@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+DataForSEO Task Batching
+This module packs several task objects for the same endpoint into one
+multi-task POST and routes each ``tasks[i]`` result back to its caller.
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future
+from utils import deadlines
+
+# DataForSEO v3 accepts up to 100 task objects per POST. Endpoints that only
+# take a single task are capped at 1, which makes the batcher send one POST
+# per task instead.
+DEFAULT_MAX_BATCH_TASKS = int(os.environ.get('DATAFORSEO_MAX_BATCH_TASKS', 100))
+MAX_BATCH_TASKS = {}
+# Live SERP and Keywords Data (Google Ads) endpoints take one task per call
+SINGLE_TASK_LIVE_APIS = ("serp/", "keywords_data/")
+DEFAULT_BATCH_WINDOW = float(os.environ.get('DATAFORSEO_BATCH_WINDOW_MS', 0)) / 1000.0
+
+def max_tasks_for(endpoint):
+    """
+    Get the number of tasks an endpoint accepts per POST
+
+    Args:
+        endpoint (str): API endpoint
+
+    Returns:
+        int: Maximum tasks per request
+    """
+    if endpoint in MAX_BATCH_TASKS:
+        return MAX_BATCH_TASKS[endpoint]
+    if endpoint.startswith(SINGLE_TASK_LIVE_APIS) and "/live" in endpoint:
+        return 1
+    return DEFAULT_MAX_BATCH_TASKS
+
+def chunked(items, size):
+    """Split a list into consecutive chunks of at most size items."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def split_batch_response(response, count):
+    """
+    Split a multi-task response into one single-task envelope per submitted task
+
+    Args:
+        response (dict): Response to a POST carrying count tasks
+        count (int): Number of tasks that were sent
+
+    Returns:
+        list: count responses shaped like single-task calls, in submission order
+    """
+    tasks = response.get('tasks') if isinstance(response, dict) else None
+    if not isinstance(tasks, list):
+        return [response] * count
+
+    envelopes = []
+    for i in range(count):
+        if i < len(tasks):
+            task = tasks[i]
+            envelopes.append(dict(
+                response,
+                tasks=[task],
+                tasks_count=1,
+                tasks_error=0 if task.get('status_code') == 20000 else 1,
+                cost=task.get('cost', response.get('cost'))
+            ))
+        else:
+            envelopes.append(dict(
+                response,
+                status_code=500,
+                status_message="Task missing from batch response",
+                tasks=[],
+                tasks_count=0,
+                tasks_error=1
+            ))
+    return envelopes
+
+class _Batch:
+    """Tasks collected for one endpoint during a batching window."""
+    __slots__ = ('tasks', 'futures', 'deadline')
+
+    def __init__(self):
+        self.tasks = []
+        self.futures = []
+        self.deadline = None
+
+    def add(self, task, future):
+        """Add a task, tightening the batch deadline to the submitting request's."""
+        self.tasks.append(task)
+        self.futures.append(future)
+        deadline = deadlines.current()
+        if deadline is not None and (self.deadline is None or deadline < self.deadline):
+            self.deadline = deadline
+
+class MicroBatcher:
+    """
+    Collect single tasks submitted for the same endpoint over a short window
+    and send them together.
+
+    ``send(endpoint, tasks)`` must return one response per task, in order;
+    DataForSEOClient passes its ``_post_batch`` method. A batch is flushed when
+    its window elapses or when it reaches the endpoint's task limit, whichever
+    comes first.
+    """
+    def __init__(self, send, window=None):
+        """
+        Initialize the batcher
+
+        Args:
+            send (callable): Sends a list of tasks and returns their responses
+            window (float): Seconds to wait for more tasks before sending
+        """
+        self.send = send
+        self.window = window if window is not None else DEFAULT_BATCH_WINDOW
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.counters = {
+            "tasks": 0,
+            "batches": 0
+        }
+
+    def submit(self, endpoint, task):
+        """
+        Queue a task for the next batch to its endpoint
+
+        Args:
+            endpoint (str): API endpoint
+            task (dict): Single task object
+
+        Returns:
+            Future: Resolves to the task's single-task response
+        """
+        future = Future()
+        if max_tasks_for(endpoint) <= 1:
+            with self._lock:
+                self.counters["tasks"] += 1
+            batch = _Batch()
+            batch.add(task, future)
+            self._send(endpoint, batch)
+            return future
+        full = None
+        with self._lock:
+            batch = self._pending.get(endpoint)
+            if batch is None:
+                batch = _Batch()
+                self._pending[endpoint] = batch
+                timer = threading.Timer(self.window, self._flush_window, (endpoint, batch))
+                timer.daemon = True
+                timer.start()
+            batch.add(task, future)
+            self.counters["tasks"] += 1
+            if len(batch.tasks) >= max_tasks_for(endpoint):
+                full = self._pending.pop(endpoint)
+        if full is not None:
+            self._send(endpoint, full)
+        return future
+
+    def _flush_window(self, endpoint, batch):
+        with self._lock:
+            if self._pending.get(endpoint) is not batch:
+                return  # already flushed because it filled up
+            self._pending.pop(endpoint)
+        self._send(endpoint, batch)
+
+    def _send(self, endpoint, batch):
+        """
+        Send a batch under the tightest deadline of the requests in it
+
+        The window flush runs on a timer thread, which has no request
+        deadline of its own, so the batch's deadline is installed explicitly.
+        """
+        with self._lock:
+            self.counters["batches"] += 1
+        token = deadlines.start(batch.deadline - time.monotonic()) if batch.deadline is not None else None
+        try:
+            responses = self.send(endpoint, batch.tasks)
+        except BaseException as e:
+            for future in batch.futures:
+                future.set_exception(e)
+            return
+        finally:
+            if token is not None:
+                deadlines.reset(token)
+        for future, response in zip(batch.futures, responses):
+            future.set_result(response)
+
+    def stats(self):
+        """
+        Get batching counters
+
+        Returns:
+            dict: Tasks submitted, batches sent and average batch size
+        """
+        with self._lock:
+            stats = dict(self.counters)
+        stats["avg_batch_size"] = round(stats["tasks"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
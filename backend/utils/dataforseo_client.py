@@ -7,23 +7,147 @@ import requests
 import json
 import base64
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from utils.response_cache import get_default_cache, make_key
+from utils.singleflight import WaitTimeout, get_default_singleflight
+from utils.batcher import (
+    MicroBatcher, DEFAULT_BATCH_WINDOW, chunked, max_tasks_for, split_batch_response
+)
+from utils.keyword_chunking import (
+    DEFAULT_CHUNK_CONCURRENCY, chunk_keywords, dedupe_keywords, keyword_limit, merge_keyword_responses
+)
+from utils.task_queue import TaskQueue
+from utils.rate_limiter import get_default_rate_limiter
+from utils.hedging import get_default_hedger, latency_tracker
+from utils.keyword_store import get_default_keyword_store
+from utils import deadlines
 
 load_dotenv()
 
+# Transport tuning (overridable per client or through the environment)
+DEFAULT_BASE_URL = os.environ.get('DATAFORSEO_BASE_URL', 'https://api.dataforseo.com/v3')
+DEFAULT_POOL_CONNECTIONS = int(os.environ.get('DATAFORSEO_POOL_CONNECTIONS', 4))
+DEFAULT_POOL_MAXSIZE = int(os.environ.get('DATAFORSEO_POOL_MAXSIZE', 16))
+DEFAULT_POOL_BLOCK = os.environ.get('DATAFORSEO_POOL_BLOCK', 'False').lower() == 'true'
+DEFAULT_KEEP_ALIVE = os.environ.get('DATAFORSEO_KEEP_ALIVE', 'True').lower() == 'true'
+DEFAULT_CONNECT_TIMEOUT = float(os.environ.get('DATAFORSEO_CONNECT_TIMEOUT', 5))
+DEFAULT_READ_TIMEOUT = float(os.environ.get('DATAFORSEO_READ_TIMEOUT', 120))
+
 class DataForSEOClient:
     """
     Client class for interacting with the DataForSEO API.
+
+    Every call goes through one pooled, keep-alive ``requests.Session`` owned by
+    the client, so repeated calls reuse open TCP/TLS connections instead of
+    paying a fresh handshake each time.
+
+    The ``get_*`` methods only build task payloads and delegate to
+    ``make_request``; AsyncDataForSEOClient reuses them unchanged on top of an
+    async transport.
     """
-    def __init__(self, username=None, password=None):
-        """Initialize the client with credentials from environment variables or provided values."""
+    def __init__(self, username=None, password=None, base_url=None,
+                 pool_connections=None, pool_maxsize=None, pool_block=None,
+                 keep_alive=None, connect_timeout=None, read_timeout=None, cache=None,
+                 singleflight=None, batch_window=None, rate_limiter=None, hedger=None,
+                 max_retries=None, keyword_store=None):
+        """
+        Initialize the client with credentials from environment variables or provided values.
+
+        Args:
+            username (str): DataForSEO login
+            password (str): DataForSEO password
+            base_url (str): API root, mainly useful for pointing at a stub server
+            pool_connections (int): Number of per-host connection pools to keep
+            pool_maxsize (int): Maximum open connections kept per host
+            pool_block (bool): Block instead of opening extra connections past pool_maxsize
+            keep_alive (bool): Keep connections open between requests
+            connect_timeout (float): Seconds to wait for a connection
+            read_timeout (float): Seconds to wait for the response
+            cache (ResponseCache): Response cache; defaults to the shared
+                process-wide cache, pass False to disable caching
+            singleflight (SingleFlight): Coalescer for identical in-flight calls;
+                defaults to the shared process-wide one, pass False to disable
+            batch_window (float): Seconds to collect concurrent single-task calls
+                to the same endpoint into one multi-task POST; 0 disables it
+            rate_limiter (RateLimiter): Host-wide request budgets; defaults to the
+                shared limiter, pass False to disable
+            hedger (Hedger): Races a backup call against slow idempotent calls;
+                defaults to the shared hedger when DATAFORSEO_HEDGE_ENABLED is set
+            max_retries (int): Retries of transient failures on idempotent calls
+            keyword_store (KeywordStore): Per-keyword metrics that keyword-list
+                calls are answered from; defaults to the shared store, pass
+                False to disable
+        """
         self.username = username or os.environ.get('DATAFORSEO_USERNAME')
         self.password = password or os.environ.get('DATAFORSEO_PASSWORD')
         
         if not self.username or not self.password:
             raise ValueError("DataForSEO credentials must be provided either as parameters or environment variables (DATAFORSEO_USERNAME, DATAFORSEO_PASSWORD)")
         
-        self.base_url = "https://api.dataforseo.com/v3"
+        self.base_url = (base_url or DEFAULT_BASE_URL).rstrip('/')
+        self.timeout = (
+            connect_timeout if connect_timeout is not None else DEFAULT_CONNECT_TIMEOUT,
+            read_timeout if read_timeout is not None else DEFAULT_READ_TIMEOUT
+        )
+        
+        # Encode credentials once; they never change for the life of the client
+        encoded_credentials = base64.b64encode(
+            f"{self.username}:{self.password}".encode()
+        ).decode()
+        self.auth_header = f'Basic {encoded_credentials}'
+        
+        self.session = self._create_session(
+            pool_connections if pool_connections is not None else DEFAULT_POOL_CONNECTIONS,
+            pool_maxsize if pool_maxsize is not None else DEFAULT_POOL_MAXSIZE,
+            pool_block if pool_block is not None else DEFAULT_POOL_BLOCK,
+            keep_alive if keep_alive is not None else DEFAULT_KEEP_ALIVE
+        )
+        self.cache = get_default_cache() if cache is None else (cache or None)
+        self.singleflight = get_default_singleflight() if singleflight is None else (singleflight or None)
+        batch_window = DEFAULT_BATCH_WINDOW if batch_window is None else batch_window
+        self.rate_limiter = get_default_rate_limiter() if rate_limiter is None else (rate_limiter or None)
+        self.hedger = get_default_hedger() if hedger is None else (hedger or None)
+        self.max_retries = deadlines.DEFAULT_MAX_RETRIES if max_retries is None else max_retries
+        self.keyword_store = get_default_keyword_store() if keyword_store is None else (keyword_store or None)
+        self.batcher = MicroBatcher(self._post_batch, batch_window) if batch_window > 0 else None
+        self._task_queue = None
+        self._task_queue_lock = threading.Lock()
+    
+    def _create_session(self, pool_connections, pool_maxsize, pool_block, keep_alive):
+        """
+        Build the pooled HTTP session shared by every call on this client
+        
+        Args:
+            pool_connections (int): Number of per-host connection pools to keep
+            pool_maxsize (int): Maximum open connections kept per host
+            pool_block (bool): Block instead of opening extra connections past pool_maxsize
+            keep_alive (bool): Keep connections open between requests
+            
+        Returns:
+            requests.Session: Configured session
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'Authorization': self.auth_header,
+            'Content-Type': 'application/json',
+            'Connection': 'keep-alive' if keep_alive else 'close'
+        })
+        return session
+    
+    def close(self):
+        """Close all pooled connections held by the client."""
+        self.session.close()
         
     def test_connection(self):
         """
@@ -36,17 +160,7 @@ class DataForSEOClient:
             # Try to access a simple API endpoint to test connection
             url = f"{self.base_url}/appendix/user_data"
             
-            # Encode credentials
-            encoded_credentials = base64.b64encode(
-                f"{self.username}:{self.password}".encode()
-            ).decode()
-            
-            headers = {
-                'Authorization': f'Basic {encoded_credentials}',
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.get(url, headers=headers)
+            response = self.session.get(url, timeout=self.timeout)
             if response.status_code == 200:
                 return {
                     "success": True,
@@ -65,7 +179,9 @@ class DataForSEOClient:
     
     def make_request(self, endpoint, data):
         """
-        Make a request to the DataForSEO API
+        Make a request to the DataForSEO API, answering from the response cache when possible
+        
+        Concurrent identical requests are coalesced into one upstream call.
         
         Args:
             endpoint (str): API endpoint to call
@@ -74,26 +190,312 @@ class DataForSEOClient:
         Returns:
             dict: Response from the API
         """
-        url = f"{self.base_url}/{endpoint}"
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, data)
+            if cached is not None:
+                return cached
         
-        # Encode credentials
-        encoded_credentials = base64.b64encode(
-            f"{self.username}:{self.password}".encode()
-        ).decode()
+        if self.singleflight is None:
+            return self._fetch(endpoint, data)
         
-        headers = {
-            'Authorization': f'Basic {encoded_credentials}',
-            'Content-Type': 'application/json'
-        }
+        peek = None
+        if self.cache is not None:
+            peek = lambda: self.cache.get(endpoint, data, record=False)
+        try:
+            # Waiting on another caller's call never outlasts this request's deadline
+            return self.singleflight.do(
+                make_key(endpoint, data),
+                lambda: self._fetch(endpoint, data),
+                peek,
+                timeout=deadlines.remaining(endpoint)
+            )
+        except WaitTimeout:
+            deadlines.call_stats.incr("deadline_exceeded")
+            return deadlines.deadline_exceeded(endpoint)
+    
+    def _fetch(self, endpoint, data):
+        """
+        Call upstream and publish the response to the cache
+        
+        Args:
+            endpoint (str): API endpoint to call
+            data (dict): Data to send with the request
+            
+        Returns:
+            dict: Response from the API
+        """
+        if self.batcher is not None and isinstance(data, list) and len(data) == 1:
+            response = self.batcher.submit(endpoint, data[0]).result()
+        else:
+            response = self._post(endpoint, data)
+        
+        self._remember(endpoint, data, response)
+        return response
+    
+    def _remember(self, endpoint, data, response):
+        """
+        Publish an upstream response to the response cache and keyword store
+        
+        Args:
+            endpoint (str): API endpoint that was called
+            data (list): Request body that was sent
+            response (dict): Response from the API
+        """
+        if self.cache is not None:
+            self.cache.set(endpoint, data, response)
+        if self.keyword_store is not None:
+            self.keyword_store.ingest(endpoint, data, response)
+    
+    def make_batch_request(self, endpoint, tasks, keys=None):
+        """
+        Send many tasks for one endpoint as multi-task POSTs
+        
+        Tasks already in the response cache are answered locally; the rest are
+        packed up to the endpoint's task limit per POST, and each result is
+        cached on its own as if it had been requested alone.
+        
+        Args:
+            endpoint (str): API endpoint to call
+            tasks (list): Task objects
+            keys (list): Optional labels, one per task
+            
+        Returns:
+            list|dict: Single-task responses in task order, or keyed by keys when given
+        """
+        responses = [None] * len(tasks)
+        if self.cache is not None:
+            for i, task in enumerate(tasks):
+                responses[i] = self.cache.get(endpoint, [task])
+        
+        missing = [i for i, response in enumerate(responses) if response is None]
+        if missing:
+            fetched = self._post_batch(endpoint, [tasks[i] for i in missing])
+            for i, response in zip(missing, fetched):
+                responses[i] = response
+                self._remember(endpoint, [tasks[i]], response)
+        
+        if keys is not None:
+            return dict(zip(keys, responses))
+        return responses
+    
+    def make_keyword_request(self, endpoint, task, keywords):
+        """
+        Make a keyword-list request, splitting it at the endpoint's keyword limit
+        
+        Keywords are deduplicated first, and keywords with fresh rows in the
+        keyword store are answered locally. The rest are sent upstream, as
+        concurrent chunks (at most DATAFORSEO_CHUNK_CONCURRENCY at a time) when
+        over the limit, and everything is merged back into one response
+        ordered like the input.
+        
+        Args:
+            endpoint (str): API endpoint to call
+            task (dict): Task fields other than keywords
+            keywords (list): Keywords to look up
+            
+        Returns:
+            dict: Response from the API, with per-chunk status when it was split
+        """
+        keywords = dedupe_keywords(keywords)
+        stored, missing = self._lookup_keywords(endpoint, task, keywords)
+        limit = keyword_limit(endpoint)
+        if not stored and (not limit or len(keywords) <= limit):
+            return self.make_request(endpoint, [dict(task, keywords=keywords)])
+        
+        chunks = chunk_keywords(missing, limit or len(missing)) if missing else []
+        responses = []
+        if chunks:
+            with ThreadPoolExecutor(max_workers=min(len(chunks), DEFAULT_CHUNK_CONCURRENCY)) as pool:
+                responses = list(pool.map(
+                    deadlines.bind(lambda chunk: self.make_request(endpoint, [dict(task, keywords=chunk)])),
+                    chunks
+                ))
+        return self._merge_stored(endpoint, task, keywords, responses, chunks, stored)
+    
+    def _lookup_keywords(self, endpoint, task, keywords):
+        """
+        Split a keyword list into keywords the keyword store can answer and the rest
+        
+        Args:
+            endpoint (str): Keyword-list endpoint about to be called
+            task (dict): Task fields other than keywords
+            keywords (list): Deduplicated keywords
+            
+        Returns:
+            tuple: (stored rows by normalized keyword, keywords to fetch upstream)
+        """
+        if self.keyword_store is None or not self.keyword_store.serves(endpoint):
+            return {}, keywords
+        return self.keyword_store.lookup(endpoint, task, keywords)
+    
+    def _merge_stored(self, endpoint, task, keywords, responses, chunks, stored):
+        """Merge upstream chunk responses with a response built from stored rows."""
+        missing = {keyword for chunk in chunks for keyword in chunk}
+        local = [keyword for keyword in keywords if keyword not in missing]
+        if local:
+            responses = responses + [self.keyword_store.local_response(endpoint, task, local, stored)]
+            chunks = chunks + [local]
+        return merge_keyword_responses(responses, keywords, chunks)
+    
+    def _post_batch(self, endpoint, tasks):
+        """
+        POST tasks in chunks of the endpoint's task limit and split the results
+        
+        Chunks are sent concurrently, at most DATAFORSEO_CHUNK_CONCURRENCY at a time.
+        
+        Args:
+            endpoint (str): API endpoint to call
+            tasks (list): Task objects
+            
+        Returns:
+            list: One single-task response per task, in order
+        """
+        chunks = chunked(tasks, max_tasks_for(endpoint))
+        if len(chunks) == 1:
+            return split_batch_response(self._post(endpoint, chunks[0]), len(chunks[0]))
+        
+        with ThreadPoolExecutor(max_workers=min(len(chunks), DEFAULT_CHUNK_CONCURRENCY)) as pool:
+            posted = list(pool.map(deadlines.bind(lambda chunk: self._post(endpoint, chunk)), chunks))
+        responses = []
+        for chunk, response in zip(chunks, posted):
+            responses.extend(split_batch_response(response, len(chunk)))
+        return responses
+    
+    def submit_tasks(self, endpoint, tasks):
+        """
+        Run tasks through DataForSEO's standard task queue instead of a live endpoint
+        
+        Args:
+            endpoint (str): Live endpoint the tasks would otherwise be sent to
+                (SERP organic regular/advanced or Google Ads search volume)
+            tasks (list): Task objects
+            
+        Returns:
+            list: One concurrent.futures.Future per task, resolving to a
+                response shaped like the live endpoint's
+        """
+        return self._get_task_queue().submit(endpoint, tasks)
+    
+    def _get_task_queue(self):
+        """Get the client's task queue, creating it on first use."""
+        with self._task_queue_lock:
+            if self._task_queue is None:
+                self._task_queue = TaskQueue(self)
+            return self._task_queue
+    
+    def _get(self, endpoint):
+        """
+        Send a GET request to the DataForSEO API over the pooled session
+        
+        Args:
+            endpoint (str): API endpoint to call
+            
+        Returns:
+            dict: Response from the API
+        """
+        return self._send("GET", endpoint)
+    
+    def _post(self, endpoint, data):
+        """
+        Send a request to the DataForSEO API over the pooled session
+        
+        Args:
+            endpoint (str): API endpoint to call
+            data (dict): Data to send with the request
+            
+        Returns:
+            dict: Response from the API
+        """
+        return self._send("POST", endpoint, data)
+    
+    def _send(self, method, endpoint, data=None):
+        """
+        Send one logical request within the current deadline
+        
+        Idempotent calls (everything except task_post) are retried on
+        transient failures with jittered backoff and, when a hedger is
+        configured, hedged once they run past the endpoint's p95.
+        
+        Args:
+            method (str): HTTP method
+            endpoint (str): API endpoint to call
+            data (dict): Data to send with the request
+            
+        Returns:
+            dict: Response from the API
+        """
+        idempotent = deadlines.is_idempotent(method, endpoint)
+        attempts = 1 + (self.max_retries if idempotent else 0)
+        
+        for attempt in range(attempts):
+            if deadlines.remaining(endpoint) <= 0:
+                deadlines.call_stats.incr("deadline_exceeded")
+                return deadlines.deadline_exceeded(endpoint)
+            
+            if idempotent and self.hedger is not None:
+                response = self.hedger.run(endpoint, lambda: self._send_once(method, endpoint, data))
+            else:
+                response = self._send_once(method, endpoint, data)
+            
+            if attempt == attempts - 1 or not deadlines.is_retryable(response):
+                return response
+            
+            delay = deadlines.backoff_delay(attempt)
+            if delay >= deadlines.remaining(endpoint):
+                return response
+            deadlines.call_stats.incr("retries")
+            time.sleep(delay)
+        return response
+    
+    def _send_once(self, method, endpoint, data=None):
+        """
+        Send one HTTP request, waiting for room in the shared rate limits first
+        
+        Args:
+            method (str): HTTP method
+            endpoint (str): API endpoint to call
+            data (dict): Data to send with the request
+            
+        Returns:
+            dict: Response from the API
+        """
+        url = f"{self.base_url}/{endpoint}"
+        slots = None
+        
+        if self.rate_limiter is not None:
+            slots = self.rate_limiter.acquire(endpoint, timeout=deadlines.remaining(endpoint))
+            if slots is None:
+                deadlines.call_stats.incr("deadline_exceeded")
+                return deadlines.deadline_exceeded(endpoint)
         
         try:
-            response = requests.post(url, headers=headers, data=json.dumps(data))
-            return response.json()
+            # Never wait on the socket longer than the call's remaining budget
+            read_timeout = max(min(self.timeout[1], deadlines.remaining(endpoint)), 0.001)
+            body = json.dumps(data) if data is not None else None
+            started = time.monotonic()
+            response = self.session.request(
+                method, url, data=body, timeout=(self.timeout[0], read_timeout)
+            )
+            result = response.json()
+            if response.ok:
+                latency_tracker.record(endpoint, time.monotonic() - started)
+            elif not isinstance(result, dict) or result.get('status_code') == 20000:
+                result = {"status_code": response.status_code, "status_message": response.text[:500]}
+            return result
+        except requests.exceptions.Timeout as e:
+            deadlines.call_stats.incr("timeouts")
+            return {
+                "status_code": 504,
+                "status_message": f"Timed out calling {endpoint}: {str(e)}"
+            }
         except Exception as e:
             return {
                 "status_code": 500,
                 "status_message": f"Error making request: {str(e)}"
             }
+        finally:
+            if slots:
+                self.rate_limiter.release(slots)
 
     def get_search_volume(self, keywords, location="United States", language="English"):
         """
@@ -107,13 +509,12 @@ class DataForSEOClient:
         Returns:
             dict: Response from the API
         """
-        data = [{
-            "keywords": keywords,
+        task = {
             "location_name": location,
             "language_name": language
-        }]
+        }
         
-        return self.make_request("keywords_data/google/search_volume/live", data)
+        return self.make_keyword_request("keywords_data/google/search_volume/live", task, keywords)
     
     def get_keyword_suggestions(self, keyword, location="United States", language="English"):
         """
@@ -136,7 +537,7 @@ class DataForSEOClient:
         
         return self.make_request("dataforseo_labs/google/keyword_suggestions/live", data)
     
-    def get_serp_data(self, keyword, location="United States", language="English", depth=10):
+    def get_serp_data(self, keyword, location="United States", language="English", depth=10, mode="live"):
         """
         Get SERP data for a keyword
         
@@ -145,9 +546,11 @@ class DataForSEOClient:
             location (str): Location name for search data
             language (str): Language for search data
             depth (int): Number of results to return
+            mode (str): "live" for an immediate result, "queued" to go through
+                the cheaper standard task queue
             
         Returns:
-            dict: Response from the API
+            dict: Response from the API, or a Future resolving to it when queued
         """
         data = [{
             "keyword": keyword,
@@ -156,8 +559,36 @@ class DataForSEOClient:
             "depth": depth
         }]
         
+        if mode == "queued":
+            return self.submit_tasks("serp/google/organic/live/regular", data)[0]
         return self.make_request("serp/google/organic/live/regular", data)
     
+    def get_serp_data_many(self, keywords, location="United States", language="English", depth=10, mode="queued"):
+        """
+        Get SERP data for many keywords, e.g. for bulk rank checks
+        
+        Args:
+            keywords (list): Keywords to get data for
+            location (str): Location name for search data
+            language (str): Language for search data
+            depth (int): Number of results to return
+            mode (str): "queued" (default) for the standard task queue, "live"
+                for batched live requests
+            
+        Returns:
+            dict: Future (queued) or response (live) for each keyword
+        """
+        tasks = [{
+            "keyword": keyword,
+            "location_name": location,
+            "language_name": language,
+            "depth": depth
+        } for keyword in keywords]
+        
+        if mode == "queued":
+            return dict(zip(keywords, self.submit_tasks("serp/google/organic/live/regular", tasks)))
+        return self.make_batch_request("serp/google/organic/live/regular", tasks, keys=keywords)
+    
     def get_domain_analytics(self, domain, location="United States", limit=10):
         """
         Get domain analytics data using DataForSEO Labs
@@ -218,6 +649,26 @@ class DataForSEOClient:
         
         return self.make_request("backlinks/overview/live", data)
     
+    def get_backlinks_many(self, targets, limit=10, target_type="domain"):
+        """
+        Get backlinks for several domains or URLs in batched requests
+        
+        Args:
+            targets (list): Domains or URLs to get backlinks for
+            limit (int): Number of results to return
+            target_type (str): Type of target (domain, url)
+            
+        Returns:
+            dict: Response from the API for each target
+        """
+        tasks = [{
+            "target": target,
+            "limit": limit,
+            "target_type": target_type
+        } for target in targets]
+        
+        return self.make_batch_request("backlinks/overview/live", tasks, keys=targets)
+    
     def get_keyword_difficulty(self, keywords, location="United States", language="English"):
         """
         Get keyword difficulty data using DataForSEO Labs
@@ -230,13 +681,12 @@ class DataForSEOClient:
         Returns:
             dict: Response from the API
         """
-        data = [{
-            "keywords": keywords,
+        task = {
             "location_name": location,
             "language_name": language
-        }]
+        }
         
-        return self.make_request("dataforseo_labs/google/bulk_keyword_difficulty/live", data)
+        return self.make_keyword_request("dataforseo_labs/google/bulk_keyword_difficulty/live", task, keywords)
     
     def get_traffic_analytics(self, domain, location="United States"):
         """
@@ -298,25 +748,44 @@ class DataForSEOClient:
         
         return self.make_request("dataforseo_labs/google/ranked_keywords/live", data)
     
+    def get_ranked_keywords_many(self, domains, location="United States", limit=100):
+        """
+        Get ranked keywords for several domains in batched requests
+        
+        Args:
+            domains (list): Target domains
+            location (str): Location name
+            limit (int): Number of results per domain
+            
+        Returns:
+            dict: Response from the API for each domain
+        """
+        tasks = [{
+            "target": domain,
+            "location_name": location,
+            "limit": limit
+        } for domain in domains]
+        
+        return self.make_batch_request("dataforseo_labs/google/ranked_keywords/live", tasks, keys=domains)
+    
     def get_keyword_overview(self, keywords, location="United States", language="English"):
         """
         Get comprehensive keyword overview using DataForSEO Labs
         
         Args:
-            keywords (list): List of keywords (up to 700)
+            keywords (list): List of keywords (split into chunks of 700)
             location (str): Location name
             language (str): Language name
             
         Returns:
             dict: Response from the API
         """
-        data = [{
-            "keywords": keywords,
+        task = {
             "location_name": location,
             "language_name": language
-        }]
+        }
         
-        return self.make_request("dataforseo_labs/google/keyword_overview/live", data)
+        return self.make_keyword_request("dataforseo_labs/google/keyword_overview/live", task, keywords)
     
     def get_domain_intersection(self, domain1, domain2, location="United States", limit=100):
         """
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Request Deadlines and Retries
+This module carries the deadline of the incoming Flask request down into the
+DataForSEO client, gives each endpoint its own upper bound, and decides which
+upstream failures are worth a jittered retry.
+"""
+import contextvars
+import os
+import random
+import threading
+import time
+
+DEFAULT_REQUEST_DEADLINE = float(os.environ.get('REQUEST_DEADLINE_SECONDS', 25))
+DEFAULT_MAX_RETRIES = int(os.environ.get('DATAFORSEO_MAX_RETRIES', 2))
+BACKOFF_BASE = float(os.environ.get('DATAFORSEO_BACKOFF_BASE', 0.25))
+BACKOFF_CAP = float(os.environ.get('DATAFORSEO_BACKOFF_CAP', 4))
+
+# Endpoint prefix -> longest single call allowed, in seconds. The longest
+# matching prefix wins; the effective timeout is also capped by whatever is
+# left of the request deadline.
+ENDPOINT_TIMEOUTS = {
+    "": 30,
+    "serp/": 30,
+    "keywords_data/": 60,
+    "dataforseo_labs/": 30,
+    "backlinks/": 30,
+    "traffic_analytics/": 30,
+    "serp/google/organic/tasks_ready": 15,
+    "keywords_data/google/search_volume/tasks_ready": 15,
+}
+
+# Top-level status codes (HTTP or DataForSEO) that signal a transient failure
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504, 40202, 50000, 50301, 50401}
+
+# Standard-queue submissions create billed tasks, so they are never retried or hedged
+NON_IDEMPOTENT_SUFFIXES = ("/task_post",)
+
+_deadline = contextvars.ContextVar('dataforseo_deadline', default=None)
+
+def start(seconds=None):
+    """
+    Set the deadline for the current request
+
+    Args:
+        seconds (float): Time budget from now; defaults to REQUEST_DEADLINE_SECONDS
+
+    Returns:
+        contextvars.Token: Token to pass to reset() when the request ends
+    """
+    seconds = DEFAULT_REQUEST_DEADLINE if seconds is None else seconds
+    return _deadline.set(time.monotonic() + seconds)
+
+def reset(token):
+    """Restore the deadline that was in effect before start()."""
+    _deadline.reset(token)
+
+def current():
+    """Absolute deadline of the current request (time.monotonic based), or None."""
+    return _deadline.get()
+
+def endpoint_timeout(endpoint):
+    """Upper bound for a single call to an endpoint."""
+    best = max((prefix for prefix in ENDPOINT_TIMEOUTS if endpoint.startswith(prefix)), key=len)
+    return ENDPOINT_TIMEOUTS[best]
+
+def remaining(endpoint):
+    """
+    Seconds a call to endpoint may still take
+
+    Args:
+        endpoint (str): API endpoint about to be called
+
+    Returns:
+        float: The smaller of the endpoint's timeout and what is left of the
+            request deadline; zero or less means the deadline has passed
+    """
+    budget = endpoint_timeout(endpoint)
+    deadline = _deadline.get()
+    if deadline is not None:
+        budget = min(budget, deadline - time.monotonic())
+    return budget
+
+def bind(fn):
+    """
+    Wrap fn so it runs under the caller's deadline on another thread
+
+    Args:
+        fn (callable): Function to run in a worker thread
+
+    Returns:
+        callable: Wrapper that installs the captured deadline around fn
+    """
+    deadline = _deadline.get()
+
+    def run(*args, **kwargs):
+        token = _deadline.set(deadline)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _deadline.reset(token)
+    return run
+
+def is_idempotent(method, endpoint):
+    """Live and GET calls only read data, so repeating them is safe."""
+    return method == "GET" or not endpoint.endswith(NON_IDEMPOTENT_SUFFIXES)
+
+def is_retryable(response):
+    """Whether a response is a transient failure worth retrying."""
+    return isinstance(response, dict) and response.get('status_code') in RETRYABLE_STATUS_CODES
+
+def backoff_delay(attempt):
+    """
+    Full-jitter exponential backoff
+
+    Args:
+        attempt (int): Zero-based number of the attempt that just failed
+
+    Returns:
+        float: Seconds to sleep before the next attempt
+    """
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+def deadline_exceeded(endpoint):
+    """Error response used when no time is left for a call."""
+    return {
+        "status_code": 504,
+        "status_message": f"Deadline exceeded before calling {endpoint}"
+    }
+
+class CallStats:
+    """Process-wide counters for retries and deadline cut-offs."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {
+            "retries": 0,
+            "deadline_exceeded": 0,
+            "timeouts": 0
+        }
+
+    def incr(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+call_stats = CallStats()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Concurrent Fan-out
+This module runs one upstream call per domain (or other key) on a bounded
+thread pool, gives each call its own timeout, and reports a status per key so
+a slow or failing domain only costs its own slot in the response.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from utils import deadlines
+
+DEFAULT_MAX_WORKERS = int(os.environ.get('FAN_OUT_MAX_WORKERS', 8))
+DEFAULT_KEY_TIMEOUT = float(os.environ.get('FAN_OUT_KEY_TIMEOUT', 20))
+# Ceilings for the max_workers and timeout a request may ask for
+MAX_WORKERS_LIMIT = int(os.environ.get('FAN_OUT_MAX_WORKERS_LIMIT', 16))
+MAX_KEY_TIMEOUT = float(os.environ.get('FAN_OUT_MAX_KEY_TIMEOUT', 60))
+
+# Extra time the caller waits past a call's own deadline for it to report back
+GRACE = 0.5
+
+def response_status(response):
+    """
+    Classify a DataForSEO response for per-key status reporting
+
+    Args:
+        response (dict): Response returned by the client
+
+    Returns:
+        tuple: ("ok" | "timeout" | "error", error message or None)
+    """
+    if not isinstance(response, dict):
+        return "error", "Invalid response"
+    task = (response.get('tasks') or [{}])[0]
+    if response.get('status_code') == 20000 and task.get('status_code', 20000) == 20000:
+        return "ok", None
+    if response.get('status_code') == 504:
+        return "timeout", response.get('status_message')
+    return "error", task.get('status_message') or response.get('status_message')
+
+def parse_options(data):
+    """
+    Read a request's max_workers and timeout, clamped to the server's limits
+
+    Args:
+        data (dict): Request body
+
+    Returns:
+        tuple: (max_workers, timeout), None where the request leaves them unset
+
+    Raises:
+        ValueError: A value is not a positive number
+    """
+    max_workers = data.get('max_workers')
+    timeout = data.get('timeout')
+    try:
+        if max_workers is not None:
+            max_workers = int(max_workers)
+        if timeout is not None:
+            timeout = float(timeout)
+    except (TypeError, ValueError):
+        raise ValueError("max_workers and timeout must be numbers")
+    if (max_workers is not None and max_workers < 1) or (timeout is not None and not timeout > 0):
+        raise ValueError("max_workers and timeout must be positive")
+    if max_workers is not None:
+        max_workers = min(max_workers, MAX_WORKERS_LIMIT)
+    if timeout is not None:
+        timeout = min(timeout, MAX_KEY_TIMEOUT)
+    return max_workers, timeout
+
+def batch_status(results, elapsed):
+    """
+    Per-key status for responses fetched together in one batched call
+
+    Args:
+        results (dict): key -> single-task response
+        elapsed (float): Seconds the batched call took
+
+    Returns:
+        dict: key -> {"status", "elapsed_ms", "error"}, shaped like fan_out's
+    """
+    status = {}
+    for key, response in results.items():
+        state, error = response_status(response)
+        status[key] = {"status": state, "elapsed_ms": round(elapsed * 1000, 1), "error": error}
+    return status
+
+def fan_out(fn, keys, max_workers=None, timeout=None):
+    """
+    Call fn(key) for every key concurrently
+
+    Each call runs under its own deadline of ``timeout`` seconds from when it
+    starts (never past the request deadline), so the client abandons it on
+    its own; calls that still have not reported back by then are marked as
+    timed out and left to finish in the background.
+
+    Args:
+        fn (callable): Takes one key and returns a DataForSEO response
+        keys (list): Keys to call fn with, e.g. domains
+        max_workers (int): Most calls in flight at once
+        timeout (float): Longest time a single call may take
+
+    Returns:
+        tuple: (key -> response, key -> {"status", "elapsed_ms", "error"})
+    """
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}, {}
+    max_workers = max_workers or DEFAULT_MAX_WORKERS
+    timeout = timeout if timeout is not None else DEFAULT_KEY_TIMEOUT
+    request_deadline = deadlines.current()
+    started = {}
+    finished = {}
+
+    def call(key):
+        started[key] = time.monotonic()
+        budget = timeout
+        if request_deadline is not None:
+            budget = min(budget, request_deadline - started[key])
+        token = deadlines.start(budget)
+        try:
+            return fn(key)
+        finally:
+            deadlines.reset(token)
+            finished[key] = time.monotonic()
+
+    workers = min(max_workers, len(keys))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fan-out")
+    futures = {pool.submit(call, key): key for key in keys}
+    # Calls queue behind the pool in waves; wait long enough for the last wave
+    waves = -(-len(keys) // workers)
+    wait_for = timeout * waves + GRACE
+    if request_deadline is not None:
+        wait_for = min(wait_for, request_deadline - time.monotonic() + GRACE)
+    wait(futures, timeout=max(wait_for, 0))
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    status = {}
+    now = time.monotonic()
+    for future, key in futures.items():
+        if not future.done() or future.cancelled():
+            error = f"No response within {timeout:g}s"
+            results[key] = {"status_code": 504, "status_message": error}
+            state = "timeout"
+        elif future.exception() is not None:
+            results[key] = {"status_code": 500, "status_message": str(future.exception())}
+            state, error = "error", str(future.exception())
+        else:
+            results[key] = future.result()
+            state, error = response_status(results[key])
+        status[key] = {
+            "status": state,
+            "elapsed_ms": round((finished.get(key, now) - started[key]) * 1000, 1) if key in started else None,
+            "error": error
+        }
+    return results, status
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Keyword Gap Matrix
+This module builds a domain x keyword matrix of ranking positions for a target
+domain and its competitors, classifies every keyword as missing, weak, shared
+or unique for the target, and scores, filters and sorts the result with
+vectorized NumPy operations.
+"""
+import operator
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain, count
+import numpy as np
+
+CATEGORIES = ("missing", "weak", "shared", "unique")
+
+# Approximate organic click-through rate by position (1-based); positions past
+# 20 are treated as earning no clicks.
+CTR_CURVE = np.array(
+    [0.0, 0.28, 0.15, 0.11, 0.08, 0.07, 0.05, 0.04, 0.03, 0.03, 0.02]
+    + [0.01] * 10
+    + [0.0],
+    dtype=np.float32
+)
+
+# Work element-wise on NumPy columns and on plain values alike
+FILTER_OPS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+MAX_CACHED_MATRICES = 16
+MATRIX_TTL = 900
+
+def page_order(key, order="desc", offset=0, limit=100):
+    """
+    Positions of one page of a numeric sort key, sorting only what the page needs
+
+    Args:
+        key (numpy.ndarray): Numeric sort key; NaN always sorts last
+        order (str): "asc" or "desc"
+        offset (int): Rows to skip
+        limit (int): Rows to return
+
+    Returns:
+        numpy.ndarray: Indices into key for the requested page, in order
+    """
+    key = key.astype(np.float64)
+    key = -key if order == "desc" else key
+    key = np.where(np.isnan(key), np.inf, key)
+    end = offset + limit
+    if end < len(key):
+        # Partition off the first offset + limit rows, then sort just those
+        top = np.argpartition(key, end - 1)[:end]
+        order_index = top[np.argsort(key[top], kind='stable')]
+    else:
+        order_index = np.argsort(key, kind='stable')
+    return order_index[offset:offset + limit]
+
+def expected_ctr(positions):
+    """Vectorized CTR lookup; NaN (not ranking) maps to 0."""
+    index = np.nan_to_num(positions, nan=len(CTR_CURVE) - 1)
+    index = np.clip(index, 0, len(CTR_CURVE) - 1).astype(np.intp)
+    return CTR_CURVE[index]
+
+class GapMatrix:
+    """
+    Columnar gap analysis for one target and its competitors.
+
+    ``positions`` is a float32 (domains x keywords) matrix with NaN where a
+    domain does not rank; row 0 is the target. Derived per-keyword columns
+    (best competitor position, competitor count, category, opportunity) are
+    computed once in the constructor, so sorting and filtering only build
+    index arrays.
+    """
+    def __init__(self, target, competitors, domain_rows):
+        """
+        Build the matrix
+
+        Args:
+            target (str): Target domain
+            competitors (list): Competitor domains
+            domain_rows (dict): domain -> {keyword: (position, volume, url)}
+        """
+        self.domains = [target] + list(competitors)
+        # Keyword -> column, built with C-level iteration (dict.fromkeys keeps first-seen order)
+        keywords = dict.fromkeys(chain.from_iterable(domain_rows.get(domain, {}) for domain in self.domains))
+        vocabulary = dict(zip(keywords, count()))
+
+        self.keywords = np.array(list(vocabulary), dtype=object)
+        self.positions = np.full((len(self.domains), len(vocabulary)), np.nan, dtype=np.float32)
+        self.volume = np.zeros(len(vocabulary), dtype=np.float64)
+        for row, domain in enumerate(self.domains):
+            rows = domain_rows.get(domain, {})
+            if not rows:
+                continue
+            index = np.fromiter(map(vocabulary.__getitem__, rows), dtype=np.intp, count=len(rows))
+            values = list(rows.values())
+            self.positions[row, index] = np.array([v[0] or np.nan for v in values], dtype=np.float32)
+            volumes = np.array([v[1] or 0 for v in values], dtype=np.float64)
+            self.volume[index] = np.maximum(self.volume[index], volumes)
+
+        target_positions = self.positions[0]
+        competitor_positions = self.positions[1:]
+        target_ranks = ~np.isnan(target_positions)
+        competitor_ranks = ~np.isnan(competitor_positions)
+        self.competitor_count = competitor_ranks.sum(axis=0).astype(np.int32)
+        best = np.where(competitor_ranks, competitor_positions, np.inf).min(axis=0, initial=np.inf)
+        self.best_competitor = np.where(np.isinf(best), np.nan, best).astype(np.float32)
+
+        has_competitor = self.competitor_count > 0
+        outranked = target_positions > self.best_competitor
+        self.category = np.full(len(vocabulary), "unique", dtype=object)
+        self.category[~target_ranks & has_competitor] = "missing"
+        self.category[target_ranks & has_competitor & outranked] = "weak"
+        self.category[target_ranks & has_competitor & ~outranked] = "shared"
+
+        # Clicks the target could gain by matching the best competitor, weighted
+        # by how many competitors rank; for shared/unique keywords, the clicks
+        # the target already earns (what is at stake defending it).
+        coverage = self.competitor_count / max(len(self.domains) - 1, 1)
+        gain = self.volume * (expected_ctr(self.best_competitor) - expected_ctr(target_positions)) * coverage
+        held = self.volume * expected_ctr(target_positions)
+        self.opportunity = np.where(
+            (self.category == "missing") | (self.category == "weak"), gain, held
+        ).astype(np.float64)
+
+    def column(self, name):
+        """
+        Get a per-keyword column by name
+
+        Args:
+            name (str): keyword, search_volume, target_position,
+                best_competitor_position, competitor_count, category,
+                opportunity, or ``position:<domain>``
+
+        Returns:
+            numpy.ndarray: Column values aligned with self.keywords
+        """
+        columns = {
+            "keyword": self.keywords,
+            "search_volume": self.volume,
+            "target_position": self.positions[0],
+            "best_competitor_position": self.best_competitor,
+            "competitor_count": self.competitor_count,
+            "category": self.category,
+            "opportunity": self.opportunity,
+        }
+        if name in columns:
+            return columns[name]
+        if name.startswith("position:") and name[len("position:"):] in self.domains:
+            return self.positions[self.domains.index(name[len("position:"):])]
+        raise ValueError(f"Unknown column: {name}")
+
+    def select(self, category=None, filters=None, sort_by="opportunity", order="desc", offset=0, limit=100):
+        """
+        Filter, sort and page keywords
+
+        Args:
+            category (str): Restrict to one of CATEGORIES
+            filters (list): [column, op, value] triples, ANDed together
+            sort_by (str): Column to sort on
+            order (str): "asc" or "desc"; missing positions always sort last
+            offset (int): Rows to skip
+            limit (int): Rows to return
+
+        Returns:
+            tuple: (row indices for the page, total matching rows)
+        """
+        mask = np.ones(len(self.keywords), dtype=bool)
+        if category:
+            mask &= self.category == category
+        for column_name, op, value in filters or []:
+            if op not in FILTER_OPS:
+                raise ValueError(f"Unknown filter operator: {op}")
+            column = self.column(column_name)
+            with np.errstate(invalid='ignore'):
+                mask &= FILTER_OPS[op](column, value)
+        candidates = np.flatnonzero(mask)
+
+        key = self.column(sort_by)[candidates]
+        if key.dtype == object:
+            order_index = np.argsort(key.astype(str), kind='stable')
+            if order == "desc":
+                order_index = order_index[::-1]
+            order_index = order_index[offset:offset + limit]
+        else:
+            order_index = page_order(key, order, offset, limit)
+        return candidates[order_index], len(candidates)
+
+    def rows(self, indices):
+        """
+        Materialize selected keywords as compact rows
+
+        Args:
+            indices (numpy.ndarray): Row indices from select()
+
+        Returns:
+            list: Dicts with per-domain positions aligned to self.domains
+        """
+        positions = self.positions[:, indices].T
+        return [{
+            "keyword": self.keywords[i],
+            "category": self.category[i],
+            "search_volume": int(self.volume[i]),
+            "opportunity": round(float(self.opportunity[i]), 2),
+            "competitor_count": int(self.competitor_count[i]),
+            "positions": [None if np.isnan(p) else int(p) for p in row]
+        } for i, row in zip(indices.tolist(), positions)]
+
+    def summary(self):
+        """Keyword count per category."""
+        names, counts = np.unique(self.category, return_counts=True)
+        summary = {name: 0 for name in CATEGORIES}
+        summary.update({name: int(count) for name, count in zip(names, counts)})
+        return summary
+
+_matrix_cache = OrderedDict()
+_matrix_cache_lock = threading.Lock()
+
+def get_cached_matrix(key, build):
+    """
+    Get a recently built matrix, building it on a miss
+
+    Re-sorting or re-filtering the same gap analysis reuses the matrix
+    instead of rebuilding it from the upstream responses.
+
+    Args:
+        key (tuple): Identity of the analysis (target, competitors, location, limit)
+        build (callable): Returns (GapMatrix or None, whether to cache it)
+
+    Returns:
+        GapMatrix: Cached or newly built matrix, or None if build failed
+    """
+    now = time.time()
+    with _matrix_cache_lock:
+        entry = _matrix_cache.get(key)
+        if entry is not None and entry[0] > now:
+            _matrix_cache.move_to_end(key)
+            return entry[1]
+    matrix, cacheable = build()
+    if matrix is None or not cacheable:
+        return matrix
+    with _matrix_cache_lock:
+        _matrix_cache[key] = (now + MATRIX_TTL, matrix)
+        _matrix_cache.move_to_end(key)
+        while len(_matrix_cache) > MAX_CACHED_MATRICES:
+            _matrix_cache.popitem(last=False)
+    return matrix
+
+def _lookup(item, path):
+    """Follow a dotted path through nested dicts, returning None when absent."""
+    for part in path.split('.'):
+        if not isinstance(item, dict):
+            return None
+        item = item.get(part)
+    return item
+
+def sort_and_filter_items(items, sort_by=None, order="desc", filters=None):
+    """
+    Sort and filter raw result items on any (dotted) field
+
+    Lets two-domain endpoints re-order an already fetched (and cached)
+    response instead of asking DataForSEO for a differently sorted one.
+
+    Args:
+        items (list): Result items, e.g. domain_intersection items
+        sort_by (str): Dotted field path, e.g. "keyword_data.keyword_info.search_volume"
+        order (str): "asc" or "desc"; items without the field always sort last
+        filters (list): [field path, op, value] triples, ANDed together
+
+    Returns:
+        list: Matching items in the requested order
+    """
+    for path, op, value in filters or []:
+        if op not in FILTER_OPS:
+            raise ValueError(f"Unknown filter operator: {op}")
+        compare = FILTER_OPS[op]
+        items = [item for item in items if _lookup(item, path) is not None and compare(_lookup(item, path), value)]
+    if sort_by:
+        present = [item for item in items if _lookup(item, sort_by) is not None]
+        absent = [item for item in items if _lookup(item, sort_by) is None]
+        present.sort(key=lambda item: _lookup(item, sort_by), reverse=order == "desc")
+        items = present + absent
+    return items
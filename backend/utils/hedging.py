@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Hedged DataForSEO Requests
+This module tracks per-endpoint latency and, when a call runs past the
+endpoint's observed p95, fires one identical backup call and takes whichever
+answers first. A budget caps hedges to a small share of all calls so they
+cannot double upstream spend.
+"""
+import asyncio
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from utils import deadlines
+
+HEDGE_ENABLED = os.environ.get('DATAFORSEO_HEDGE_ENABLED', 'False').lower() == 'true'
+DEFAULT_MAX_RATIO = float(os.environ.get('DATAFORSEO_HEDGE_MAX_RATIO', 0.05))
+DEFAULT_MIN_SAMPLES = int(os.environ.get('DATAFORSEO_HEDGE_MIN_SAMPLES', 20))
+WINDOW = 200
+MAX_WORKERS = 32
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies per endpoint."""
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds):
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, endpoint, pct, min_samples=1):
+        """
+        Get a latency percentile for an endpoint
+
+        Args:
+            endpoint (str): API endpoint
+            pct (float): Percentile between 0 and 100
+            min_samples (int): Samples needed before an estimate is returned
+
+        Returns:
+            float: Latency in seconds, or None without enough samples
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, ()))
+        if len(samples) < max(min_samples, 1):
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100.0))]
+
+    def stats(self):
+        with self._lock:
+            endpoints = list(self._samples)
+        return {
+            endpoint: {
+                "p50": self.percentile(endpoint, 50),
+                "p95": self.percentile(endpoint, 95)
+            }
+            for endpoint in endpoints
+        }
+
+class Hedger:
+    """
+    Run a call and, if it is still pending after the endpoint's p95, race a
+    second copy against it.
+
+    Every call earns ``max_ratio`` of a hedge token (up to a small burst) and
+    each hedge spends a whole one, so hedges never exceed ``max_ratio`` of
+    calls over time.
+    """
+    def __init__(self, tracker, max_ratio=None, min_samples=None):
+        """
+        Initialize the hedger
+
+        Args:
+            tracker (LatencyTracker): Source of per-endpoint p95 latencies
+            max_ratio (float): Largest share of calls that may be hedged
+            min_samples (int): Latency samples needed before an endpoint is hedged
+        """
+        self.tracker = tracker
+        self.max_ratio = max_ratio if max_ratio is not None else DEFAULT_MAX_RATIO
+        self.min_samples = min_samples if min_samples is not None else DEFAULT_MIN_SAMPLES
+        self._tokens = 1.0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="dataforseo-hedge")
+        self.counters = {
+            "calls": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "budget_denied": 0
+        }
+
+    def _earn(self):
+        with self._lock:
+            self.counters["calls"] += 1
+            self._tokens = min(self._tokens + self.max_ratio, max(1.0, 10 * self.max_ratio))
+
+    def _spend(self):
+        with self._lock:
+            if self._tokens < 1.0:
+                self.counters["budget_denied"] += 1
+                return False
+            self._tokens -= 1.0
+            self.counters["hedged"] += 1
+            return True
+
+    def run(self, endpoint, fn):
+        """
+        Call fn, hedging it once if it runs past the endpoint's p95
+
+        Args:
+            endpoint (str): API endpoint being called
+            fn (callable): Performs one upstream call and returns its response
+
+        Returns:
+            dict: Response of whichever call finished first
+        """
+        self._earn()
+        p95 = self.tracker.percentile(endpoint, 95, self.min_samples)
+        if p95 is None:
+            return fn()
+
+        primary = self._executor.submit(deadlines.bind(fn))
+        done, _ = wait([primary], timeout=min(p95, max(deadlines.remaining(endpoint), 0)))
+        if done or not self._spend():
+            return primary.result()
+
+        backup = self._executor.submit(deadlines.bind(fn))
+        done, _ = wait([primary, backup], return_when=FIRST_COMPLETED)
+        winner = primary if primary in done else backup
+        if winner is backup:
+            with self._lock:
+                self.counters["hedge_wins"] += 1
+        return winner.result()
+
+    async def run_async(self, endpoint, fn):
+        """
+        Coroutine counterpart of run() for the async client
+
+        Args:
+            endpoint (str): API endpoint being called
+            fn (callable): Returns a coroutine performing one upstream call
+
+        Returns:
+            dict: Response of whichever call finished first
+        """
+        self._earn()
+        p95 = self.tracker.percentile(endpoint, 95, self.min_samples)
+        if p95 is None:
+            return await fn()
+
+        primary = asyncio.ensure_future(fn())
+        done, _ = await asyncio.wait([primary], timeout=min(p95, max(deadlines.remaining(endpoint), 0)))
+        if done or not self._spend():
+            return await primary
+
+        backup = asyncio.ensure_future(fn())
+        done, _ = await asyncio.wait([primary, backup], return_when=asyncio.FIRST_COMPLETED)
+        winner = primary if primary in done else backup
+        if winner is backup:
+            with self._lock:
+                self.counters["hedge_wins"] += 1
+        return winner.result()
+
+    def stats(self):
+        """
+        Get hedging counters and latency estimates
+
+        Returns:
+            dict: Call/hedge counts, remaining budget and per-endpoint latencies
+        """
+        with self._lock:
+            stats = dict(self.counters)
+            stats["budget_tokens"] = round(self._tokens, 3)
+        stats["max_ratio"] = self.max_ratio
+        stats["latency"] = self.tracker.stats()
+        return stats
+
+latency_tracker = LatencyTracker()
+_default_hedger = None
+_default_hedger_lock = threading.Lock()
+
+def get_default_hedger():
+    """
+    Get the process-wide hedger, configured from the environment
+
+    Returns:
+        Hedger: Shared hedger, or None unless DATAFORSEO_HEDGE_ENABLED is true
+    """
+    global _default_hedger
+    if not HEDGE_ENABLED:
+        return None
+    with _default_hedger_lock:
+        if _default_hedger is None:
+            _default_hedger = Hedger(latency_tracker)
+    return _default_hedger
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Background Jobs
+This module runs long keyword jobs (expansion crawls, clustering) on
+background threads and records their status and output events in a SQLite
+WAL file, so any gunicorn worker can report on or stream a job started by
+another.
+"""
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.environ.get('JOBS_DB', os.path.join(tempfile.gettempdir(), 'seo_dashboard_jobs.db'))
+DEFAULT_MAX_RUNNING = int(os.environ.get('JOBS_MAX_RUNNING', 4))
+# Finished jobs and their events are dropped after this many seconds
+JOB_TTL = float(os.environ.get('JOBS_TTL', 24 * 3600))
+STREAM_POLL_INTERVAL = 0.2
+# A running job touches its row this often; one silent for HEARTBEAT_TIMEOUT
+# belonged to a worker that died and is marked failed
+HEARTBEAT_INTERVAL = float(os.environ.get('JOBS_HEARTBEAT_INTERVAL', 10))
+HEARTBEAT_TIMEOUT = float(os.environ.get('JOBS_HEARTBEAT_TIMEOUT', 60))
+ACTIVE_STATUSES = ("running", "cancelling")
+
+class JobCancelled(Exception):
+    """Raised inside a job once it has been asked to stop."""
+
+class Job:
+    """Handle passed to a running job for reporting progress and output."""
+    def __init__(self, registry, job_id):
+        self.registry = registry
+        self.id = job_id
+        self._last_cancel_check = 0.0
+        self._cancelled = False
+
+    def emit(self, event):
+        """
+        Append an output event (any JSON-serializable dict) to the job's stream
+
+        Args:
+            event (dict): Event payload, e.g. {"type": "keywords", "keywords": [...]}
+        """
+        self.registry._append_event(self.id, event)
+
+    def progress(self, **progress):
+        """Replace the job's progress summary shown by status lookups."""
+        self.registry._update(self.id, progress=json.dumps(progress))
+
+    def cancelled(self):
+        """Whether the job was cancelled, checked against the store at most every 0.5s."""
+        now = time.monotonic()
+        if not self._cancelled and now - self._last_cancel_check > 0.5:
+            self._last_cancel_check = now
+            self._cancelled = self.registry.status(self.id).get("status") == "cancelling"
+        return self._cancelled
+
+    def check_cancelled(self):
+        """Raise JobCancelled if the job was cancelled."""
+        if self.cancelled():
+            raise JobCancelled()
+
+class JobRegistry:
+    """
+    Start jobs on daemon threads and keep their state in SQLite.
+
+    Each job has a status (running, cancelling, cancelled, done, failed), a
+    progress summary, a final result and an ordered list of events. Jobs run
+    in the worker that started them and heartbeat while they do; a job whose
+    worker died stops heartbeating and is marked failed the next time its
+    status is read or streamed.
+    """
+    def __init__(self, db_path=None, max_running=None):
+        """
+        Initialize the registry
+
+        Args:
+            db_path (str): SQLite file shared by every worker on the host
+            max_running (int): Jobs allowed to run at once in this worker
+        """
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self.max_running = max_running or DEFAULT_MAX_RUNNING
+        self._local = threading.local()
+        self._slots = threading.BoundedSemaphore(self.max_running)
+
+        conn = self._db()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                params TEXT,
+                progress TEXT,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_events (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            ) WITHOUT ROWID
+        """)
+
+    def _db(self):
+        """One SQLite connection per thread, in autocommit mode."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def start(self, kind, fn, params=None):
+        """
+        Run fn(job) on a background thread
+
+        Args:
+            kind (str): Job type, e.g. "expand" or "cluster"
+            fn (callable): Takes a Job and returns the JSON-serializable result
+            params (dict): Parameters recorded with the job
+
+        Returns:
+            str: Job id, or None when this worker is already running max_running jobs
+        """
+        if not self._slots.acquire(blocking=False):
+            return None
+        self._purge()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._db().execute(
+            "INSERT INTO jobs (id, kind, status, params, created_at, updated_at) VALUES (?, ?, 'running', ?, ?, ?)",
+            (job_id, kind, json.dumps(params or {}), now, now)
+        )
+        threading.Thread(target=self._run, args=(job_id, fn), name=f"job-{kind}", daemon=True).start()
+        return job_id
+
+    def _run(self, job_id, fn):
+        job = Job(self, job_id)
+        status = "failed"
+        finished = threading.Event()
+        threading.Thread(target=self._heartbeat, args=(job_id, finished), name="job-heartbeat", daemon=True).start()
+        try:
+            result = fn(job)
+            status = "done"
+            self._update(job_id, status=status, result=json.dumps(result))
+        except JobCancelled:
+            status = "cancelled"
+            self._update(job_id, status=status)
+        except Exception as e:
+            logger.exception("Job %s failed", job_id)
+            self._update(job_id, status=status, error=str(e))
+        finally:
+            finished.set()
+            self._append_event(job_id, {"type": "end", "status": status})
+            self._slots.release()
+
+    def _heartbeat(self, job_id, finished):
+        """Touch the job's row until it finishes, so other workers can tell it is alive."""
+        while not finished.wait(HEARTBEAT_INTERVAL):
+            try:
+                self._db().execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time(), job_id))
+            except sqlite3.Error:
+                logger.exception("Heartbeat for job %s failed", job_id)
+
+    def _fail_stale(self, job_id):
+        """
+        Mark a job failed if it is still active but has stopped heartbeating
+
+        Returns:
+            bool: Whether the job was marked failed
+        """
+        now = time.time()
+        cursor = self._db().execute(
+            "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? "
+            "WHERE id = ? AND status IN (?, ?) AND updated_at < ?",
+            ("Job stopped responding (its worker exited)", now, job_id) + ACTIVE_STATUSES
+            + (now - HEARTBEAT_TIMEOUT,)
+        )
+        if cursor.rowcount:
+            self._append_event(job_id, {"type": "end", "status": "failed"})
+        return cursor.rowcount > 0
+
+    def _update(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self._db().execute(f"UPDATE jobs SET {assignments} WHERE id = ?", tuple(fields.values()) + (job_id,))
+
+    def _append_event(self, job_id, event):
+        conn = self._db()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO job_events (job_id, seq, payload) "
+                "SELECT ?, COALESCE(MAX(seq), -1) + 1, ? FROM job_events WHERE job_id = ?",
+                (job_id, json.dumps(event), job_id)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _purge(self):
+        cutoff = time.time() - JOB_TTL
+        conn = self._db()
+        expired = [row[0] for row in conn.execute("SELECT id FROM jobs WHERE updated_at < ?", (cutoff,))]
+        for job_id in expired:
+            conn.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def status(self, job_id, include_result=False):
+        """
+        Get a job's status
+
+        Args:
+            job_id (str): Job id
+            include_result (bool): Include the final result when the job is done
+
+        Returns:
+            dict: Status, progress and timestamps, or {} for an unknown job
+        """
+        query = "SELECT kind, status, params, progress, result, error, created_at, updated_at FROM jobs WHERE id = ?"
+        row = self._db().execute(query, (job_id,)).fetchone()
+        if row is None:
+            return {}
+        if row[1] in ACTIVE_STATUSES and row[7] < time.time() - HEARTBEAT_TIMEOUT and self._fail_stale(job_id):
+            row = self._db().execute(query, (job_id,)).fetchone()
+        kind, status, params, progress, result, error, created_at, updated_at = row
+        status = {
+            "job_id": job_id,
+            "kind": kind,
+            "status": status,
+            "params": json.loads(params) if params else {},
+            "progress": json.loads(progress) if progress else {},
+            "error": error,
+            "created_at": created_at,
+            "updated_at": updated_at
+        }
+        if include_result and result is not None:
+            status["result"] = json.loads(result)
+        return status
+
+    def cancel(self, job_id):
+        """
+        Ask a running job to stop at its next checkpoint
+
+        Returns:
+            bool: Whether the job was running
+        """
+        cursor = self._db().execute(
+            "UPDATE jobs SET status = 'cancelling', updated_at = ? WHERE id = ? AND status = 'running'",
+            (time.time(), job_id)
+        )
+        return cursor.rowcount > 0
+
+    def events(self, job_id, after=-1):
+        """
+        Get events recorded after a sequence number
+
+        Args:
+            job_id (str): Job id
+            after (int): Last sequence number already seen
+
+        Returns:
+            list: (seq, event) tuples in order
+        """
+        return [
+            (seq, json.loads(payload)) for seq, payload in self._db().execute(
+                "SELECT seq, payload FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after)
+            )
+        ]
+
+    def stream(self, job_id, after=-1):
+        """
+        Yield a job's events as NDJSON lines until the job ends
+
+        Args:
+            job_id (str): Job id
+            after (int): Last sequence number already seen, to resume a stream
+
+        Yields:
+            str: One JSON object per line, each carrying its "seq"
+        """
+        while True:
+            for seq, event in self.events(job_id, after):
+                after = seq
+                yield json.dumps(dict(event, seq=seq)) + "\n"
+                if event.get("type") == "end":
+                    return
+            if not self.status(job_id):
+                return
+            time.sleep(STREAM_POLL_INTERVAL)
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+def get_default_registry():
+    """
+    Get the process-wide job registry
+
+    Returns:
+        JobRegistry: Shared registry backed by JOBS_DB
+    """
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = JobRegistry()
+    return _default_registry
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Keyword List Chunking
+This module splits oversized keyword lists at each endpoint's per-task limit
+and merges the per-chunk DataForSEO responses back into one.
+"""
+import os
+
+# Maximum keywords DataForSEO accepts in a single task
+KEYWORD_LIMITS = {
+    "keywords_data/google/search_volume/live": 1000,
+    "dataforseo_labs/google/bulk_keyword_difficulty/live": 1000,
+    "dataforseo_labs/google/keyword_overview/live": 700,
+}
+DEFAULT_CHUNK_CONCURRENCY = int(os.environ.get('DATAFORSEO_CHUNK_CONCURRENCY', 4))
+
+def keyword_limit(endpoint):
+    """
+    Get the per-task keyword limit of an endpoint
+
+    Args:
+        endpoint (str): API endpoint
+
+    Returns:
+        int: Maximum keywords per task, or None when the endpoint has no known limit
+    """
+    return KEYWORD_LIMITS.get(endpoint)
+
+def normalize_keyword(keyword):
+    """Comparison form of a keyword: lowercased with whitespace collapsed."""
+    return ' '.join(str(keyword).lower().split())
+
+def dedupe_keywords(keywords):
+    """
+    Drop repeated keywords, ignoring case and extra whitespace
+
+    Args:
+        keywords (list): Keywords in caller order
+
+    Returns:
+        list: First spelling of each distinct keyword, in caller order
+    """
+    seen = set()
+    unique = []
+    for keyword in keywords:
+        normalized = normalize_keyword(keyword)
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            unique.append(keyword)
+    return unique
+
+def chunk_keywords(keywords, size):
+    """Split a keyword list into consecutive chunks of at most size keywords."""
+    return [keywords[i:i + size] for i in range(0, len(keywords), size)]
+
+def task_rows(task):
+    """Per-keyword rows of a task: result[0].items for Labs, result[] for search volume."""
+    result = task.get('result') or []
+    if result and isinstance(result[0], dict) and 'items' in result[0]:
+        return result[0].get('items') or []
+    return result
+
+def merge_keyword_responses(responses, keywords, chunks):
+    """
+    Merge per-chunk responses into one response ordered like the input keywords
+
+    Args:
+        responses (list): One response per chunk, in chunk order
+        keywords (list): Deduplicated keywords that were requested
+        chunks (list): Keyword list of each chunk, in chunk order
+
+    Returns:
+        dict: Single-task response holding every chunk's rows, plus a
+            ``chunks`` list reporting the status of each chunk
+    """
+    order = {normalize_keyword(k): i for i, k in enumerate(keywords)}
+    statuses = []
+    rows = []
+    base = None
+    base_task = None
+    cost = 0
+
+    for index, (response, chunk) in enumerate(zip(responses, chunks)):
+        task = (response.get('tasks') or [{}])[0]
+        ok = response.get('status_code') == 20000 and task.get('status_code') == 20000
+        status = {
+            "index": index,
+            "keyword_count": len(chunk),
+            "status_code": task.get('status_code', response.get('status_code')),
+            "status_message": task.get('status_message', response.get('status_message')),
+            "success": ok
+        }
+        statuses.append(status)
+        cost += response.get('cost') or 0
+        if not ok:
+            # Failed keywords are listed so callers can retry just those
+            status["keywords"] = chunk
+            continue
+        if base is None:
+            base, base_task = response, task
+        rows.extend(task_rows(task))
+
+    if base is None:
+        failed = dict(responses[0]) if responses else {"status_code": 500}
+        failed["chunks"] = statuses
+        return failed
+
+    rows.sort(key=lambda row: order.get(normalize_keyword(row.get('keyword', '')), len(order)))
+
+    result = base_task.get('result') or []
+    if result and isinstance(result[0], dict) and 'items' in result[0]:
+        merged_result = [dict(result[0], items=rows, items_count=len(rows), total_count=len(rows))]
+    else:
+        merged_result = rows
+
+    data = dict(base_task.get('data') or {}, keywords=keywords)
+    merged_task = dict(base_task, result=merged_result, result_count=len(merged_result), data=data, cost=cost)
+    failures = sum(1 for status in statuses if not status["success"])
+    return dict(
+        base,
+        tasks=[merged_task],
+        tasks_count=1,
+        tasks_error=1 if failures else 0,
+        cost=cost,
+        partial=failures > 0,
+        chunks=statuses
+    )
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Keyword Expansion Crawler
+This module grows a keyword universe from seed keywords with a bounded
+breadth-first crawl over related keywords and keyword suggestions, streaming
+each newly discovered keyword as soon as its parent's lookup returns.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from utils.keyword_chunking import normalize_keyword
+
+SOURCES = ("related", "suggestions")
+DEFAULT_MAX_DEPTH = 2
+DEFAULT_MAX_KEYWORDS = 10000
+DEFAULT_MAX_COST = 1.0
+DEFAULT_CONCURRENCY = 4
+DEFAULT_PER_KEYWORD_LIMIT = 100
+
+def expansion_rows(response):
+    """
+    Compact rows from a related_keywords or keyword_suggestions response
+
+    Args:
+        response (dict): DataForSEO Labs response
+
+    Returns:
+        list: Dicts with keyword, search volume, CPC and difficulty
+    """
+    rows = []
+    for task in response.get('tasks') or []:
+        if task.get('status_code') != 20000:
+            continue
+        for result in task.get('result') or []:
+            for item in (result or {}).get('items') or []:
+                keyword_data = item.get('keyword_data') or item
+                if not keyword_data.get('keyword'):
+                    continue
+                keyword_info = keyword_data.get('keyword_info') or {}
+                rows.append({
+                    "keyword": keyword_data['keyword'],
+                    "search_volume": keyword_info.get('search_volume'),
+                    "cpc": keyword_info.get('cpc'),
+                    "keyword_difficulty": (keyword_data.get('keyword_properties') or {}).get('keyword_difficulty')
+                })
+    return rows
+
+class KeywordCrawler:
+    """
+    Breadth-first keyword expansion with hard limits.
+
+    Each (keyword, source) lookup is queued in discovery order, so depth 1
+    finishes before depth 2 starts, and at most ``concurrency`` lookups are
+    in flight. A seen-set keeps every keyword from being emitted or expanded
+    twice. The crawl stops submitting lookups once ``max_keywords`` keywords
+    are known or the reported API cost reaches ``max_cost``. Costs are summed from responses,
+    so cached responses count at their original price; the budget errs on the
+    side of spending less.
+    """
+    def __init__(self, client, seeds, location="United States", language="English",
+                 max_depth=None, max_keywords=None, max_cost=DEFAULT_MAX_COST, concurrency=None,
+                 per_keyword_limit=None, sources=SOURCES):
+        """
+        Initialize the crawler
+
+        Args:
+            client (DataForSEOClient): Client used for lookups
+            seeds (list): Seed keywords (depth 0)
+            location (str): Location name
+            language (str): Language name
+            max_depth (int): Deepest level to discover; seeds are depth 0
+            max_keywords (int): Stop after this many keywords, seeds included
+            max_cost (float): Stop once responses report this much API cost (USD);
+                0 allows no spend at all and None means no limit
+            concurrency (int): Lookups in flight at once
+            per_keyword_limit (int): Related keywords requested per lookup
+            sources (tuple): Any of "related" and "suggestions"
+        """
+        self.client = client
+        self.seeds = list(seeds)
+        self.location = location
+        self.language = language
+        self.max_depth = DEFAULT_MAX_DEPTH if max_depth is None else max_depth
+        self.max_keywords = max_keywords or DEFAULT_MAX_KEYWORDS
+        self.max_cost = max_cost
+        self.concurrency = concurrency or DEFAULT_CONCURRENCY
+        self.per_keyword_limit = per_keyword_limit or DEFAULT_PER_KEYWORD_LIMIT
+        self.sources = [source for source in sources if source in SOURCES]
+        self.seen = set()
+        self.cost = 0.0
+        self.lookups = 0
+        self.failed_lookups = 0
+        self.stop_reason = None
+
+    def _lookup(self, source, keyword):
+        if source == "related":
+            return self.client.get_related_keywords(keyword, self.location, self.language, self.per_keyword_limit)
+        return self.client.get_keyword_suggestions(keyword, self.location, self.language)
+
+    def _budget_left(self):
+        if len(self.seen) >= self.max_keywords:
+            self.stop_reason = "max_keywords"
+            return False
+        if self.max_cost is not None and self.cost >= self.max_cost:
+            self.stop_reason = "max_cost"
+            return False
+        return True
+
+    def run(self, emit, should_stop=None, on_progress=None):
+        """
+        Crawl until the frontier is exhausted or a limit is hit
+
+        Args:
+            emit (callable): Called with each batch of newly discovered rows
+                (dicts with keyword, depth, parent, source and metrics)
+            should_stop (callable): Returns True to abandon the crawl early
+            on_progress (callable): Called with summary() after each lookup
+
+        Returns:
+            dict: Final summary
+        """
+        frontier = deque()
+        seeds = []
+        for seed in self.seeds:
+            normalized = normalize_keyword(seed)
+            if normalized and normalized not in self.seen:
+                self.seen.add(normalized)
+                frontier.extend((seed, 0, source) for source in self.sources)
+                seeds.append({"keyword": seed, "depth": 0, "parent": None, "source": "seed"})
+        if seeds:
+            emit(seeds)
+
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="keyword-crawl") as pool:
+            while frontier or in_flight:
+                stopping = should_stop is not None and should_stop()
+                while not stopping and frontier and len(in_flight) < self.concurrency and self._budget_left():
+                    keyword, depth, source = frontier.popleft()
+                    if depth >= self.max_depth:
+                        continue
+                    in_flight[pool.submit(self._lookup, source, keyword)] = (keyword, depth, source)
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    parent, depth, source = in_flight.pop(future)
+                    self.lookups += 1
+                    try:
+                        response = future.result()
+                    except Exception:
+                        response = {}
+                    self.cost += response.get('cost') or 0
+                    if response.get('status_code') != 20000:
+                        self.failed_lookups += 1
+                        continue
+
+                    discovered = []
+                    for row in expansion_rows(response):
+                        normalized = normalize_keyword(row["keyword"])
+                        if normalized in self.seen or len(self.seen) >= self.max_keywords:
+                            continue
+                        self.seen.add(normalized)
+                        if depth + 1 < self.max_depth:
+                            frontier.extend((row["keyword"], depth + 1, next_source) for next_source in self.sources)
+                        discovered.append(dict(row, depth=depth + 1, parent=parent, source=source))
+                    if discovered:
+                        emit(discovered)
+                    if on_progress is not None:
+                        on_progress(self.summary(len(frontier), len(in_flight)))
+
+                if stopping:
+                    # Let in-flight lookups finish but start no new ones
+                    frontier.clear()
+                    self.stop_reason = "cancelled"
+
+        if self.stop_reason is None:
+            self.stop_reason = "exhausted"
+        return self.summary(len(frontier), 0)
+
+    def summary(self, frontier=0, in_flight=0):
+        """Counts describing the crawl so far."""
+        return {
+            "keywords": len(self.seen),
+            "lookups": self.lookups,
+            "failed_lookups": self.failed_lookups,
+            "cost": round(self.cost, 4),
+            "frontier": frontier,
+            "in_flight": in_flight,
+            "stop_reason": self.stop_reason
+        }
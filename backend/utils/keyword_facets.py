@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Keyword Facets
+This module classifies keyword rows locally into questions, long-tail and
+commercial-intent facets, so one broad keyword_ideas fetch can stand in for
+several upstream-filtered ones.
+"""
+import re
+
+# Same question words as the upstream regex filter used by get_keyword_questions,
+# but anchored on a word boundary so e.g. "cancel ..." is not taken for "can ..."
+QUESTION_PATTERN = re.compile(
+    r"^(what|how|why|when|where|who|which|can|is|are|do|does|will|would|could|should)\b"
+)
+COMMERCIAL_PATTERN = re.compile(
+    r"\b(buy|best|cheap|cheapest|price|prices|pricing|cost|costs|deal|deals|discount|coupon|"
+    r"review|reviews|vs|versus|compare|comparison|top|affordable|for sale|near me|shop)\b"
+)
+DEFAULT_LONG_TAIL_WORDS = 3
+
+FACETS = ("questions", "long_tail", "commercial")
+
+def keyword_facets(keyword, long_tail_words=DEFAULT_LONG_TAIL_WORDS):
+    """
+    Get the facets a keyword belongs to
+
+    Args:
+        keyword (str): Keyword text
+        long_tail_words (int): Minimum word count of a long-tail keyword
+
+    Returns:
+        list: Names from FACETS
+    """
+    keyword = keyword.lower()
+    facets = []
+    if QUESTION_PATTERN.match(keyword):
+        facets.append("questions")
+    if len(keyword.split()) >= long_tail_words:
+        facets.append("long_tail")
+    if COMMERCIAL_PATTERN.search(keyword):
+        facets.append("commercial")
+    return facets
+
+def classify_items(items, long_tail_words=DEFAULT_LONG_TAIL_WORDS, facet_limit=None):
+    """
+    Tag keyword rows with their facets and index them per facet
+
+    Args:
+        items (list): keyword_ideas items (rows with a "keyword" field)
+        long_tail_words (int): Minimum word count of a long-tail keyword
+        facet_limit (int): Keep at most this many indices per facet
+
+    Returns:
+        tuple: (copies of items with a "facets" list, facet -> item indices
+            in input order, facet -> total matches)
+    """
+    tagged = []
+    index = {facet: [] for facet in FACETS}
+    counts = {facet: 0 for facet in FACETS}
+    for item in items:
+        facets = keyword_facets(item.get('keyword') or '', long_tail_words)
+        for facet in facets:
+            counts[facet] += 1
+            if facet_limit is None or len(index[facet]) < facet_limit:
+                index[facet].append(len(tagged))
+        tagged.append(dict(item, facets=facets))
+    return tagged, index, counts
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Keyword Intersection
+This module turns ranked_keywords responses for several domains into a compact
+table of the keywords they share plus pairwise overlap counts, using hashed
+keyword sets instead of nested loops.
+"""
+from collections import Counter
+from itertools import combinations
+
+def extract_ranked_rows(response):
+    """
+    Index a ranked_keywords response by keyword
+
+    Args:
+        response (dict): DataForSEO Labs ranked_keywords response
+
+    Returns:
+        dict: keyword -> (position, search volume, url)
+    """
+    rows = {}
+    for task in response.get('tasks') or []:
+        for result in task.get('result') or []:
+            for item in result.get('items') or []:
+                keyword_data = item.get('keyword_data') or {}
+                keyword = keyword_data.get('keyword')
+                if not keyword or keyword in rows:
+                    continue
+                serp_item = (item.get('ranked_serp_element') or {}).get('serp_item') or {}
+                rows[keyword] = (
+                    serp_item.get('rank_group'),
+                    (keyword_data.get('keyword_info') or {}).get('search_volume'),
+                    serp_item.get('url')
+                )
+    return rows
+
+def intersect_domains(domain_rows, min_domains=None, limit=1000):
+    """
+    Find keywords ranked by several domains
+
+    Args:
+        domain_rows (dict): domain -> {keyword: (position, volume, url)}, in display order
+        min_domains (int): Keywords must rank for at least this many domains;
+            defaults to all of them
+        limit (int): Maximum shared keywords to return, by search volume
+
+    Returns:
+        dict: Shared keyword table with positions and URLs aligned to
+            ``domains``, plus per-domain keyword counts and pairwise overlaps
+    """
+    domains = list(domain_rows)
+    keyword_sets = {domain: set(rows) for domain, rows in domain_rows.items()}
+    required = len(domains) if min_domains is None else max(1, min(min_domains, len(domains)))
+
+    if required == len(domains):
+        # Intersect smallest-first so each step shrinks the working set fastest
+        ordered = sorted(keyword_sets.values(), key=len)
+        shared = set(ordered[0]).intersection(*ordered[1:]) if ordered else set()
+    else:
+        counts = Counter()
+        for keywords in keyword_sets.values():
+            counts.update(keywords)
+        shared = {keyword for keyword, count in counts.items() if count >= required}
+
+    rows = []
+    for keyword in shared:
+        positions = []
+        urls = []
+        volume = None
+        for domain in domains:
+            position, domain_volume, url = domain_rows[domain].get(keyword, (None, None, None))
+            positions.append(position)
+            urls.append(url)
+            if volume is None:
+                volume = domain_volume
+        rows.append({
+            "keyword": keyword,
+            "search_volume": volume,
+            "positions": positions,
+            "urls": urls
+        })
+    rows.sort(key=lambda row: (-(row["search_volume"] or 0), row["keyword"]))
+
+    pairwise = [{
+        "domain1": first,
+        "domain2": second,
+        "overlap": len(keyword_sets[first] & keyword_sets[second])
+    } for first, second in combinations(domains, 2)]
+
+    return {
+        "domains": domains,
+        "keyword_counts": {domain: len(keywords) for domain, keywords in keyword_sets.items()},
+        "min_domains": required,
+        "shared_count": len(rows),
+        "shared_keywords": rows[:limit],
+        "pairwise_overlap": pairwise
+    }
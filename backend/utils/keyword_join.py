@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Keyword Metrics Join
+This module flattens search volume, keyword difficulty, keyword overview and
+SERP responses into keyword-indexed dicts and joins them into one compact row
+per keyword, so callers get a single table instead of several envelopes.
+"""
+from utils.keyword_chunking import normalize_keyword, task_rows
+
+def serp_features(item_types):
+    """SERP item types other than plain organic results."""
+    return [item_type for item_type in item_types if item_type != 'organic']
+
+def _succeeded(response):
+    task = (response.get('tasks') or [{}])[0]
+    return response.get('status_code') == 20000 and task.get('status_code') == 20000
+
+def _index(response, extract):
+    """keyword -> extracted fields, over every successful task of a response."""
+    index = {}
+    for task in response.get('tasks') or []:
+        if task.get('status_code') != 20000:
+            continue
+        for row in task_rows(task):
+            if isinstance(row, dict) and row.get('keyword'):
+                index.setdefault(normalize_keyword(row['keyword']), extract(row))
+    return index
+
+def index_search_volume(response):
+    """Search volume response -> keyword -> volume, CPC and competition."""
+    return _index(response, lambda row: {
+        "search_volume": row.get('search_volume'),
+        "cpc": row.get('cpc'),
+        "competition": row.get('competition'),
+        "competition_index": row.get('competition_index')
+    })
+
+def index_difficulty(response):
+    """Bulk keyword difficulty response -> keyword -> difficulty."""
+    return _index(response, lambda row: {"keyword_difficulty": row.get('keyword_difficulty')})
+
+def index_overview(response):
+    """Keyword overview response -> keyword -> intent and SERP feature types."""
+    def extract(row):
+        types = (row.get('serp_info') or {}).get('serp_item_types')
+        return {
+            "main_intent": (row.get('search_intent_info') or {}).get('main_intent'),
+            "serp_features": serp_features(types) if types is not None else None
+        }
+    return _index(response, extract)
+
+def index_serp_features(responses):
+    """
+    Index SERP responses by keyword
+
+    Args:
+        responses (dict): keyword -> regular SERP response
+
+    Returns:
+        dict: keyword -> SERP feature types on the first page
+    """
+    index = {}
+    for keyword, response in responses.items():
+        if not _succeeded(response):
+            continue
+        result = (response['tasks'][0].get('result') or [{}])[0]
+        index[normalize_keyword(keyword)] = {
+            "serp_features": serp_features(result.get('item_types') or [])
+        }
+    return index
+
+def join_keyword_rows(keywords, indexes):
+    """
+    Join keyword-indexed metrics into one row per keyword
+
+    Args:
+        keywords (list): Keywords in the order rows should be returned
+        indexes (list): keyword -> fields dicts; for a field present in several
+            indexes, the first non-null value wins
+
+    Returns:
+        list: One dict per keyword with every joined field
+    """
+    rows = []
+    for keyword in keywords:
+        normalized = normalize_keyword(keyword)
+        row = {"keyword": keyword}
+        for index in indexes:
+            for field, value in index.get(normalized, {}).items():
+                if row.get(field) is None:
+                    row[field] = value
+        rows.append(row)
+    return rows
+
+def source_status(response):
+    """Compact success/failure summary of one source response."""
+    task = (response.get('tasks') or [{}])[0]
+    return {
+        "success": _succeeded(response),
+        "status_code": task.get('status_code', response.get('status_code')),
+        "status_message": task.get('status_message', response.get('status_message')),
+        "partial": bool(response.get('partial'))
+    }
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Keyword Metrics Store
+This module keeps the per-keyword rows of every keyword response the client
+sees in a SQLite file keyed on keyword + location + language, so keyword-list
+lookups only send keywords that are missing or stale upstream.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from utils.keyword_chunking import normalize_keyword, task_rows
+
+KEYWORD_STORE_ENABLED = os.environ.get('KEYWORD_STORE_ENABLED', 'True').lower() == 'true'
+DEFAULT_DB_PATH = os.environ.get(
+    'KEYWORD_STORE_DB', os.path.join(tempfile.gettempdir(), 'dataforseo_keywords.db')
+)
+DEFAULT_MAX_AGE = float(os.environ.get('KEYWORD_STORE_MAX_AGE', 7 * 24 * 3600))
+
+# Endpoint -> source its rows are stored under. Labs discovery endpoints share
+# one source since their items carry the same keyword_info/keyword_properties
+# block; keyword_overview, whose "no data" rows are stored too, has its own so
+# those rows never shadow rows the discovery endpoints found.
+INGEST_SOURCES = {
+    "keywords_data/google/search_volume/live": "search_volume",
+    "dataforseo_labs/google/bulk_keyword_difficulty/live": "difficulty",
+    "dataforseo_labs/google/keyword_overview/live": "overview",
+    "dataforseo_labs/google/keyword_ideas/live": "labs",
+    "dataforseo_labs/google/keyword_suggestions/live": "labs",
+    "dataforseo_labs/google/related_keywords/live": "labs",
+}
+
+# Keyword-list endpoint -> sources that can answer it, in order of preference
+SERVING_SOURCES = {
+    "keywords_data/google/search_volume/live": ("search_volume",),
+    "dataforseo_labs/google/bulk_keyword_difficulty/live": ("difficulty", "overview", "labs"),
+    "dataforseo_labs/google/keyword_overview/live": ("overview", "labs"),
+}
+# Sources holding full Labs keyword rows
+LABS_SOURCES = ("overview", "labs")
+
+# SQLite's default limit on bound parameters is 999 on older builds
+LOOKUP_BATCH = 500
+
+def _difficulty_row(row):
+    """Shape a Labs keyword row like a bulk_keyword_difficulty item."""
+    return {
+        "se_type": row.get('se_type', 'google'),
+        "keyword": row.get('keyword'),
+        "keyword_difficulty": (row.get('keyword_properties') or {}).get('keyword_difficulty')
+    }
+
+class KeywordStore:
+    """
+    Per-keyword metrics shared by every worker on the host.
+
+    Rows are stored as returned by DataForSEO, one per (keyword, location,
+    language, source). Keywords a keyword-list request came back without are
+    stored as empty rows, so they are not re-bought either, but only when the
+    task returned some rows: an empty or failed task stores nothing.
+    """
+    def __init__(self, db_path=None, max_age=None):
+        """
+        Initialize the store
+
+        Args:
+            db_path (str): SQLite file shared by every worker on the host
+            max_age (float): Seconds after which a stored row counts as stale
+        """
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self.max_age = max_age if max_age is not None else DEFAULT_MAX_AGE
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.counters = {
+            "keywords_local": 0,
+            "keywords_upstream": 0,
+            "rows_stored": 0
+        }
+
+        conn = self._db()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS keyword_metrics (
+                keyword TEXT NOT NULL,
+                location TEXT NOT NULL,
+                language TEXT NOT NULL,
+                source TEXT NOT NULL,
+                row TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (keyword, location, language, source)
+            ) WITHOUT ROWID
+        """)
+
+    def _db(self):
+        """One SQLite connection per thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _scope(task):
+        """(location, language) key of a task, or None when either is missing."""
+        location = task.get('location_name') or task.get('location_code')
+        language = task.get('language_name') or task.get('language_code')
+        if location is None or language is None:
+            return None
+        return str(location).lower(), str(language).lower()
+
+    def serves(self, endpoint):
+        """Whether keyword-list calls to endpoint can be answered from the store."""
+        return endpoint in SERVING_SOURCES
+
+    def ingest(self, endpoint, data, response):
+        """
+        Store the keyword rows of a response
+
+        Args:
+            endpoint (str): Endpoint that was called
+            data (list): Request body, one task per response task
+            response (dict): Response from the API
+        """
+        source = INGEST_SOURCES.get(endpoint)
+        if source is None or not isinstance(data, list) or response.get('status_code') != 20000:
+            return
+        now = time.time()
+        records = []
+        for request_task, task in zip(data, response.get('tasks') or []):
+            scope = self._scope(request_task)
+            if scope is None or task.get('status_code') != 20000:
+                continue
+            seen = set()
+            rows = task_rows(task)
+            if not rows:
+                continue  # an empty result says nothing about individual keywords
+            for row in rows:
+                if not isinstance(row, dict):
+                    continue
+                row = row.get('keyword_data') or row
+                if not row.get('keyword'):
+                    continue
+                keyword = normalize_keyword(row['keyword'])
+                seen.add(keyword)
+                records.append((keyword, scope[0], scope[1], source, json.dumps(row), now))
+            if endpoint not in SERVING_SOURCES:
+                continue
+            # Keywords a keyword-list call came back without are remembered as such
+            for keyword in request_task.get('keywords') or []:
+                keyword = normalize_keyword(keyword)
+                if keyword not in seen:
+                    records.append((keyword, scope[0], scope[1], source, None, now))
+        if not records:
+            return
+        conn = self._db()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO keyword_metrics VALUES (?, ?, ?, ?, ?, ?)", records)
+        with self._lock:
+            self.counters["rows_stored"] += len(records)
+
+    def lookup(self, endpoint, task, keywords):
+        """
+        Find fresh stored rows for a keyword-list request
+
+        Args:
+            endpoint (str): Keyword-list endpoint about to be called
+            task (dict): Task fields other than keywords (location, language)
+            keywords (list): Deduplicated keywords
+
+        Returns:
+            tuple: (normalized keyword -> row shaped for endpoint, or None when
+                upstream has no data for it; keywords that must be fetched)
+        """
+        sources = SERVING_SOURCES.get(endpoint)
+        scope = self._scope(task)
+        if sources is None or scope is None or not keywords:
+            return {}, list(keywords)
+
+        normalized = [normalize_keyword(keyword) for keyword in keywords]
+        found = {}
+        conn = self._db()
+        cutoff = time.time() - self.max_age
+        for start in range(0, len(normalized), LOOKUP_BATCH):
+            batch = normalized[start:start + LOOKUP_BATCH]
+            cursor = conn.execute(
+                f"SELECT keyword, source, row FROM keyword_metrics "
+                f"WHERE location = ? AND language = ? AND updated_at >= ? "
+                f"AND source IN ({','.join('?' * len(sources))}) "
+                f"AND keyword IN ({','.join('?' * len(batch))})",
+                (scope[0], scope[1], cutoff) + tuple(sources) + tuple(batch)
+            )
+            for keyword, source, row in cursor:
+                found.setdefault(keyword, {})[source] = row
+
+        rows = {}
+        for keyword, by_source in found.items():
+            # A row from any source beats another source's "no data"
+            source = next((s for s in sources if by_source.get(s) is not None), None)
+            row = by_source[source] if source is not None else None
+            if row is not None:
+                row = json.loads(row)
+                if source in LABS_SOURCES and endpoint.endswith("bulk_keyword_difficulty/live"):
+                    row = _difficulty_row(row)
+            rows[keyword] = row
+
+        missing = [keyword for keyword, norm in zip(keywords, normalized) if norm not in rows]
+        with self._lock:
+            self.counters["keywords_local"] += len(keywords) - len(missing)
+            self.counters["keywords_upstream"] += len(missing)
+        return rows, missing
+
+    def local_response(self, endpoint, task, keywords, rows):
+        """
+        Build a single-task response from stored rows
+
+        Args:
+            endpoint (str): Endpoint the response stands in for
+            task (dict): Task fields other than keywords
+            keywords (list): Keywords answered locally
+            rows (dict): Rows from lookup()
+
+        Returns:
+            dict: Response shaped like the endpoint's own, costing nothing
+        """
+        items = [row for row in (rows.get(normalize_keyword(k)) for k in keywords) if row is not None]
+        if endpoint.startswith("keywords_data/"):
+            result = items
+        else:
+            result = [{"items": items, "items_count": len(items), "total_count": len(items)}]
+        return {
+            "status_code": 20000,
+            "status_message": "Ok. Served from keyword store.",
+            "cost": 0,
+            "tasks_count": 1,
+            "tasks_error": 0,
+            "tasks": [{
+                "status_code": 20000,
+                "status_message": "Ok. Served from keyword store.",
+                "cost": 0,
+                "result_count": len(result),
+                "data": dict(task, keywords=keywords),
+                "result": result
+            }]
+        }
+
+    def stats(self):
+        """
+        Get local/upstream keyword counts and the store size
+
+        Returns:
+            dict: Counters for this worker plus the host-wide row count
+        """
+        with self._lock:
+            stats = dict(self.counters)
+        looked_up = stats["keywords_local"] + stats["keywords_upstream"]
+        stats["local_ratio"] = round(stats["keywords_local"] / looked_up, 4) if looked_up else 0.0
+        stats["rows"] = self._db().execute("SELECT COUNT(*) FROM keyword_metrics").fetchone()[0]
+        return stats
+
+_default_keyword_store = None
+_default_keyword_store_lock = threading.Lock()
+
+def get_default_keyword_store():
+    """
+    Get the process-wide keyword store, configured from the environment
+
+    Returns:
+        KeywordStore: Shared store, or None when KEYWORD_STORE_ENABLED is false
+    """
+    global _default_keyword_store
+    if not KEYWORD_STORE_ENABLED:
+        return None
+    with _default_keyword_store_lock:
+        if _default_keyword_store is None:
+            _default_keyword_store = KeywordStore()
+    return _default_keyword_store
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Keyword Opportunity Scoring
+This module loads keyword rows into NumPy columns, scores every keyword with
+one vectorized weighted product and returns only the requested page of the
+ranking, so large keyword sets never have to be sorted in the browser.
+"""
+import numpy as np
+from utils.gap_matrix import FILTER_OPS, page_order
+
+# Each weight is the exponent of its factor in
+#   (volume / 1000)^volume * (1 - difficulty / 100)^difficulty * cpc^cpc
+#   * (1 - competition)^competition * (1 + trend * direction)
+# so the defaults reproduce the dashboard's original opportunity score.
+DEFAULT_WEIGHTS = {
+    "volume": 1.0,
+    "difficulty": 1.0,
+    "cpc": 1.0,
+    "competition": 0.0,
+    "trend": 0.0
+}
+# Difficulty assumed for keywords without one
+UNKNOWN_DIFFICULTY = 50.0
+# Relative change in recent search volume that counts as trending up or down
+TREND_CHANGE = 0.1
+COLUMNS = ("search_volume", "cpc", "competition", "keyword_difficulty", "trend", "trend_change", "opportunity_score")
+TREND_DIRECTIONS = {"up": 1.0, "stable": 0.0, "down": -1.0}
+
+def _first(row, *fields):
+    """First non-null of several spellings of a field."""
+    for field in fields:
+        if row.get(field) is not None:
+            return row[field]
+    return None
+
+def volume_change(keyword_info):
+    """
+    Relative change in search volume, from Labs' trend block or monthly searches
+
+    Args:
+        keyword_info (dict): Labs keyword_info, or a search volume row
+
+    Returns:
+        float: e.g. 0.25 for +25%, or None when there is too little history
+    """
+    trend = keyword_info.get('search_volume_trend') or {}
+    if trend.get('quarterly') is not None:
+        return trend['quarterly'] / 100
+    monthly = [
+        month.get('search_volume') or 0
+        for month in sorted(
+            keyword_info.get('monthly_searches') or [],
+            key=lambda month: (month.get('year') or 0, month.get('month') or 0)
+        )
+    ]
+    if len(monthly) < 6:
+        return None
+    recent, previous = sum(monthly[-3:]), sum(monthly[-6:-3])
+    return (recent - previous) / previous if previous else None
+
+def flatten_row(row):
+    """
+    Compact metrics of one keyword row
+
+    Accepts Labs items (keyword_info / keyword_properties blocks, optionally
+    wrapped in keyword_data), search volume rows and the dashboard's own
+    camelCase rows.
+
+    Args:
+        row (dict): Keyword row
+
+    Returns:
+        dict: keyword, search_volume, cpc, competition, keyword_difficulty,
+            trend (-1, 0 or 1) and trend_change, with None for unknown values
+    """
+    row = row.get('keyword_data') or row
+    info = row.get('keyword_info') or {}
+    properties = row.get('keyword_properties') or {}
+    competition = _first(info, 'competition')
+    if competition is None:
+        competition = _first(row, 'competition')
+        # Search volume rows give a label here and the number as competition_index
+        if isinstance(competition, str) or competition is None:
+            index = row.get('competition_index')
+            competition = index / 100 if index is not None else None
+
+    change = volume_change(info or row)
+    if change is None:
+        change = row.get('trend_change')
+    trend = TREND_DIRECTIONS.get(row.get('trend')) if isinstance(row.get('trend'), str) else None
+    if trend is None and change is not None:
+        trend = 1.0 if change >= TREND_CHANGE else -1.0 if change <= -TREND_CHANGE else 0.0
+    return {
+        "keyword": row.get('keyword'),
+        "search_volume": _first(info, 'search_volume') if info else _first(row, 'search_volume', 'searchVolume'),
+        "cpc": _first(info, 'cpc') if info else _first(row, 'cpc'),
+        "competition": competition,
+        "keyword_difficulty": _first(properties, 'keyword_difficulty') if properties else _first(row, 'keyword_difficulty', 'difficulty'),
+        "trend": trend,
+        "trend_change": change
+    }
+
+class OpportunityTable:
+    """
+    Columnar keyword metrics with a vectorized opportunity score.
+
+    Columns are float64 arrays aligned with ``keywords``; unknown values are
+    NaN. Scores treat missing volume and CPC as 0, missing difficulty as
+    UNKNOWN_DIFFICULTY, and missing competition or trend as neutral.
+    """
+    def __init__(self, rows):
+        """
+        Build the table
+
+        Args:
+            rows (list): Keyword rows in any shape flatten_row accepts; rows
+                without a keyword are skipped
+        """
+        flat = [flatten_row(row) for row in rows if isinstance(row, dict)]
+        flat = [row for row in flat if row["keyword"]]
+        self.keywords = [row["keyword"] for row in flat]
+        for column in COLUMNS[:-1]:
+            setattr(self, column, np.array([row[column] for row in flat], dtype=np.float64))
+        self.opportunity_score = np.zeros(len(flat))
+        self.weights = dict(DEFAULT_WEIGHTS)
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def column(self, name):
+        """Column array by name, one of COLUMNS."""
+        if name not in COLUMNS:
+            raise ValueError(f"Unknown column: {name}")
+        return getattr(self, name)
+
+    def score(self, weights=None):
+        """
+        Score every keyword
+
+        Args:
+            weights (dict): Overrides for DEFAULT_WEIGHTS
+
+        Returns:
+            numpy.ndarray: The opportunity_score column
+        """
+        weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        unknown = set(weights) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown weights: {', '.join(sorted(unknown))}")
+        self.weights = {name: float(weight) for name, weight in weights.items()}
+
+        volume = np.nan_to_num(self.search_volume) / 1000
+        ease = 1 - np.clip(np.nan_to_num(self.keyword_difficulty, nan=UNKNOWN_DIFFICULTY), 0, 100) / 100
+        cpc = np.nan_to_num(self.cpc)
+        openness = 1 - np.clip(np.nan_to_num(self.competition), 0, 1)
+        trend = np.nan_to_num(self.trend)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = (
+                np.power(volume, self.weights["volume"])
+                * np.power(ease, self.weights["difficulty"])
+                * np.power(cpc, self.weights["cpc"])
+                * np.power(openness, self.weights["competition"])
+                * np.maximum(1 + self.weights["trend"] * trend, 0)
+            )
+        self.opportunity_score = np.nan_to_num(score, nan=0.0, posinf=0.0)
+        return self.opportunity_score
+
+    def mask(self, filters=None):
+        """
+        Rows matching every filter
+
+        Args:
+            filters (list): [column, op, value] triples, ANDed together; trend
+                also takes "up", "stable" or "down"
+
+        Returns:
+            numpy.ndarray: Boolean mask
+        """
+        mask = np.ones(len(self.keywords), dtype=bool)
+        for column_name, op, value in filters or []:
+            if op not in FILTER_OPS:
+                raise ValueError(f"Unknown filter operator: {op}")
+            if column_name == "trend" and isinstance(value, str):
+                value = TREND_DIRECTIONS[value] if value in TREND_DIRECTIONS else np.nan
+            with np.errstate(invalid='ignore'):
+                mask &= FILTER_OPS[op](self.column(column_name), value)
+        return mask
+
+    def select(self, mask, sort_by="opportunity_score", order="desc", offset=0, limit=50):
+        """
+        Sort and page the rows of a mask
+
+        Args:
+            mask (numpy.ndarray): Rows to consider, from mask()
+            sort_by (str): Column to sort on; unknown values sort last
+            order (str): "asc" or "desc"
+            offset (int): Rows to skip
+            limit (int): Rows to return
+
+        Returns:
+            numpy.ndarray: Row indices of the page
+        """
+        candidates = np.flatnonzero(mask)
+        return candidates[page_order(self.column(sort_by)[candidates], order, offset, limit)]
+
+    def aggregates(self, mask):
+        """
+        Segment counts over the rows of a mask
+
+        Returns:
+            dict: quick_wins (volume > 500, difficulty < 40), high_value
+                (volume > 1000, CPC > 2), trending (rising volume) and
+                trending_down counts
+        """
+        volume, difficulty, cpc, trend = self.search_volume, self.keyword_difficulty, self.cpc, self.trend
+        with np.errstate(invalid='ignore'):
+            segments = {
+                "quick_wins": (volume > 500) & (difficulty < 40),
+                "high_value": (volume > 1000) & (cpc > 2),
+                "trending": trend > 0,
+                "trending_down": trend < 0
+            }
+        return {name: int(np.count_nonzero(segment & mask)) for name, segment in segments.items()}
+
+    def rows(self, indices):
+        """
+        Materialize selected keywords as compact rows
+
+        Args:
+            indices (numpy.ndarray): Row indices from select()
+
+        Returns:
+            list: Dicts with the keyword, its metrics and its score
+        """
+        def value(column, i, cast=float):
+            v = column[i]
+            return None if np.isnan(v) else cast(v)
+        return [{
+            "keyword": self.keywords[i],
+            "search_volume": value(self.search_volume, i, int),
+            "cpc": value(self.cpc, i),
+            "competition": value(self.competition, i),
+            "keyword_difficulty": value(self.keyword_difficulty, i, int),
+            "trend": {1.0: "up", 0.0: "stable", -1.0: "down"}.get(value(self.trend, i)),
+            "trend_change": value(self.trend_change, i),
+            "opportunity_score": round(float(self.opportunity_score[i]), 2)
+        } for i in indices.tolist()]
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Response Projection
+This module reduces DataForSEO envelopes to the fields a page needs. Each
+projectable route names a row type: a __slots__ class mapping its fields to
+paths in the route's items, with predefined views. A request asks for a view
+(?view=slim) or for fields (?fields=keyword,search_volume), and the route's
+response is reduced to those rows, which the app's JSON provider serializes
+directly through their __json__ method. Without either, routes return the
+full envelope as before.
+"""
+import functools
+from flask import request, jsonify
+
+# View returning the DataForSEO envelope untouched
+FULL_VIEW = "full"
+# View returning every field a row type knows
+ALL_VIEW = "all"
+
+def dig(item, path):
+    """Value at a path of keys in nested dicts, or None when any step is missing."""
+    for key in path:
+        try:
+            item = item[key]
+        except (KeyError, TypeError, IndexError):
+            return None
+    return item
+
+class Row:
+    """
+    Base for projected rows.
+
+    Subclasses map field names to paths in a DataForSEO item (FIELDS), name
+    their predefined views (VIEWS, with "slim" as the compact default), and
+    set __slots__ to the field names. Rows are read from result[].items, or
+    from result[] itself when SOURCE is "result". Each row keeps a reference
+    to the requested field tuple, so it can be serialized without first being
+    turned into a dict.
+    """
+    __slots__ = ("_fields",)
+    FIELDS = {}
+    VIEWS = {}
+    SOURCE = "items"
+
+    @classmethod
+    def from_item(cls, item, fields):
+        """
+        Build a row holding the given fields of an item
+
+        Args:
+            item (dict): DataForSEO item
+            fields (tuple): Field names from FIELDS
+
+        Returns:
+            Row: Row with those fields set
+        """
+        row = cls.__new__(cls)
+        row._fields = fields
+        paths = cls.FIELDS
+        for name in fields:
+            setattr(row, name, dig(item, paths[name]))
+        return row
+
+    def __json__(self):
+        """The row's fields as a dict, built as the encoder reaches the row."""
+        return {name: getattr(self, name) for name in self._fields}
+
+    @classmethod
+    def resolve(cls, view=None, fields=None):
+        """
+        Fields for a requested view or field list
+
+        Args:
+            view (str): View name, "all" or "full"
+            fields (str|list): Field names, comma-separated or as a list
+
+        Returns:
+            tuple: Field names, or None for the full envelope
+
+        Raises:
+            ValueError: If the view or a field is unknown
+        """
+        if fields:
+            if isinstance(fields, str):
+                fields = fields.split(',')
+            fields = tuple(dict.fromkeys(str(name).strip() for name in fields if str(name).strip()))
+            unknown = [name for name in fields if name not in cls.FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}; available: {', '.join(cls.FIELDS)}")
+            return fields or None
+        if not view or view == FULL_VIEW:
+            return None
+        if view == ALL_VIEW:
+            return tuple(cls.FIELDS)
+        if view not in cls.VIEWS:
+            raise ValueError(f"view must be one of {', '.join((FULL_VIEW, ALL_VIEW) + tuple(cls.VIEWS))}")
+        return cls.VIEWS[view]
+
+def project(response, row_type, fields):
+    """
+    Reduce a DataForSEO response to rows of the given fields
+
+    Rows from every successful task are concatenated, so chunked keyword
+    requests come back as one list. Failed responses are returned as they
+    are, so the upstream error stays visible.
+
+    Args:
+        response (dict): DataForSEO response
+        row_type (type): Row subclass describing the response's items
+        fields (tuple): Field names to keep
+
+    Returns:
+        dict: fields, items (Row objects, serialized by the app's JSON
+            provider), items_count, total_count, cost and, when some tasks
+            failed, their errors
+    """
+    if not isinstance(response, dict) or response.get('status_code') != 20000:
+        return response
+    rows, errors = [], []
+    total = 0
+    from_item = row_type.from_item
+    for task in response.get('tasks') or []:
+        if task.get('status_code') != 20000:
+            errors.append({"status_code": task.get('status_code'), "status_message": task.get('status_message')})
+            continue
+        for result in task.get('result') or []:
+            if row_type.SOURCE == "result":
+                rows.append(from_item(result, fields))
+                total += 1
+                continue
+            result = result or {}
+            items = result.get('items') or []
+            total += result.get('total_count') or len(items)
+            rows.extend(from_item(item, fields) for item in items)
+
+    projected = {
+        "fields": list(fields),
+        "items": rows,
+        "items_count": len(rows),
+        "total_count": total,
+        "cost": response.get('cost')
+    }
+    if errors:
+        projected["errors"] = errors
+    return projected
+
+def projected(row_type):
+    """
+    Route decorator adding ?view= / ?fields= projection
+
+    The view and fields may also be given in the JSON body. They are checked
+    before the route runs, so a bad request costs no API call. The route
+    returns its DataForSEO response as a dict; error tuples and Response
+    objects pass through.
+
+    Args:
+        row_type (type): Row subclass describing the route's items
+    """
+    def decorator(view_fn):
+        @functools.wraps(view_fn)
+        def wrapper(*args, **kwargs):
+            body = request.get_json(silent=True)
+            body = body if isinstance(body, dict) else {}
+            try:
+                fields = row_type.resolve(
+                    request.args.get('view') or body.get('view'),
+                    request.args.get('fields') or body.get('fields')
+                )
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            result = view_fn(*args, **kwargs)
+            if fields is None or not isinstance(result, dict):
+                return result
+            return jsonify(project(result, row_type, fields))
+        return wrapper
+    return decorator
+
+class KeywordRow(Row):
+    """Labs keyword items: keyword_ideas, keyword_suggestions, keyword_overview"""
+    FIELDS = {
+        "keyword": ("keyword",),
+        "search_volume": ("keyword_info", "search_volume"),
+        "cpc": ("keyword_info", "cpc"),
+        "competition": ("keyword_info", "competition"),
+        "competition_level": ("keyword_info", "competition_level"),
+        "keyword_difficulty": ("keyword_properties", "keyword_difficulty"),
+        "main_intent": ("search_intent_info", "main_intent"),
+        "monthly_searches": ("keyword_info", "monthly_searches"),
+        "search_volume_trend": ("keyword_info", "search_volume_trend"),
+        "categories": ("keyword_info", "categories"),
+    }
+    __slots__ = tuple(FIELDS)
+    VIEWS = {
+        "slim": ("keyword", "search_volume", "cpc", "competition", "keyword_difficulty"),
+        "intent": ("keyword", "search_volume", "keyword_difficulty", "main_intent"),
+        "trend": ("keyword", "search_volume", "monthly_searches", "search_volume_trend"),
+    }
+
+class RelatedKeywordRow(KeywordRow):
+    """Labs related_keywords items, which wrap the keyword in keyword_data"""
+    FIELDS = {name: ("keyword_data",) + path for name, path in KeywordRow.FIELDS.items()}
+    FIELDS["depth"] = ("depth",)
+    __slots__ = ("depth",)
+
+class SearchVolumeRow(Row):
+    """Google Ads search_volume results, one per keyword"""
+    FIELDS = {
+        "keyword": ("keyword",),
+        "search_volume": ("search_volume",),
+        "cpc": ("cpc",),
+        "competition": ("competition",),
+        "competition_index": ("competition_index",),
+        "low_top_of_page_bid": ("low_top_of_page_bid",),
+        "high_top_of_page_bid": ("high_top_of_page_bid",),
+        "monthly_searches": ("monthly_searches",),
+    }
+    __slots__ = tuple(FIELDS)
+    VIEWS = {
+        "slim": ("keyword", "search_volume", "cpc", "competition", "competition_index"),
+        "trend": ("keyword", "search_volume", "monthly_searches"),
+    }
+    SOURCE = "result"
+
+class DifficultyRow(Row):
+    """Labs bulk_keyword_difficulty items"""
+    FIELDS = {
+        "keyword": ("keyword",),
+        "keyword_difficulty": ("keyword_difficulty",),
+    }
+    __slots__ = tuple(FIELDS)
+    VIEWS = {"slim": ("keyword", "keyword_difficulty")}
+
+class RankedKeywordRow(Row):
+    """Labs ranked_keywords items: a keyword and the domain's ranking for it"""
+    FIELDS = {
+        "keyword": ("keyword_data", "keyword"),
+        "search_volume": ("keyword_data", "keyword_info", "search_volume"),
+        "cpc": ("keyword_data", "keyword_info", "cpc"),
+        "competition": ("keyword_data", "keyword_info", "competition"),
+        "keyword_difficulty": ("keyword_data", "keyword_properties", "keyword_difficulty"),
+        "main_intent": ("keyword_data", "search_intent_info", "main_intent"),
+        "position": ("ranked_serp_element", "serp_item", "rank_group"),
+        "rank_absolute": ("ranked_serp_element", "serp_item", "rank_absolute"),
+        "previous_rank_absolute": ("ranked_serp_element", "serp_item", "rank_changes", "previous_rank_absolute"),
+        "url": ("ranked_serp_element", "serp_item", "url"),
+        "title": ("ranked_serp_element", "serp_item", "title"),
+        "etv": ("ranked_serp_element", "serp_item", "etv"),
+        "traffic_cost": ("ranked_serp_element", "serp_item", "estimated_paid_traffic_cost"),
+    }
+    __slots__ = tuple(FIELDS)
+    VIEWS = {
+        "slim": ("keyword", "search_volume", "cpc", "keyword_difficulty", "position", "url", "etv"),
+        "positions": ("keyword", "position", "previous_rank_absolute", "rank_absolute", "url"),
+    }
+
+class IntersectionRow(Row):
+    """Labs domain_intersection items: a keyword and both domains' rankings"""
+    FIELDS = {
+        "keyword": ("keyword_data", "keyword"),
+        "search_volume": ("keyword_data", "keyword_info", "search_volume"),
+        "cpc": ("keyword_data", "keyword_info", "cpc"),
+        "keyword_difficulty": ("keyword_data", "keyword_properties", "keyword_difficulty"),
+        "position1": ("first_domain_serp_element", "rank_group"),
+        "url1": ("first_domain_serp_element", "url"),
+        "etv1": ("first_domain_serp_element", "etv"),
+        "position2": ("second_domain_serp_element", "rank_group"),
+        "url2": ("second_domain_serp_element", "url"),
+        "etv2": ("second_domain_serp_element", "etv"),
+    }
+    __slots__ = tuple(FIELDS)
+    VIEWS = {
+        "slim": ("keyword", "search_volume", "cpc", "keyword_difficulty", "position1", "position2"),
+        "urls": ("keyword", "position1", "url1", "position2", "url2"),
+    }
+
+class CompetitorRow(Row):
+    """Labs competitors_domain items"""
+    FIELDS = {
+        "domain": ("domain",),
+        "avg_position": ("avg_position",),
+        "sum_position": ("sum_position",),
+        "intersections": ("intersections",),
+        "etv": ("metrics", "organic", "etv"),
+        "keywords": ("metrics", "organic", "count"),
+        "traffic_cost": ("metrics", "organic", "estimated_paid_traffic_cost"),
+        "full_etv": ("full_domain_metrics", "organic", "etv"),
+        "full_keywords": ("full_domain_metrics", "organic", "count"),
+    }
+    __slots__ = tuple(FIELDS)
+    VIEWS = {"slim": ("domain", "avg_position", "intersections", "etv", "keywords")}
+
+class DomainOverviewRow(Row):
+    """Labs domain_rank_overview items, one per location and language"""
+    FIELDS = {
+        "location_code": ("location_code",),
+        "language_code": ("language_code",),
+        "organic_etv": ("metrics", "organic", "etv"),
+        "organic_keywords": ("metrics", "organic", "count"),
+        "organic_traffic_cost": ("metrics", "organic", "estimated_paid_traffic_cost"),
+        "pos_1": ("metrics", "organic", "pos_1"),
+        "pos_2_3": ("metrics", "organic", "pos_2_3"),
+        "pos_4_10": ("metrics", "organic", "pos_4_10"),
+        "paid_etv": ("metrics", "paid", "etv"),
+        "paid_keywords": ("metrics", "paid", "count"),
+    }
+    __slots__ = tuple(FIELDS)
+    VIEWS = {"slim": ("organic_etv", "organic_keywords", "organic_traffic_cost", "pos_1", "pos_2_3", "pos_4_10")}
+
+class BacklinkSummaryRow(Row):
+    """Backlinks overview results, one per target"""
+    FIELDS = {
+        "target": ("target",),
+        "rank": ("rank",),
+        "backlinks": ("backlinks",),
+        "referring_domains": ("referring_domains",),
+        "referring_main_domains": ("referring_main_domains",),
+        "referring_ips": ("referring_ips",),
+        "broken_backlinks": ("broken_backlinks",),
+        "first_seen": ("first_seen",),
+    }
+    __slots__ = tuple(FIELDS)
+    VIEWS = {"slim": ("target", "rank", "backlinks", "referring_domains")}
+    SOURCE = "result"
+
+class SerpItemRow(Row):
+    """Organic SERP items of every type"""
+    FIELDS = {
+        "type": ("type",),
+        "position": ("rank_group",),
+        "rank_absolute": ("rank_absolute",),
+        "domain": ("domain",),
+        "url": ("url",),
+        "title": ("title",),
+        "description": ("description",),
+        "breadcrumb": ("breadcrumb",),
+    }
+    __slots__ = tuple(FIELDS)
+    VIEWS = {"slim": ("type", "position", "domain", "url", "title")}
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Rank Check Scheduler
+This module runs each active rank-tracking project's daily check: it submits
+every tracked keyword through the queued SERP path in one bulk call and
+appends the domain's positions to the rank store as results arrive. Each
+SERP is also kept in the snapshot archive.
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import wait
+from utils.rank_store import NOT_RANKED, day_number
+from utils.serp_parser import parse_response
+from utils.serp_archive import archive_response
+
+logger = logging.getLogger(__name__)
+
+# Off by default: the scheduler submits billed SERP tasks, so it is started
+# from an explicit entry point (gunicorn.conf.py, scheduler.py or app.py's
+# __main__) and never by importing the app
+SCHEDULER_ENABLED = os.environ.get('RANK_TRACKING_SCHEDULER_ENABLED', 'False').lower() == 'true'
+# Seconds between scans for projects that have not been checked today
+DEFAULT_INTERVAL = float(os.environ.get('RANK_TRACKING_INTERVAL', 600))
+# Results appended per write
+RECORD_BATCH = 1000
+
+def is_temporary_path(path):
+    """Whether a file lives in the temp directory, which a container restart wipes."""
+    temp_dir = os.path.realpath(tempfile.gettempdir())
+    return os.path.realpath(path).startswith(temp_dir + os.sep)
+
+def domain_matches(result_domain, domain):
+    """Whether an organic result's domain is the tracked domain or one of its subdomains."""
+    result_domain = (result_domain or '').lower()
+    return result_domain == domain or result_domain.endswith('.' + domain)
+
+def find_rank(parsed, domain):
+    """
+    The tracked domain's best organic position in a parsed SERP
+
+    Args:
+        parsed (dict): serp_parser.parse_serp() output
+        domain (str): Normalized tracked domain
+
+    Returns:
+        tuple: (position, URL), or (NOT_RANKED, None)
+    """
+    organic = parsed["organic"]
+    for position, result_domain, url in zip(organic["position"], organic["domain"], organic["url"]):
+        if domain_matches(result_domain, domain):
+            return position, url
+    return NOT_RANKED, None
+
+def run_check(client, store, project, day, job=None):
+    """
+    Check every keyword of a project once and record the positions
+
+    Args:
+        client (DataForSEOClient): Client used for SERP lookups
+        store (RankStore): Store the positions are appended to
+        project (dict): Project from the store
+        day (int): Day number the results are recorded under
+        job (Job): Optional job handle for progress and cancellation
+
+    Returns:
+        dict: checked, ranked, failed and cost counts
+    """
+    keywords = store.project_keywords(project["id"])
+    ids = {keyword: keyword_id for keyword_id, keyword in keywords}
+    responses = client.get_serp_data_many(
+        list(ids), project["location"], project["language"], depth=project["depth"], mode="queued"
+    )
+    pending = {future: keyword for keyword, future in responses.items()}
+    batch = []
+    summary = {"checked": 0, "ranked": 0, "failed": 0, "cost": 0.0}
+    while pending:
+        if job is not None:
+            job.check_cancelled()
+        done, _ = wait(pending, timeout=1.0)
+        for future in done:
+            keyword = pending.pop(future)
+            try:
+                response = future.result()
+            except Exception:
+                response = {}
+            summary["cost"] += response.get('cost') or 0
+            parsed = parse_response(response)
+            if parsed is None:
+                summary["failed"] += 1
+                continue
+            archive_response(response)
+            position, url = find_rank(parsed, project["domain"])
+            summary["checked"] += 1
+            summary["ranked"] += position != NOT_RANKED
+            batch.append((ids[keyword], position, url))
+        if len(batch) >= RECORD_BATCH or (batch and not pending):
+            store.record(project["id"], day, batch)
+            batch = []
+        if job is not None and done:
+            job.progress(total=len(ids), **summary)
+    summary["cost"] = round(summary["cost"], 4)
+    return summary
+
+class RankScheduler:
+    """
+    Background loop that starts each active project's check once per day.
+
+    Checks run as background jobs, so they can be followed and cancelled
+    through the jobs API. A run is claimed in the rank store before it
+    starts, so with several workers each project is still checked once.
+    """
+    def __init__(self, client, store, registry, interval=None):
+        """
+        Initialize the scheduler
+
+        Args:
+            client (DataForSEOClient): Client used for SERP lookups
+            store (RankStore): Projects and rank history
+            registry (JobRegistry): Registry the checks run in
+            interval (float): Seconds between scans for due projects
+        """
+        self.client = client
+        self.store = store
+        self.registry = registry
+        self.interval = interval if interval is not None else DEFAULT_INTERVAL
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def check_store(self):
+        """
+        Refuse to schedule checks into history that would not survive a restart
+
+        Raises:
+            RuntimeError: RANK_TRACKING_DB is unset or points into the temp directory
+        """
+        if not os.environ.get('RANK_TRACKING_DB') or is_temporary_path(self.store.db_path):
+            raise RuntimeError(
+                "The rank-tracking scheduler needs RANK_TRACKING_DB set to a file on persistent "
+                f"storage; {self.store.db_path} is in the temp directory"
+            )
+
+    def start(self):
+        """Start the scan loop on a daemon thread (once)."""
+        self.check_store()
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self.run_forever, name="rank-scheduler", daemon=True)
+                self._thread.start()
+                logger.info("Rank scheduler started, scanning every %ss", self.interval)
+
+    def run_forever(self):
+        """Scan for due projects every interval, in the calling thread."""
+        while True:
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("Rank scheduler scan failed")
+            time.sleep(self.interval)
+
+    def tick(self):
+        """
+        Start checks for active projects not yet checked today, taking over
+        runs left 'running' by a worker that died
+
+        Returns:
+            list: Job ids started
+        """
+        started = []
+        today = day_number()
+        for project in self.store.projects(active_only=True):
+            # Finished runs are skipped without a write; claim_run decides the rest
+            if self.store.run(project["id"], today) in (None, "running"):
+                job_id = self.check(project, today)
+                if job_id is not None:
+                    started.append(job_id)
+        return started
+
+    def check(self, project, day=None, retry=False):
+        """
+        Claim and start a project's check for a day
+
+        Args:
+            project (dict): Project from the store
+            day (int): Day number, today by default
+            retry (bool): Rerun a failed or cancelled check
+
+        Returns:
+            str: Job id, or None when the day is already claimed or no job slot is free
+        """
+        day = day_number() if day is None else day
+        if not self.store.claim_run(project["id"], day, retry):
+            return None
+
+        def run(job):
+            status = "failed"
+            summary = {}
+            try:
+                summary = run_check(self.client, self.store, project, day, job)
+                status = "done"
+                return summary
+            except Exception:
+                status = "cancelled" if job.cancelled() else "failed"
+                raise
+            finally:
+                self.store.finish_run(project["id"], day, status, **summary)
+
+        job_id = self.registry.start("rank_check", run, {"project_id": project["id"], "day": day})
+        if job_id is None:
+            self.store.release_run(project["id"], day)
+        return job_id
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Rank Tracking Store
+This module keeps rank-tracking projects and their daily positions in a
+SQLite file. Keywords and URLs are interned to integer ids and each check is
+one integer row, so a year of daily checks for tens of thousands of keywords
+stays compact and a keyword's history or a day-over-day comparison is an
+index range scan.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+import numpy as np
+
+DEFAULT_DB_PATH = os.environ.get('RANK_TRACKING_DB', os.path.join(tempfile.gettempdir(), 'seo_dashboard_ranks.db'))
+# A run still marked running after this many seconds is assumed dead and may be retaken
+RUN_TIMEOUT = float(os.environ.get('RANK_TRACKING_RUN_TIMEOUT', 6 * 3600))
+# Position stored for keywords the domain does not rank for within the checked depth
+NOT_RANKED = 0
+# SQLite's default limit on bound parameters is 999 on older builds
+LOOKUP_BATCH = 500
+EPOCH = date(1970, 1, 1)
+
+def day_number(day=None):
+    """Days since 1970-01-01 of a date (or ISO date string), today in UTC by default."""
+    if day is None:
+        day = datetime.now(timezone.utc).date()
+    elif isinstance(day, str):
+        day = date.fromisoformat(day)
+    return (day - EPOCH).days
+
+def day_date(number):
+    """ISO date of a day number."""
+    return (EPOCH + timedelta(days=int(number))).isoformat()
+
+def normalize_domain(domain):
+    """Lower-cased domain without scheme, path or leading www."""
+    domain = domain.strip().lower().split('://')[-1].split('/')[0]
+    return domain[4:] if domain.startswith('www.') else domain
+
+class RankStore:
+    """
+    Projects, tracked keywords and daily rank checks shared by every worker.
+
+    Ranks are append-only: the first result recorded for a (project,
+    keyword, day) is kept. Rows are clustered by (project, day, keyword) for
+    day comparisons, with a covering index by keyword for time series.
+    """
+    def __init__(self, db_path=None):
+        """
+        Initialize the store
+
+        Args:
+            db_path (str): SQLite file shared by every worker on the host
+        """
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self._local = threading.local()
+
+        conn = self._db()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS projects (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    domain TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    depth INTEGER NOT NULL,
+                    active INTEGER NOT NULL DEFAULT 1,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS keywords (
+                    id INTEGER PRIMARY KEY,
+                    keyword TEXT NOT NULL UNIQUE
+                );
+                CREATE TABLE IF NOT EXISTS urls (
+                    id INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL UNIQUE
+                );
+                CREATE TABLE IF NOT EXISTS project_keywords (
+                    project_id INTEGER NOT NULL,
+                    keyword_id INTEGER NOT NULL,
+                    PRIMARY KEY (project_id, keyword_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS ranks (
+                    project_id INTEGER NOT NULL,
+                    day INTEGER NOT NULL,
+                    keyword_id INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    url_id INTEGER NOT NULL,
+                    PRIMARY KEY (project_id, day, keyword_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS ranks_by_keyword ON ranks (project_id, keyword_id, day, position, url_id);
+                CREATE TABLE IF NOT EXISTS runs (
+                    project_id INTEGER NOT NULL,
+                    day INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    started_at REAL NOT NULL,
+                    finished_at REAL,
+                    checked INTEGER,
+                    ranked INTEGER,
+                    failed INTEGER,
+                    cost REAL,
+                    PRIMARY KEY (project_id, day)
+                ) WITHOUT ROWID;
+            """)
+
+    def _db(self):
+        """One SQLite connection per thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def _intern(self, table, column, values):
+        """value -> integer id for every value, adding unknown ones."""
+        conn = self._db()
+        values = list(dict.fromkeys(values))
+        ids = {}
+        with conn:
+            conn.executemany(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", ((v,) for v in values))
+        for start in range(0, len(values), LOOKUP_BATCH):
+            batch = values[start:start + LOOKUP_BATCH]
+            ids.update(conn.execute(
+                f"SELECT {column}, id FROM {table} WHERE {column} IN ({','.join('?' * len(batch))})", batch
+            ))
+        return ids
+
+    def create_project(self, name, domain, keywords, location="United States", language="English", depth=100):
+        """
+        Register a project
+
+        Args:
+            name (str): Display name
+            domain (str): Domain whose positions are tracked (subdomains count)
+            keywords (list): Keywords to track
+            location (str): Location name
+            language (str): Language name
+            depth (int): SERP depth checked; deeper positions count as not ranked
+
+        Returns:
+            dict: The new project
+        """
+        conn = self._db()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO projects (name, domain, location, language, depth, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (name, normalize_domain(domain), location, language, depth, time.time())
+            )
+        self.add_keywords(cursor.lastrowid, keywords)
+        return self.project(cursor.lastrowid)
+
+    def project(self, project_id):
+        """
+        Get a project with its keyword count and latest finished check
+
+        Returns:
+            dict: Project fields, or None for an unknown project
+        """
+        row = self._db().execute(
+            "SELECT id, name, domain, location, language, depth, active, created_at, "
+            "(SELECT COUNT(*) FROM project_keywords WHERE project_id = projects.id), "
+            "(SELECT MAX(day) FROM runs WHERE project_id = projects.id AND status = 'done') "
+            "FROM projects WHERE id = ?", (project_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "name": row[1],
+            "domain": row[2],
+            "location": row[3],
+            "language": row[4],
+            "depth": row[5],
+            "active": bool(row[6]),
+            "created_at": row[7],
+            "keyword_count": row[8],
+            "last_checked": day_date(row[9]) if row[9] is not None else None
+        }
+
+    def projects(self, active_only=False):
+        """List projects, optionally only active ones."""
+        query = "SELECT id FROM projects" + (" WHERE active = 1" if active_only else "") + " ORDER BY id"
+        return [self.project(project_id) for (project_id,) in self._db().execute(query).fetchall()]
+
+    def set_active(self, project_id, active):
+        """Pause or resume scheduled checks of a project; its history is kept."""
+        conn = self._db()
+        with conn:
+            return conn.execute(
+                "UPDATE projects SET active = ? WHERE id = ?", (int(bool(active)), project_id)
+            ).rowcount > 0
+
+    def add_keywords(self, project_id, keywords):
+        """
+        Track more keywords in a project
+
+        Returns:
+            int: Keywords newly added
+        """
+        ids = self._intern('keywords', 'keyword', [k.strip() for k in keywords if k and k.strip()])
+        conn = self._db()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO project_keywords (project_id, keyword_id) VALUES (?, ?)",
+                ((project_id, keyword_id) for keyword_id in ids.values())
+            )
+            return conn.total_changes - before
+
+    def remove_keywords(self, project_id, keywords):
+        """
+        Stop tracking keywords; their recorded history is kept
+
+        Returns:
+            int: Keywords removed
+        """
+        conn = self._db()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                "DELETE FROM project_keywords WHERE project_id = ? "
+                "AND keyword_id = (SELECT id FROM keywords WHERE keyword = ?)",
+                ((project_id, keyword.strip()) for keyword in keywords)
+            )
+            return conn.total_changes - before
+
+    def project_keywords(self, project_id):
+        """(keyword id, keyword) pairs tracked by a project."""
+        return self._db().execute(
+            "SELECT k.id, k.keyword FROM project_keywords pk JOIN keywords k ON k.id = pk.keyword_id "
+            "WHERE pk.project_id = ? ORDER BY k.id", (project_id,)
+        ).fetchall()
+
+    def claim_run(self, project_id, day, retry=False):
+        """
+        Claim a project's check for a day, so only one worker runs it
+
+        Args:
+            project_id (int): Project id
+            day (int): Day number
+            retry (bool): Also reclaim a failed or cancelled run; positions
+                already recorded for the day are kept
+
+        Returns:
+            bool: Whether the caller now owns the run
+        """
+        conn = self._db()
+        now = time.time()
+        with conn:
+            if conn.execute(
+                "INSERT OR IGNORE INTO runs (project_id, day, status, started_at) VALUES (?, ?, 'running', ?)",
+                (project_id, day, now)
+            ).rowcount:
+                return True
+            # Take over runs abandoned by a worker that died mid-check
+            return conn.execute(
+                "UPDATE runs SET status = 'running', started_at = ?, finished_at = NULL "
+                "WHERE project_id = ? AND day = ? AND ((status = 'running' AND started_at < ?) "
+                "OR (? AND status IN ('failed', 'cancelled')))",
+                (now, project_id, day, now - RUN_TIMEOUT, int(retry))
+            ).rowcount > 0
+
+    def finish_run(self, project_id, day, status, checked=0, ranked=0, failed=0, cost=0.0):
+        """Record how a claimed run ended."""
+        conn = self._db()
+        with conn:
+            conn.execute(
+                "UPDATE runs SET status = ?, finished_at = ?, checked = ?, ranked = ?, failed = ?, cost = ? "
+                "WHERE project_id = ? AND day = ?",
+                (status, time.time(), checked, ranked, failed, cost, project_id, day)
+            )
+
+    def release_run(self, project_id, day):
+        """Drop a claim whose run never started, so a later tick can retry it."""
+        conn = self._db()
+        with conn:
+            conn.execute("DELETE FROM runs WHERE project_id = ? AND day = ? AND status = 'running'", (project_id, day))
+
+    def run(self, project_id, day):
+        """Status of a project's run for a day, or None when it was never claimed."""
+        row = self._db().execute(
+            "SELECT status FROM runs WHERE project_id = ? AND day = ?", (project_id, day)
+        ).fetchone()
+        return row[0] if row else None
+
+    def runs(self, project_id, limit=30):
+        """Most recent runs of a project, newest first."""
+        return [{
+            "date": day_date(day),
+            "status": status,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "checked": checked,
+            "ranked": ranked,
+            "failed": failed,
+            "cost": cost
+        } for day, status, started_at, finished_at, checked, ranked, failed, cost in self._db().execute(
+            "SELECT day, status, started_at, finished_at, checked, ranked, failed, cost FROM runs "
+            "WHERE project_id = ? ORDER BY day DESC LIMIT ?", (project_id, limit)
+        )]
+
+    def record(self, project_id, day, results):
+        """
+        Append one day's positions
+
+        Args:
+            project_id (int): Project id
+            day (int): Day number
+            results (list): (keyword id, position or NOT_RANKED, URL or None) tuples
+
+        Returns:
+            int: Rows written; results already recorded for the day are ignored
+        """
+        url_ids = self._intern('urls', 'url', [url for _, _, url in results if url])
+        conn = self._db()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO ranks (project_id, day, keyword_id, position, url_id) VALUES (?, ?, ?, ?, ?)",
+                ((project_id, day, keyword_id, position or NOT_RANKED, url_ids.get(url, 0))
+                 for keyword_id, position, url in results)
+            )
+            return conn.total_changes - before
+
+    def _urls(self, url_ids):
+        """url id -> URL for the given ids."""
+        url_ids = [url_id for url_id in set(url_ids) if url_id]
+        conn = self._db()
+        urls = {}
+        for start in range(0, len(url_ids), LOOKUP_BATCH):
+            batch = url_ids[start:start + LOOKUP_BATCH]
+            urls.update(conn.execute(f"SELECT id, url FROM urls WHERE id IN ({','.join('?' * len(batch))})", batch))
+        return urls
+
+    def history(self, project_id, keyword, start_day=None, end_day=None):
+        """
+        Time series of one keyword
+
+        Args:
+            project_id (int): Project id
+            keyword (str): Tracked keyword
+            start_day (int): First day number, inclusive
+            end_day (int): Last day number, inclusive
+
+        Returns:
+            dict: dates, positions (None when not ranked) and urls as parallel
+                arrays, or None when the keyword was never tracked
+        """
+        conn = self._db()
+        row = conn.execute("SELECT id FROM keywords WHERE keyword = ?", (keyword.strip(),)).fetchone()
+        if row is None:
+            return None
+        rows = conn.execute(
+            "SELECT day, position, url_id FROM ranks WHERE project_id = ? AND keyword_id = ? "
+            "AND day BETWEEN ? AND ? ORDER BY day",
+            (project_id, row[0], start_day if start_day is not None else 0,
+             end_day if end_day is not None else day_number() + 1)
+        ).fetchall()
+        urls = self._urls(url_id for _, _, url_id in rows)
+        return {
+            "keyword": keyword,
+            "dates": [day_date(day) for day, _, _ in rows],
+            "positions": [position or None for _, position, _ in rows],
+            "urls": [urls.get(url_id) for _, _, url_id in rows]
+        }
+
+    def latest_day(self, project_id, on_or_before=None):
+        """Latest day number on or before a day with a finished check, or None."""
+        row = self._db().execute(
+            "SELECT MAX(day) FROM runs WHERE project_id = ? AND status = 'done' AND day <= ?",
+            (project_id, on_or_before if on_or_before is not None else day_number() + 1)
+        ).fetchone()
+        return row[0]
+
+    def earliest_day(self, project_id, on_or_after):
+        """Earliest day number on or after a day with a finished check, or None."""
+        row = self._db().execute(
+            "SELECT MIN(day) FROM runs WHERE project_id = ? AND status = 'done' AND day >= ?",
+            (project_id, on_or_after)
+        ).fetchone()
+        return row[0]
+
+    def _day_columns(self, project_id, day):
+        """keyword ids (ascending), positions and url ids recorded for a day, as arrays."""
+        rows = self._db().execute(
+            "SELECT keyword_id, position, url_id FROM ranks WHERE project_id = ? AND day = ?", (project_id, day)
+        ).fetchall()
+        columns = np.array(rows, dtype=np.int64).reshape(-1, 3)
+        return columns[:, 0], columns[:, 1], columns[:, 2]
+
+    def movers(self, project_id, from_day, to_day, depth, limit=50):
+        """
+        Compare two days of a project
+
+        Args:
+            project_id (int): Project id
+            from_day (int): Earlier day number
+            to_day (int): Later day number
+            depth (int): Checked depth; not ranked counts as depth + 1
+            limit (int): Keywords per list
+
+        Returns:
+            dict: improved and declined (largest moves first), entered and
+                dropped (best position first) lists, plus counts
+        """
+        old_ids, old_positions, _ = self._day_columns(project_id, from_day)
+        new_ids, new_positions, new_urls = self._day_columns(project_id, to_day)
+        _, old_index, new_index = np.intersect1d(old_ids, new_ids, assume_unique=True, return_indices=True)
+        ids = new_ids[new_index]
+        old = old_positions[old_index]
+        new = new_positions[new_index]
+        urls = new_urls[new_index]
+
+        both = (old != NOT_RANKED) & (new != NOT_RANKED)
+        change = np.where(old == NOT_RANKED, depth + 1, old) - np.where(new == NOT_RANKED, depth + 1, new)
+        groups = {
+            "improved": (np.flatnonzero(both & (change > 0)), -change),
+            "declined": (np.flatnonzero(both & (change < 0)), change),
+            "entered": (np.flatnonzero((old == NOT_RANKED) & (new != NOT_RANKED)), new),
+            "dropped": (np.flatnonzero((old != NOT_RANKED) & (new == NOT_RANKED)), old),
+        }
+
+        picked = {}
+        for name, (candidates, key) in groups.items():
+            key = key[candidates]
+            if len(candidates) > limit:
+                top = np.argpartition(key, limit - 1)[:limit]
+                candidates, key = candidates[top], key[top]
+            picked[name] = candidates[np.argsort(key, kind='stable')]
+
+        selected = np.concatenate(list(picked.values())) if picked else np.empty(0, dtype=np.int64)
+        conn = self._db()
+        keywords = {}
+        keyword_ids = ids[selected].tolist()
+        for start in range(0, len(keyword_ids), LOOKUP_BATCH):
+            batch = keyword_ids[start:start + LOOKUP_BATCH]
+            keywords.update(conn.execute(
+                f"SELECT id, keyword FROM keywords WHERE id IN ({','.join('?' * len(batch))})", batch
+            ))
+        url_map = self._urls(urls[selected].tolist())
+
+        def rows(indices):
+            return [{
+                "keyword": keywords.get(int(ids[i])),
+                "from": int(old[i]) or None,
+                "to": int(new[i]) or None,
+                "change": int(change[i]),
+                "url": url_map.get(int(urls[i]))
+            } for i in indices.tolist()]
+
+        result = {name: rows(indices) for name, indices in picked.items()}
+        result["counts"] = {
+            "compared": int(len(ids)),
+            "improved": int(np.count_nonzero(both & (change > 0))),
+            "declined": int(np.count_nonzero(both & (change < 0))),
+            "unchanged": int(np.count_nonzero(both & (change == 0))),
+            "entered": int(len(groups["entered"][0])),
+            "dropped": int(len(groups["dropped"][0]))
+        }
+        return result
+
+_default_rank_store = None
+_default_rank_store_lock = threading.Lock()
+
+def get_default_rank_store():
+    """
+    Get the process-wide rank store
+
+    Returns:
+        RankStore: Shared store backed by RANK_TRACKING_DB
+    """
+    global _default_rank_store
+    with _default_rank_store_lock:
+        if _default_rank_store is None:
+            _default_rank_store = RankStore()
+    return _default_rank_store
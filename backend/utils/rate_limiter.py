@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Shared DataForSEO Rate Limiter
+This module enforces request-per-minute and concurrent-request budgets for the
+whole host, across every gunicorn worker, using token buckets kept in a
+SQLite WAL file.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+RATE_LIMIT_ENABLED = os.environ.get('DATAFORSEO_RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+DEFAULT_DB_PATH = os.environ.get(
+    'DATAFORSEO_RATE_LIMIT_DB', os.path.join(tempfile.gettempdir(), 'dataforseo_rate_limit.db')
+)
+DEFAULT_GLOBAL_RPM = float(os.environ.get('DATAFORSEO_GLOBAL_RPM', 2000))
+DEFAULT_GLOBAL_CONCURRENCY = int(os.environ.get('DATAFORSEO_GLOBAL_CONCURRENCY', 30))
+
+# Endpoint prefix -> budget; the longest matching prefix wins and endpoints
+# without a match only count against the global budget. Either key may be
+# omitted. Override with a JSON object in DATAFORSEO_ENDPOINT_LIMITS.
+DEFAULT_ENDPOINT_LIMITS = {
+    "serp/google/organic/tasks_ready": {"rpm": 20},
+    "keywords_data/google/search_volume/tasks_ready": {"rpm": 20},
+    "keywords_data/google/search_volume/live": {"rpm": 12},
+    "dataforseo_labs/": {"concurrency": 30},
+}
+ENDPOINT_LIMITS = dict(DEFAULT_ENDPOINT_LIMITS, **json.loads(os.environ.get('DATAFORSEO_ENDPOINT_LIMITS', '{}')))
+
+# Concurrency slots left by a crashed worker are reclaimed after this long
+SLOT_TTL = float(os.environ.get('DATAFORSEO_RATE_LIMIT_SLOT_TTL', 300))
+MAX_SLEEP = 0.25
+
+class RateLimiter:
+    """
+    Host-wide token buckets for DataForSEO calls.
+
+    Each bucket refills at ``rpm / 60`` tokens per second up to ``rpm``
+    tokens, and may also cap how many calls hold a slot at once. ``acquire``
+    takes one token and one slot from the global bucket and from the bucket
+    of the endpoint's prefix in a single transaction, sleeping until both are
+    available, so callers queue instead of failing.
+    """
+    def __init__(self, db_path=None, global_rpm=None, global_concurrency=None, endpoint_limits=None):
+        """
+        Initialize the limiter
+
+        Args:
+            db_path (str): SQLite file shared by every worker on the host
+            global_rpm (float): Requests per minute across all endpoints
+            global_concurrency (int): Requests in flight across all endpoints
+            endpoint_limits (dict): Endpoint prefix -> {"rpm": ..., "concurrency": ...}
+        """
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self.limits = {"global": {
+            "rpm": global_rpm if global_rpm is not None else DEFAULT_GLOBAL_RPM,
+            "concurrency": global_concurrency if global_concurrency is not None else DEFAULT_GLOBAL_CONCURRENCY
+        }}
+        self.limits.update(endpoint_limits if endpoint_limits is not None else ENDPOINT_LIMITS)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.counters = {
+            "acquired": 0,
+            "waited": 0,
+            "timed_out": 0,
+            "wait_seconds": 0.0
+        }
+
+        conn = self._db()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_buckets (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_slots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                pid INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS rate_slots_name ON rate_slots (name)")
+
+    def _db(self):
+        """One SQLite connection per thread, in autocommit mode with explicit transactions."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def buckets_for(self, endpoint):
+        """
+        Get the buckets a call to an endpoint draws from
+
+        Args:
+            endpoint (str): API endpoint
+
+        Returns:
+            list: Bucket names, always starting with "global"
+        """
+        best = None
+        for prefix in self.limits:
+            if prefix != "global" and endpoint.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return ["global", best] if best else ["global"]
+
+    def acquire(self, endpoint, timeout=None):
+        """
+        Block until a call to endpoint fits every budget, then reserve it
+
+        Args:
+            endpoint (str): API endpoint about to be called
+            timeout (float): Longest time to wait; None waits indefinitely
+
+        Returns:
+            list: Slot ids to hand back to release() when the call finishes,
+                or None if the budgets did not free up within timeout
+        """
+        names = self.buckets_for(endpoint)
+        started = time.time()
+        waited = False
+        while True:
+            slots, wait = self._try_acquire(names)
+            if slots is not None:
+                with self._lock:
+                    self.counters["acquired"] += 1
+                    if waited:
+                        self.counters["waited"] += 1
+                        self.counters["wait_seconds"] += time.time() - started
+                return slots
+            waited = True
+            sleep = min(max(wait, 0.005), MAX_SLEEP)
+            if timeout is not None:
+                left = started + timeout - time.time()
+                if left <= 0:
+                    with self._lock:
+                        self.counters["timed_out"] += 1
+                    return None
+                sleep = min(sleep, left)
+            time.sleep(sleep)
+
+    def _try_acquire(self, names):
+        """Take a token and a slot from every bucket, or report how long to wait."""
+        now = time.time()
+        conn = self._db()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM rate_slots WHERE expires_at <= ?", (now,))
+            wait = 0.0
+            levels = {}
+            for name in names:
+                limit = self.limits[name]
+                if limit.get("rpm"):
+                    tokens = self._refill(conn, name, limit["rpm"], now)
+                    levels[name] = tokens
+                    if tokens < 1:
+                        wait = max(wait, (1 - tokens) * 60.0 / limit["rpm"])
+                if limit.get("concurrency"):
+                    in_flight = conn.execute(
+                        "SELECT COUNT(*) FROM rate_slots WHERE name = ?", (name,)
+                    ).fetchone()[0]
+                    if in_flight >= limit["concurrency"]:
+                        wait = max(wait, 0.01)
+            if wait > 0:
+                conn.execute("COMMIT")
+                return None, wait
+
+            slots = []
+            for name in names:
+                limit = self.limits[name]
+                if name in levels:
+                    conn.execute(
+                        "UPDATE rate_buckets SET tokens = ?, updated_at = ? WHERE name = ?",
+                        (levels[name] - 1, now, name)
+                    )
+                if limit.get("concurrency"):
+                    cursor = conn.execute(
+                        "INSERT INTO rate_slots (name, pid, expires_at) VALUES (?, ?, ?)",
+                        (name, os.getpid(), now + SLOT_TTL)
+                    )
+                    slots.append(cursor.lastrowid)
+            conn.execute("COMMIT")
+            return slots, 0.0
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _refill(self, conn, name, rpm, now):
+        """Current token level of a bucket, creating it full on first use."""
+        row = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            conn.execute("INSERT INTO rate_buckets (name, tokens, updated_at) VALUES (?, ?, ?)", (name, rpm, now))
+            return rpm
+        tokens, updated_at = row
+        return min(rpm, tokens + (now - updated_at) * rpm / 60.0)
+
+    def release(self, slots):
+        """
+        Free the concurrency slots taken by acquire()
+
+        Args:
+            slots (list): Slot ids returned by acquire()
+        """
+        if slots:
+            self._db().execute(
+                f"DELETE FROM rate_slots WHERE id IN ({','.join('?' * len(slots))})", slots
+            )
+
+    def stats(self):
+        """
+        Get current token levels, in-flight counts and wait counters
+
+        Returns:
+            dict: Per-bucket levels plus acquire/wait counters for this worker
+        """
+        now = time.time()
+        conn = self._db()
+        buckets = {}
+        for name, limit in self.limits.items():
+            level = {"rpm": limit.get("rpm"), "concurrency": limit.get("concurrency")}
+            if limit.get("rpm"):
+                row = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE name = ?", (name,)).fetchone()
+                tokens = limit["rpm"] if row is None else min(limit["rpm"], row[0] + (now - row[1]) * limit["rpm"] / 60.0)
+                level["tokens"] = round(tokens, 2)
+            if limit.get("concurrency"):
+                level["in_flight"] = conn.execute(
+                    "SELECT COUNT(*) FROM rate_slots WHERE name = ? AND expires_at > ?", (name, now)
+                ).fetchone()[0]
+            buckets[name] = level
+        with self._lock:
+            stats = dict(self.counters)
+        stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+        stats["buckets"] = buckets
+        return stats
+
+_default_rate_limiter = None
+_default_rate_limiter_lock = threading.Lock()
+
+def get_default_rate_limiter():
+    """
+    Get the process-wide limiter shared by every client, configured from the environment
+
+    Returns:
+        RateLimiter: Shared limiter, or None when DATAFORSEO_RATE_LIMIT_ENABLED is false
+    """
+    global _default_rate_limiter
+    if not RATE_LIMIT_ENABLED:
+        return None
+    with _default_rate_limiter_lock:
+        if _default_rate_limiter is None:
+            _default_rate_limiter = RateLimiter()
+    return _default_rate_limiter
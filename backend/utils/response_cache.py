@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+DataForSEO Response Cache
+This module provides an endpoint-aware TTL cache for DataForSEO responses with a
+size-bounded in-memory LRU tier and an optional on-disk SQLite tier.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Endpoint prefix -> TTL in seconds. The longest matching prefix wins; endpoints
+# without a match (e.g. appendix/user_data) are never cached.
+DEFAULT_TTLS = {
+    "serp/": 15 * 60,
+    "keywords_data/": 24 * 3600,
+    "dataforseo_labs/": 12 * 3600,
+    "dataforseo_labs/google/domain_rank_overview": 24 * 3600,
+    "dataforseo_labs/google/ranked_keywords": 24 * 3600,
+    "backlinks/": 12 * 3600,
+    "traffic_analytics/": 24 * 3600,
+}
+
+DEFAULT_MAX_BYTES = int(os.environ.get('DATAFORSEO_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+DEFAULT_DB_PATH = os.environ.get('DATAFORSEO_CACHE_DB')
+CACHE_ENABLED = os.environ.get('DATAFORSEO_CACHE_ENABLED', 'True').lower() == 'true'
+
+# Endpoint -> size field. A cached response fetched with a larger value of this
+# field also answers requests for any smaller value, by slicing its items.
+SIZE_KNOBS = {
+    "serp/google/organic/live/regular": "depth",
+    "dataforseo_labs/google/ranked_keywords/live": "limit",
+    "dataforseo_labs/google/keyword_ideas/live": "limit",
+    "dataforseo_labs/google/keyword_suggestions/live": "limit",
+    "dataforseo_labs/google/related_keywords/live": "limit",
+    "dataforseo_labs/google/domain_intersection/live": "limit",
+    "dataforseo_labs/google/competitors_domain/live": "limit",
+}
+
+# Fields whose values are keywords and are matched case- and whitespace-insensitively
+KEYWORD_FIELDS = ('keyword', 'keywords')
+
+def normalize_keyword(keyword):
+    """Lowercase a keyword and collapse runs of whitespace."""
+    return ' '.join(keyword.lower().split())
+
+def canonicalize(data):
+    """
+    Canonicalize a request body so equivalent payloads produce the same key
+
+    Args:
+        data (list|dict): Request body sent to DataForSEO
+
+    Returns:
+        list|dict: Copy with keyword fields normalized
+    """
+    if isinstance(data, list):
+        return [canonicalize(item) for item in data]
+    if isinstance(data, dict):
+        result = {}
+        for key, value in data.items():
+            if key in KEYWORD_FIELDS and isinstance(value, str):
+                result[key] = normalize_keyword(value)
+            elif key in KEYWORD_FIELDS and isinstance(value, list):
+                result[key] = [normalize_keyword(v) if isinstance(v, str) else v for v in value]
+            else:
+                result[key] = canonicalize(value)
+        return result
+    return data
+
+def make_key(endpoint, data):
+    """
+    Build the cache key for an endpoint and request body
+
+    Args:
+        endpoint (str): API endpoint
+        data (list|dict): Request body
+
+    Returns:
+        str: Hex digest identifying the request
+    """
+    body = json.dumps(canonicalize(data), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(f"{endpoint}\n{body}".encode()).hexdigest()
+
+def split_knob(endpoint, data):
+    """
+    Separate the size knob from a single-task request body
+
+    Args:
+        endpoint (str): API endpoint
+        data (list|dict): Request body
+
+    Returns:
+        tuple: (family key shared by every size of the request, knob value),
+            or (None, None) when the request cannot be served from a superset
+    """
+    field = SIZE_KNOBS.get(endpoint)
+    if not field or not isinstance(data, list) or len(data) != 1:
+        return None, None
+    task = data[0]
+    knob = task.get(field) if isinstance(task, dict) else None
+    if not isinstance(knob, int) or isinstance(knob, bool):
+        return None, None
+    rest = {k: v for k, v in task.items() if k != field}
+    return make_key(endpoint, [rest]), knob
+
+def slice_response(endpoint, response, knob):
+    """
+    Cut a cached superset response down to a smaller depth/limit
+
+    Labs responses keep their first ``knob`` items; SERP responses keep the
+    items ranked within the first ``knob`` positions.
+
+    Args:
+        endpoint (str): API endpoint
+        response (dict): Cached response fetched with a larger knob
+        knob (int): Requested depth or limit
+
+    Returns:
+        dict: New response; the cached one is left untouched
+    """
+    field = SIZE_KNOBS[endpoint]
+    tasks = []
+    for task in response.get('tasks') or []:
+        task = dict(task)
+        if isinstance(task.get('data'), dict):
+            task['data'] = dict(task['data'], **{field: knob})
+        results = []
+        for result in task.get('result') or []:
+            result = dict(result)
+            items = result.get('items') or []
+            if field == 'depth':
+                items = [item for item in items if (item.get('rank_absolute') or 0) <= knob]
+            else:
+                items = items[:knob]
+            result['items'] = items
+            result['items_count'] = len(items)
+            results.append(result)
+        task['result'] = results
+        tasks.append(task)
+    return dict(response, tasks=tasks)
+
+def is_success(response):
+    """Only fully successful responses are worth caching."""
+    if not isinstance(response, dict) or response.get('status_code') != 20000:
+        return False
+    return all(task.get('status_code') == 20000 for task in response.get('tasks') or [])
+
+class ResponseCache:
+    """
+    Two-tier TTL cache for DataForSEO responses.
+
+    The memory tier is an LRU of serialized responses bounded by their size;
+    every hit decodes a private copy, so callers may change what they get
+    back without touching the cached entry. When ``db_path`` is set, entries are also written to a SQLite file, which
+    survives restarts and is shared by every gunicorn worker on the host.
+
+    For endpoints listed in SIZE_KNOBS, a miss falls back to the smallest
+    cached response for the same request with a larger depth/limit, sliced
+    down to the requested size.
+    """
+    def __init__(self, max_bytes=None, db_path=None, ttls=None):
+        """
+        Initialize the cache
+
+        Args:
+            max_bytes (int): Memory budget for the LRU tier
+            db_path (str): Optional path of the SQLite tier
+            ttls (dict): Endpoint prefix -> TTL seconds, merged over DEFAULT_TTLS
+        """
+        self.max_bytes = max_bytes if max_bytes is not None else DEFAULT_MAX_BYTES
+        self.db_path = db_path
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self._entries = OrderedDict()
+        self._families = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+        self.counters = {
+            "hits": 0,
+            "disk_hits": 0,
+            "subsumed_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "stores": 0
+        }
+        if self.db_path:
+            self._init_db()
+
+    def _init_db(self):
+        conn = self._db()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                body TEXT NOT NULL,
+                family TEXT,
+                knob INTEGER
+            )
+        """)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(responses)")}
+        if 'family' not in columns:
+            conn.execute("ALTER TABLE responses ADD COLUMN family TEXT")
+            conn.execute("ALTER TABLE responses ADD COLUMN knob INTEGER")
+        conn.execute("CREATE INDEX IF NOT EXISTS responses_family ON responses (family, knob)")
+        conn.commit()
+
+    def _db(self):
+        """One SQLite connection per thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            self._local.conn = conn
+        return conn
+
+    def ttl_for(self, endpoint):
+        """
+        Get the TTL for an endpoint
+
+        Args:
+            endpoint (str): API endpoint
+
+        Returns:
+            int: TTL in seconds, 0 when the endpoint is not cacheable
+        """
+        best = None
+        for prefix in self.ttls:
+            if endpoint.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return self.ttls[best] if best is not None else 0
+
+    def get(self, endpoint, data, record=True):
+        """
+        Look up a cached response
+
+        Args:
+            endpoint (str): API endpoint
+            data (list|dict): Request body
+            record (bool): Count the lookup in the hit/miss counters
+
+        Returns:
+            dict: Copy of the cached response, or None on a miss
+        """
+        if not self.ttl_for(endpoint):
+            return None
+        key = make_key(endpoint, data)
+        response = self._get_key(key)
+        if response is None:
+            family, knob = split_knob(endpoint, data)
+            if family is not None:
+                response = self._get_superset(endpoint, family, knob)
+        if record:
+            with self._lock:
+                self.counters["hits" if response is not None else "misses"] += 1
+        return response
+
+    def _get_key(self, key):
+        """Decode a fresh copy of an unexpired entry, from memory or the SQLite tier."""
+        now = time.time()
+        body = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    body = entry[2]
+                else:
+                    self._remove(key)
+                    self.counters["expirations"] += 1
+        if body is not None:
+            return json.loads(body)
+
+        if self.db_path:
+            row = self._db().execute(
+                "SELECT expires_at, body, family, knob FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[0] > now:
+                self._store_memory(key, row[0], row[1], row[2], row[3])
+                with self._lock:
+                    self.counters["disk_hits"] += 1
+                return json.loads(row[1])
+        return None
+
+    def _get_superset(self, endpoint, family, knob):
+        """Find the smallest cached superset of a sized request and slice it."""
+        now = time.time()
+        key = None
+        with self._lock:
+            sizes = self._families.get(family, {})
+            candidates = sorted(size for size in sizes if size >= knob)
+            for size in candidates:
+                if self._entries[sizes[size]][0] > now:
+                    key = sizes[size]
+                    break
+
+        if key is None and self.db_path:
+            row = self._db().execute(
+                "SELECT key FROM responses WHERE family = ? AND knob >= ? AND expires_at > ? "
+                "ORDER BY knob LIMIT 1",
+                (family, knob, now)
+            ).fetchone()
+            key = row[0] if row else None
+
+        superset = self._get_key(key) if key is not None else None
+        if superset is None:
+            return None
+        with self._lock:
+            self.counters["subsumed_hits"] += 1
+        return slice_response(endpoint, superset, knob)
+
+    def set(self, endpoint, data, response):
+        """
+        Store a response if it is successful and its endpoint is cacheable
+
+        Args:
+            endpoint (str): API endpoint
+            data (list|dict): Request body
+            response (dict): Response from the API
+        """
+        ttl = self.ttl_for(endpoint)
+        if not ttl or not is_success(response):
+            return
+        key = make_key(endpoint, data)
+        family, knob = split_knob(endpoint, data)
+        body = json.dumps(response, separators=(',', ':'))
+        expires_at = time.time() + ttl
+        self._store_memory(key, expires_at, body, family, knob)
+        with self._lock:
+            self.counters["stores"] += 1
+        if self.db_path:
+            self._store_disk(key, endpoint, expires_at, body, family, knob)
+
+    def _store_memory(self, key, expires_at, body, family=None, knob=None):
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, size, body, family, knob)
+            if family is not None:
+                self._families.setdefault(family, {})[knob] = key
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.counters["evictions"] += 1
+
+    def _remove(self, key):
+        """Drop a memory entry; the caller must hold the lock."""
+        _, size, _, family, knob = self._entries.pop(key)
+        self._bytes -= size
+        if family is not None:
+            sizes = self._families.get(family, {})
+            sizes.pop(knob, None)
+            if not sizes:
+                self._families.pop(family, None)
+
+    def _store_disk(self, key, endpoint, expires_at, body, family=None, knob=None):
+        conn = self._db()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, endpoint, expires_at, body, family, knob) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, endpoint, expires_at, body, family, knob)
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        conn.commit()
+
+    def clear(self):
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._entries.clear()
+            self._families.clear()
+            self._bytes = 0
+        if self.db_path:
+            conn = self._db()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def stats(self):
+        """
+        Get cache counters and occupancy
+
+        Returns:
+            dict: Counters, entry count, memory bytes and hit rate
+        """
+        with self._lock:
+            stats = dict(self.counters)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = self.max_bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["disk_tier"] = bool(self.db_path)
+        return stats
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_default_cache():
+    """
+    Get the process-wide cache shared by every client, configured from the environment
+
+    Returns:
+        ResponseCache: Shared cache, or None when DATAFORSEO_CACHE_ENABLED is false
+    """
+    global _default_cache
+    if not CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache(db_path=DEFAULT_DB_PATH)
+    return _default_cache
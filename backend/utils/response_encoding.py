@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Response Encoding
+This module provides the app-wide response layer: a Flask JSON provider that
+encodes with orjson, and gzip/brotli compression negotiated from the
+request's Accept-Encoding. Compressed bodies are kept in a size-bounded LRU
+keyed by a hash of the uncompressed body, so a response served again (for
+instance from the DataForSEO response cache) is not compressed again.
+"""
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Flask's stdlib provider is used instead
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSION_ENABLED = os.environ.get('RESPONSE_COMPRESSION_ENABLED', 'True').lower() == 'true'
+# Bodies smaller than this are sent as they are
+DEFAULT_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESS_MIN_BYTES', 1024))
+DEFAULT_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_COMPRESS_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+# Compressed bodies smaller than this are not worth a cache slot
+CACHE_MIN_BYTES = 8 * 1024
+GZIP_LEVEL = 6
+# Brotli's quality 5 compresses smaller than gzip 6 at about the same speed
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'application/javascript', 'text/')
+
+def _brotli(body):
+    return brotli.compress(body, quality=BROTLI_QUALITY)
+
+def _gzip(body):
+    return gzip.compress(body, GZIP_LEVEL, mtime=0)
+
+# Content coding -> encoder, in order of preference when the client accepts several equally
+ENCODERS = OrderedDict([("br", _brotli)] if brotli is not None else [])
+ENCODERS["gzip"] = _gzip
+
+def _default(obj):
+    """Serialize objects that describe themselves with __json__ (projected rows)."""
+    to_json = getattr(obj, '__json__', None)
+    if to_json is not None:
+        return to_json()
+    return DefaultJSONProvider.default(obj)
+
+class RowJSONProvider(DefaultJSONProvider):
+    """Flask's stdlib provider, plus objects with a __json__ method."""
+    default = staticmethod(_default)
+
+class OrjsonProvider(RowJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Output is the same JSON as Flask's provider (sorted keys, HTTP dates,
+    compact unless debugging) except that non-ASCII text is sent as UTF-8
+    rather than \\u escapes, and NumPy arrays and scalars are encoded
+    natively. Values orjson rejects, such as integers beyond 64 bits, go
+    through the stdlib encoder.
+    """
+    def _options(self):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumpb(self, obj):
+        """
+        Serialize to UTF-8 JSON bytes
+
+        Args:
+            obj: Value to serialize
+
+        Returns:
+            bytes: JSON document
+        """
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options())
+        except TypeError:
+            return super().dumps(obj).encode()
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumpb(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Build a JSON response from the encoded bytes, without a str round trip."""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumpb(obj) + b"\n", mimetype=self.mimetype)
+
+def json_provider(app):
+    """
+    Get the JSON provider for an app
+
+    Args:
+        app (Flask): Application
+
+    Returns:
+        JSONProvider: OrjsonProvider, or RowJSONProvider when orjson is not installed
+    """
+    return OrjsonProvider(app) if orjson is not None else RowJSONProvider(app)
+
+class ResponseCompressor:
+    """
+    Negotiated response compression with a cache of compressed bodies.
+
+    Streamed responses (job event streams) and responses that are already
+    encoded are left alone, so compression never buffers a stream.
+    """
+    def __init__(self, min_bytes=None, cache_max_bytes=None):
+        """
+        Initialize the compressor
+
+        Args:
+            min_bytes (int): Smallest body worth compressing
+            cache_max_bytes (int): Memory budget for compressed bodies; 0 disables the cache
+        """
+        self.min_bytes = min_bytes if min_bytes is not None else DEFAULT_MIN_BYTES
+        self.cache_max_bytes = cache_max_bytes if cache_max_bytes is not None else DEFAULT_CACHE_MAX_BYTES
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {
+            "compressed": 0,
+            "cache_hits": 0,
+            "evictions": 0,
+            "bytes_in": 0,
+            "bytes_out": 0
+        }
+
+    def encode(self, body, encoding):
+        """
+        Compress a body, reusing an earlier compression of the same bytes
+
+        Args:
+            body (bytes): Uncompressed body
+            encoding (str): Content coding from ENCODERS
+
+        Returns:
+            bytes: Compressed body
+        """
+        cacheable = self.cache_max_bytes and len(body) >= CACHE_MIN_BYTES
+        if cacheable:
+            key = (hashlib.blake2b(body, digest_size=16).digest(), encoding)
+            with self._lock:
+                compressed = self._entries.get(key)
+                if compressed is not None:
+                    self._entries.move_to_end(key)
+                    self.counters["cache_hits"] += 1
+                    return compressed
+
+        compressed = ENCODERS[encoding](body)
+        if cacheable and len(compressed) <= self.cache_max_bytes:
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = compressed
+                    self._bytes += len(compressed)
+                while self._bytes > self.cache_max_bytes:
+                    _, oldest = self._entries.popitem(last=False)
+                    self._bytes -= len(oldest)
+                    self.counters["evictions"] += 1
+        return compressed
+
+    def compress(self, response, accept_encodings):
+        """
+        Compress a response for a client
+
+        Args:
+            response (Response): Outgoing response
+            accept_encodings (Accept): The request's parsed Accept-Encoding
+
+        Returns:
+            Response: The same response, compressed when it is worth it
+        """
+        if response.direct_passthrough or response.is_streamed:
+            return response
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return response
+        if 'Content-Encoding' in response.headers or not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = accept_encodings.best_match(list(ENCODERS))
+        if encoding is None:
+            return response
+        body = response.get_data()
+        if len(body) < self.min_bytes:
+            return response
+        compressed = self.encode(body, encoding)
+        if len(compressed) >= len(body):
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        with self._lock:
+            self.counters["compressed"] += 1
+            self.counters["bytes_in"] += len(body)
+            self.counters["bytes_out"] += len(compressed)
+        return response
+
+    def stats(self):
+        """
+        Get compression counters and cache occupancy
+
+        Returns:
+            dict: Counters, cached bodies and bytes, encodings offered and the overall ratio
+        """
+        with self._lock:
+            stats = dict(self.counters)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        stats["max_bytes"] = self.cache_max_bytes
+        stats["encodings"] = list(ENCODERS)
+        stats["ratio"] = round(stats["bytes_in"] / stats["bytes_out"], 2) if stats["bytes_out"] else None
+        return stats
+
+_default_compressor = None
+_default_compressor_lock = threading.Lock()
+
+def get_default_compressor():
+    """
+    Get the process-wide response compressor, configured from the environment
+
+    Returns:
+        ResponseCompressor: Shared compressor, or None when RESPONSE_COMPRESSION_ENABLED is false
+    """
+    global _default_compressor
+    if not COMPRESSION_ENABLED:
+        return None
+    with _default_compressor_lock:
+        if _default_compressor is None:
+            _default_compressor = ResponseCompressor()
+    return _default_compressor
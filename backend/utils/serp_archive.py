@@ -0,0 +1,656 @@
+#!/usr/bin/env python3
+"""
+SERP Snapshot Archive
+This module keeps the history of SERP responses in a SQLite file. Each
+snapshot is split into a header block and one block per item, with
+positional fields moved into the snapshot's manifest. Blocks are
+content-addressed and compressed once against a dictionary trained on
+earlier blocks, so a result that stays on the page from day to day, even if
+it moves, is stored once. Each manifest also keeps the organic URLs and
+positions as packed integers, so diffing two snapshots reads two small rows
+and decompresses nothing.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter
+from datetime import datetime, timezone
+
+try:
+    import zstandard
+except ImportError:  # zlib preset dictionaries are used instead
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Snapshots are history, so nothing is archived until SERP_ARCHIVE_DB points at
+# persistent storage; a file in the temp directory would be lost on restart
+DEFAULT_DB_PATH = os.environ.get('SERP_ARCHIVE_DB')
+ARCHIVE_ENABLED = bool(DEFAULT_DB_PATH) and os.environ.get('SERP_ARCHIVE_ENABLED', 'True').lower() == 'true'
+# Blocks stored before the first dictionary is trained, and sampled for each training
+TRAIN_SAMPLES = 2000
+# New blocks compressed with a dictionary before it is retrained on recent blocks
+RETRAIN_BLOCKS = 100000
+ZSTD_DICTIONARY_SIZE = 64 * 1024
+ZSTD_LEVEL = 9
+# zlib only looks back 32KB, so a preset dictionary is capped there
+ZLIB_DICTIONARY_SIZE = 32 * 1024
+ZLIB_LEVEL = 9
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+CODEC = CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+# Result fields not kept: the fetch time is the snapshot's taken_at
+VOLATILE_RESULT_FIELDS = ("datetime", "items_count", "items")
+# Item fields kept in the manifest (rank_*) or dropped (xpath shifts with the layout)
+POSITIONAL_ITEM_FIELDS = ("rank_group", "rank_absolute", "xpath")
+LOOKUP_BATCH = 500
+# URL strings cached for diffs
+URL_CACHE_SIZE = 200000
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S %z"
+# Endpoint result types; regular and advanced SERPs of one keyword list different items
+RESULT_TYPES = ("regular", "advanced", "html")
+SERIES_TABLE = """
+    CREATE TABLE IF NOT EXISTS series (
+        id INTEGER PRIMARY KEY,
+        keyword TEXT NOT NULL,
+        se_domain TEXT NOT NULL,
+        location_code INTEGER NOT NULL,
+        language_code TEXT NOT NULL,
+        depth INTEGER NOT NULL DEFAULT 0,
+        result_type TEXT NOT NULL DEFAULT '',
+        UNIQUE (keyword, location_code, language_code, se_domain, depth, result_type)
+    )
+"""
+
+def canonical_json(value):
+    """Compact, key-sorted UTF-8 JSON, so equal content encodes to equal bytes."""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode()
+
+def content_hash(data):
+    """128-bit content address of a block."""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+def split_result(result):
+    """
+    Normalize a SERP result into blocks
+
+    Args:
+        result (dict): tasks[].result[] entry of a serp/google/organic response
+
+    Returns:
+        tuple: (header bytes, item bytes list, rank_group list, rank_absolute list,
+            organic URL list, organic position list)
+    """
+    header = canonical_json({k: v for k, v in result.items() if k not in VOLATILE_RESULT_FIELDS})
+    blocks, groups, absolutes, urls, positions = [], [], [], [], []
+    for item in result.get('items') or ():
+        groups.append(item.get('rank_group') or 0)
+        absolutes.append(item.get('rank_absolute') or 0)
+        blocks.append(canonical_json({k: v for k, v in item.items() if k not in POSITIONAL_ITEM_FIELDS}))
+        if item.get('type') == 'organic' and item.get('url'):
+            urls.append(item['url'])
+            positions.append(item.get('rank_group') or 0)
+    return header, blocks, groups, absolutes, urls, positions
+
+def series_key(task, result):
+    """
+    The series a SERP result belongs to
+
+    Snapshots are only comparable when they were fetched to the same depth
+    from the same endpoint type, so both are part of the key.
+
+    Args:
+        task (dict): tasks[] entry carrying the request data and endpoint path
+        result (dict): The task's result
+
+    Returns:
+        tuple: (keyword, location_code, language_code, se_domain, depth, result_type)
+    """
+    path = task.get('path') or ()
+    result_type = next((part for part in reversed(path) if part in RESULT_TYPES), '')
+    depth = (task.get('data') or {}).get('depth') or 0
+    return (result.get('keyword') or '', result.get('location_code') or 0, result.get('language_code') or '',
+            result.get('se_domain') or '', depth, result_type)
+
+def fetched_at(result):
+    """Unix time a result was fetched, from its datetime field, or now."""
+    try:
+        return datetime.strptime(result['datetime'], DATETIME_FORMAT).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return time.time()
+
+def zlib_dictionary(samples, size=ZLIB_DICTIONARY_SIZE):
+    """
+    Build a zlib preset dictionary from sample blocks
+
+    zlib has no trainer, so this keeps the JSON keys and values that recur
+    across samples, most frequent last where references to them are cheapest.
+    """
+    counts = Counter()
+    for sample in samples:
+        counts.update(set(re.findall(rb'"[^"]{1,80}"[:,}]?', sample)))
+    common = [token for token, count in sorted(counts.items(), key=lambda kv: kv[1]) if count > 1]
+    return b"".join(common)[-size:]
+
+class SerpArchive:
+    """
+    Content-addressed, compressed SERP snapshots shared by every worker.
+
+    A snapshot is a series (keyword, search engine domain, location and
+    language codes, depth and result type), the time its result was fetched
+    and a manifest. The same fetch stored twice, for instance from the
+    response cache, is one snapshot.
+    """
+    def __init__(self, db_path=None):
+        """
+        Initialize the archive
+
+        Args:
+            db_path (str): SQLite file shared by every worker on the host
+        """
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._dictionaries = {}
+        self._new_blocks = 0
+        self._training = threading.Lock()
+        self._url_cache = {}
+
+        conn = self._db()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS dictionaries (
+                    id INTEGER PRIMARY KEY,
+                    codec INTEGER NOT NULL,
+                    data BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS blocks (
+                    id INTEGER PRIMARY KEY,
+                    hash BLOB NOT NULL UNIQUE,
+                    codec INTEGER NOT NULL,
+                    dictionary_id INTEGER NOT NULL,
+                    data BLOB NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS urls (
+                    id INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL UNIQUE
+                );
+                CREATE TABLE IF NOT EXISTS manifests (
+                    id INTEGER PRIMARY KEY,
+                    hash BLOB NOT NULL UNIQUE,
+                    header_id INTEGER NOT NULL,
+                    items BLOB NOT NULL,
+                    organic BLOB NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    id INTEGER PRIMARY KEY,
+                    series_id INTEGER NOT NULL,
+                    taken_at REAL NOT NULL,
+                    manifest_id INTEGER NOT NULL,
+                    raw_size INTEGER NOT NULL,
+                    UNIQUE (series_id, taken_at)
+                );
+            """)
+            conn.execute(SERIES_TABLE)
+            # Archives created before depth and result type were part of a series
+            if 'depth' not in {row[1] for row in conn.execute("PRAGMA table_info(series)")}:
+                conn.execute("ALTER TABLE series RENAME TO series_v1")
+                conn.execute(SERIES_TABLE)
+                conn.execute(
+                    "INSERT INTO series (id, keyword, se_domain, location_code, language_code) "
+                    "SELECT id, keyword, se_domain, location_code, language_code FROM series_v1"
+                )
+                conn.execute("DROP TABLE series_v1")
+        self._current = self._latest_dictionary()
+
+    def _db(self):
+        """One SQLite connection per thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def _latest_dictionary(self):
+        """Id of the newest dictionary for this host's codec, or 0 for none."""
+        row = self._db().execute("SELECT MAX(id) FROM dictionaries WHERE codec = ?", (CODEC,)).fetchone()
+        return row[0] or 0
+
+    def _dictionary(self, dictionary_id):
+        """Dictionary bytes by id, cached; b"" for id 0."""
+        if not dictionary_id:
+            return b""
+        data = self._dictionaries.get(dictionary_id)
+        if data is None:
+            data = self._db().execute("SELECT data FROM dictionaries WHERE id = ?", (dictionary_id,)).fetchone()[0]
+            self._dictionaries[dictionary_id] = data
+        return data
+
+    def _codecs(self):
+        """Per-thread (codec, dictionary id) -> zstd compressor / decompressor cache."""
+        codecs = getattr(self._local, 'codecs', None)
+        if codecs is None:
+            codecs = self._local.codecs = {}
+        return codecs
+
+    def _compress(self, data, dictionary_id):
+        if CODEC == CODEC_ZLIB:
+            compressor = zlib.compressobj(ZLIB_LEVEL, zlib.DEFLATED, -15, zdict=self._dictionary(dictionary_id)) \
+                if dictionary_id else zlib.compressobj(ZLIB_LEVEL, zlib.DEFLATED, -15)
+            return compressor.compress(data) + compressor.flush()
+        codecs = self._codecs()
+        compressor = codecs.get(('c', dictionary_id))
+        if compressor is None:
+            dictionary = zstandard.ZstdCompressionDict(self._dictionary(dictionary_id)) if dictionary_id else None
+            compressor = codecs[('c', dictionary_id)] = zstandard.ZstdCompressor(
+                level=ZSTD_LEVEL, dict_data=dictionary, write_checksum=False, write_dict_id=False
+            )
+        return compressor.compress(data)
+
+    def _decompress(self, codec, dictionary_id, data):
+        if codec == CODEC_ZLIB:
+            decompressor = zlib.decompressobj(-15, zdict=self._dictionary(dictionary_id)) \
+                if dictionary_id else zlib.decompressobj(-15)
+            return decompressor.decompress(data) + decompressor.flush()
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed snapshots")
+        codecs = self._codecs()
+        decompressor = codecs.get(('d', dictionary_id))
+        if decompressor is None:
+            dictionary = zstandard.ZstdCompressionDict(self._dictionary(dictionary_id)) if dictionary_id else None
+            decompressor = codecs[('d', dictionary_id)] = zstandard.ZstdDecompressor(dict_data=dictionary)
+        return decompressor.decompress(data)
+
+    def _ids(self, table, column, values):
+        """value -> integer id for the values already in a table."""
+        conn = self._db()
+        values = list(values)
+        ids = {}
+        for start in range(0, len(values), LOOKUP_BATCH):
+            batch = values[start:start + LOOKUP_BATCH]
+            ids.update(conn.execute(
+                f"SELECT {column}, id FROM {table} WHERE {column} IN ({','.join('?' * len(batch))})", batch
+            ))
+        return ids
+
+    def _intern(self, table, column, values):
+        """value -> integer id for every value, adding unknown ones."""
+        values = list(dict.fromkeys(values))
+        self._db().executemany(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", ((v,) for v in values))
+        return self._ids(table, column, values)
+
+    def _store_blocks(self, blocks):
+        """
+        Store blocks that are not archived yet
+
+        Args:
+            blocks (list): Block bytes
+
+        Returns:
+            list: Block id of each block, in order
+        """
+        keys = [content_hash(block) for block in blocks]
+        hashes = dict(zip(keys, blocks))
+        ids = self._ids('blocks', 'hash', hashes)
+        missing = [key for key in hashes if key not in ids]
+        if missing:
+            dictionary_id = self._current
+            self._db().executemany(
+                "INSERT OR IGNORE INTO blocks (hash, codec, dictionary_id, data) VALUES (?, ?, ?, ?)",
+                ((key, CODEC, dictionary_id, self._compress(hashes[key], dictionary_id)) for key in missing)
+            )
+            ids.update(self._ids('blocks', 'hash', missing))
+            self._new_blocks += len(missing)
+        return [ids[key] for key in keys]
+
+    def store(self, response):
+        """
+        Archive the first result of a SERP response
+
+        Args:
+            response (dict): serp/google/organic response for one keyword
+
+        Returns:
+            int: Snapshot id, or None when the request failed
+        """
+        task = (response.get('tasks') or [{}])[0]
+        if response.get('status_code') != 20000 or task.get('status_code') != 20000:
+            return None
+        result = (task.get('result') or [None])[0]
+        if not result:
+            return None
+
+        header, blocks, groups, absolutes, urls, positions = split_result(result)
+        # Normalized size; the fields moved to the manifest are a few bytes per item
+        raw_size = len(header) + sum(len(block) for block in blocks)
+        taken_at = fetched_at(result)
+        conn = self._db()
+        with conn:
+            header_id, *block_ids = self._store_blocks([header] + blocks)
+            url_ids = self._intern('urls', 'url', urls)
+            items = (array('I', block_ids).tobytes()
+                     + array('H', groups).tobytes() + array('H', absolutes).tobytes())
+            organic = array('I', (url_ids[url] for url in urls)).tobytes() + array('H', positions).tobytes()
+            manifest_hash = content_hash(array('I', [header_id]).tobytes() + items)
+            conn.execute(
+                "INSERT OR IGNORE INTO manifests (hash, header_id, items, organic) VALUES (?, ?, ?, ?)",
+                (manifest_hash, header_id, zlib.compress(items), organic)
+            )
+            manifest_id = conn.execute("SELECT id FROM manifests WHERE hash = ?", (manifest_hash,)).fetchone()[0]
+            series = series_key(task, result)
+            conn.execute(
+                "INSERT OR IGNORE INTO series (keyword, location_code, language_code, se_domain, depth, result_type) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                series
+            )
+            series_id = conn.execute(
+                "SELECT id FROM series WHERE keyword = ? AND location_code = ? AND language_code = ? "
+                "AND se_domain = ? AND depth = ? AND result_type = ?",
+                series
+            ).fetchone()[0]
+            conn.execute(
+                "INSERT OR IGNORE INTO snapshots (series_id, taken_at, manifest_id, raw_size) VALUES (?, ?, ?, ?)",
+                (series_id, taken_at, manifest_id, raw_size)
+            )
+            snapshot_id = conn.execute(
+                "SELECT id FROM snapshots WHERE series_id = ? AND taken_at = ?", (series_id, taken_at)
+            ).fetchone()[0]
+
+        if self._new_blocks >= (RETRAIN_BLOCKS if self._current else TRAIN_SAMPLES):
+            self._train_in_background()
+        return snapshot_id
+
+    def _train_in_background(self):
+        """Start train() on a daemon thread, unless one is already training."""
+        if not self._training.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                self.train()
+            finally:
+                self._training.release()
+
+        threading.Thread(target=run, name="serp-archive-train", daemon=True).start()
+
+    def train(self):
+        """
+        Train a new dictionary on the most recent blocks
+
+        store() runs this on a background thread once enough new blocks have
+        accumulated. Blocks already stored keep the dictionary they were
+        compressed with; new blocks use the new one.
+
+        Returns:
+            int: New dictionary id, or None when training was skipped
+        """
+        with self._lock:
+            self._new_blocks = 0
+            rows = self._db().execute(
+                "SELECT codec, dictionary_id, data FROM blocks ORDER BY id DESC LIMIT ?", (TRAIN_SAMPLES,)
+            ).fetchall()
+            try:
+                samples = [self._decompress(codec, dictionary_id, data) for codec, dictionary_id, data in rows]
+                if CODEC == CODEC_ZSTD:
+                    data = zstandard.train_dictionary(ZSTD_DICTIONARY_SIZE, samples).as_bytes()
+                else:
+                    data = zlib_dictionary(samples)
+            except Exception:
+                logger.exception("SERP archive dictionary training skipped")
+                return None
+            if not data:
+                return None
+            conn = self._db()
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO dictionaries (codec, data, created_at) VALUES (?, ?, ?)", (CODEC, data, time.time())
+                )
+            self._current = cursor.lastrowid
+            return self._current
+
+    def _snapshot_row(self, snapshot_id):
+        return self._db().execute(
+            "SELECT s.id, s.taken_at, s.raw_size, r.keyword, r.se_domain, r.location_code, r.language_code, "
+            "r.depth, r.result_type "
+            "FROM snapshots s JOIN series r ON r.id = s.series_id WHERE s.id = ?", (snapshot_id,)
+        ).fetchone()
+
+    @staticmethod
+    def _describe(row):
+        snapshot_id, taken_at, raw_size, keyword, se_domain, location_code, language_code, depth, result_type = row
+        return {
+            "id": snapshot_id,
+            "taken_at": datetime.fromtimestamp(taken_at, timezone.utc).strftime("%Y-%m-%d %H:%M:%S +00:00"),
+            "keyword": keyword,
+            "se_domain": se_domain,
+            "location_code": location_code,
+            "language_code": language_code,
+            "depth": depth,
+            "result_type": result_type,
+            "raw_size": raw_size
+        }
+
+    def snapshots(self, keyword, location_code=None, language_code=None, limit=100):
+        """
+        List a keyword's snapshots, newest first
+
+        Args:
+            keyword (str): Keyword
+            location_code (int): Optional location filter
+            language_code (str): Optional language filter
+            limit (int): Maximum snapshots
+
+        Returns:
+            list: Snapshot descriptions (id, taken_at, series fields, raw_size)
+        """
+        query = ("SELECT s.id, s.taken_at, s.raw_size, r.keyword, r.se_domain, r.location_code, r.language_code, "
+                 "r.depth, r.result_type FROM snapshots s JOIN series r ON r.id = s.series_id WHERE r.keyword = ?")
+        params = [keyword]
+        if location_code is not None:
+            query += " AND r.location_code = ?"
+            params.append(location_code)
+        if language_code is not None:
+            query += " AND r.language_code = ?"
+            params.append(language_code)
+        rows = self._db().execute(query + " ORDER BY s.taken_at DESC LIMIT ?", params + [limit]).fetchall()
+        return [self._describe(row) for row in rows]
+
+    def snapshot(self, snapshot_id):
+        """
+        Rebuild an archived SERP result
+
+        Args:
+            snapshot_id (int): Snapshot id
+
+        Returns:
+            dict: Snapshot description with the result (without xpath fields), or None
+        """
+        row = self._snapshot_row(snapshot_id)
+        if row is None:
+            return None
+        conn = self._db()
+        header_id, items = conn.execute(
+            "SELECT m.header_id, m.items FROM snapshots s JOIN manifests m ON m.id = s.manifest_id WHERE s.id = ?",
+            (snapshot_id,)
+        ).fetchone()
+        items = zlib.decompress(items)
+        count = len(items) // 8
+        block_ids, groups, absolutes = array('I'), array('H'), array('H')
+        block_ids.frombytes(items[:4 * count])
+        groups.frombytes(items[4 * count:6 * count])
+        absolutes.frombytes(items[6 * count:])
+
+        wanted = list(set(block_ids) | {header_id})
+        blocks = {}
+        for start in range(0, len(wanted), LOOKUP_BATCH):
+            batch = wanted[start:start + LOOKUP_BATCH]
+            for block_id, codec, dictionary_id, data in conn.execute(
+                f"SELECT id, codec, dictionary_id, data FROM blocks WHERE id IN ({','.join('?' * len(batch))})", batch
+            ):
+                blocks[block_id] = json.loads(self._decompress(codec, dictionary_id, data))
+
+        snapshot = self._describe(row)
+        result = dict(blocks[header_id], datetime=snapshot["taken_at"], items_count=count, items=[])
+        for block_id, group, absolute in zip(block_ids, groups, absolutes):
+            result["items"].append(dict(blocks[block_id], rank_group=group, rank_absolute=absolute))
+        snapshot["result"] = result
+        return snapshot
+
+    def _organic(self, snapshot_id):
+        """(series id, organic URL ids, positions) of a snapshot, or None."""
+        row = self._db().execute(
+            "SELECT s.series_id, m.organic FROM snapshots s JOIN manifests m ON m.id = s.manifest_id WHERE s.id = ?",
+            (snapshot_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        series_id, organic = row
+        count = len(organic) // 6
+        url_ids, positions = array('I'), array('H')
+        url_ids.frombytes(organic[:4 * count])
+        positions.frombytes(organic[4 * count:])
+        return series_id, url_ids, positions
+
+    def _url_strings(self, url_ids):
+        """URL id -> URL, through a bounded cache; interned URLs never change."""
+        cache = self._url_cache
+        missing = [url_id for url_id in url_ids if url_id not in cache]
+        if missing:
+            if len(cache) + len(missing) > URL_CACHE_SIZE:
+                cache.clear()
+            for start in range(0, len(missing), LOOKUP_BATCH):
+                batch = missing[start:start + LOOKUP_BATCH]
+                cache.update(self._db().execute(
+                    f"SELECT id, url FROM urls WHERE id IN ({','.join('?' * len(batch))})", batch
+                ))
+        return {url_id: cache[url_id] for url_id in url_ids}
+
+    def latest(self, keyword, location_code=None, language_code=None):
+        """Ids of a keyword's newest snapshot and the one before it in the same series, as (older, newer), or None."""
+        found = self.snapshots(keyword, location_code, language_code, limit=1)
+        if not found:
+            return None
+        row = self._db().execute(
+            "SELECT o.id FROM snapshots n JOIN snapshots o ON o.series_id = n.series_id AND o.taken_at < n.taken_at "
+            "WHERE n.id = ? ORDER BY o.taken_at DESC LIMIT 1", (found[0]["id"],)
+        ).fetchone()
+        return (row[0], found[0]["id"]) if row else None
+
+    def diff(self, from_id, to_id):
+        """
+        Compare the organic results of two snapshots of the same keyword
+
+        Args:
+            from_id (int): Earlier snapshot id
+            to_id (int): Later snapshot id
+
+        Returns:
+            dict: entered (url, position), left (url, position), moved (url,
+                from, to, change; largest moves first) and unchanged count,
+                or None when a snapshot does not exist
+
+        Raises:
+            ValueError: If the snapshots belong to different series
+        """
+        before, after = self._organic(from_id), self._organic(to_id)
+        if before is None or after is None:
+            return None
+        if before[0] != after[0]:
+            raise ValueError("Snapshots belong to different keywords, locations, depths or result types")
+
+        # A URL listed twice keeps its best (first) position
+        old = dict(zip(reversed(before[1]), reversed(before[2])))
+        new = dict(zip(reversed(after[1]), reversed(after[2])))
+
+        entered = sorted((position, url_id) for url_id, position in new.items() if url_id not in old)
+        left = sorted((position, url_id) for url_id, position in old.items() if url_id not in new)
+        moved = sorted(
+            ((old[url_id] - position, position, url_id) for url_id, position in new.items()
+             if url_id in old and old[url_id] != position),
+            key=lambda m: (-abs(m[0]), m[1])
+        )
+        urls = self._url_strings([url_id for _, url_id in entered] + [url_id for _, url_id in left]
+                                 + [m[2] for m in moved])
+        return {
+            "from": from_id,
+            "to": to_id,
+            "entered": [{"url": urls[url_id], "position": position} for position, url_id in entered],
+            "left": [{"url": urls[url_id], "position": position} for position, url_id in left],
+            "moved": [{"url": urls[url_id], "from": position + change, "to": position, "change": change}
+                      for change, position, url_id in moved],
+            "unchanged": len(new) - len(entered) - len(moved)
+        }
+
+    def stats(self):
+        """
+        Storage totals
+
+        Returns:
+            dict: snapshot, manifest and block counts, raw and stored bytes
+                and their ratio
+        """
+        conn = self._db()
+        snapshots, raw = conn.execute("SELECT COUNT(*), COALESCE(SUM(raw_size), 0) FROM snapshots").fetchone()
+        blocks, block_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data) + 16), 0) FROM blocks").fetchone()
+        manifests, manifest_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(items) + LENGTH(organic) + 16), 0) FROM manifests"
+        ).fetchone()
+        dictionary_bytes = conn.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM dictionaries").fetchone()[0]
+        stored = block_bytes + manifest_bytes + dictionary_bytes
+        return {
+            "codec": "zstd" if CODEC == CODEC_ZSTD else "zlib",
+            "snapshots": snapshots,
+            "manifests": manifests,
+            "blocks": blocks,
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "ratio": round(raw / stored, 1) if stored else None
+        }
+
+_default_serp_archive = None
+_default_serp_archive_lock = threading.Lock()
+
+def get_default_serp_archive():
+    """
+    Get the process-wide SERP archive
+
+    Returns:
+        SerpArchive: Shared archive backed by SERP_ARCHIVE_DB, or None when
+            archiving is disabled
+    """
+    global _default_serp_archive
+    if not ARCHIVE_ENABLED:
+        return None
+    with _default_serp_archive_lock:
+        if _default_serp_archive is None:
+            _default_serp_archive = SerpArchive()
+    return _default_serp_archive
+
+def archive_response(response):
+    """
+    Snapshot a SERP response in the default archive when archiving is enabled
+
+    Archiving never fails the caller; errors are logged.
+
+    Args:
+        response (dict): serp/google/organic response for one keyword
+
+    Returns:
+        int: Snapshot id, or None
+    """
+    if not ARCHIVE_ENABLED:
+        return None
+    try:
+        return get_default_serp_archive().store(response)
+    except Exception:
+        logger.exception("SERP archive error")
+        return None
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+SERP Overlap Clustering
+This module groups keywords whose top organic results share ranking URLs.
+MinHash signatures over each keyword's URL set and LSH banding pick the
+candidate pairs, which are then checked exactly, so clustering tens of
+thousands of keywords never compares every pair.
+"""
+from collections import Counter
+from concurrent.futures import wait
+from urllib.parse import urlsplit
+import time
+import numpy as np
+
+DEFAULT_TOP_N = 10
+DEFAULT_THRESHOLD = 0.4
+DEFAULT_NUM_PERM = 64
+# lsh_parameters searches every band/row split, quadratic in the signature length
+MAX_NUM_PERM = 512
+DEFAULT_MIN_CLUSTER_SIZE = 2
+METHODS = ("pivot", "connected")
+
+# Universal hashing modulo a Mersenne prime keeps (a * x + b) inside int64
+MERSENNE_PRIME = (1 << 31) - 1
+# Permutations hashed per pass; bounds the (urls x block) intermediate
+PERMUTATION_BLOCK = 16
+# Buckets up to this size are expanded to every pair; larger ones (keywords
+# with near-identical SERPs) are linked to their earliest member instead
+MAX_BUCKET_PAIRS = 32
+# Candidate pairs verified per vectorized pass
+VERIFY_BATCH = 100000
+TOP_URLS_PER_CLUSTER = 5
+
+def normalize_url(url):
+    """Host (without www.) and path of a URL, ignoring scheme, query, fragment and trailing slash."""
+    parts = urlsplit(url.strip().lower())
+    host = parts.netloc[4:] if parts.netloc.startswith('www.') else parts.netloc
+    return host + (parts.path.rstrip('/') or '/')
+
+def serp_urls(response, top_n=DEFAULT_TOP_N):
+    """
+    Top organic URLs of a regular SERP response
+
+    Args:
+        response (dict): serp/google/organic regular response for one keyword
+        top_n (int): Number of organic results to keep
+
+    Returns:
+        list: Normalized URLs in rank order, or None when the lookup failed
+    """
+    task = (response.get('tasks') or [{}])[0]
+    if response.get('status_code') != 20000 or task.get('status_code') != 20000:
+        return None
+    result = (task.get('result') or [{}])[0] or {}
+    organic = [
+        item for item in result.get('items') or []
+        if item.get('type') == 'organic' and item.get('url')
+    ]
+    organic.sort(key=lambda item: item.get('rank_group') or 0)
+    urls = []
+    for item in organic:
+        url = normalize_url(item['url'])
+        if url not in urls:
+            urls.append(url)
+        if len(urls) >= top_n:
+            break
+    return urls
+
+def fetch_url_sets(client, keywords, location="United States", language="English", top_n=DEFAULT_TOP_N,
+                   mode="queued", on_progress=None, should_stop=None):
+    """
+    Fetch the top organic URLs of many keywords
+
+    Queued lookups go through the client's task queue, so SERPs already in
+    the response cache resolve at once and the rest cost standard-queue
+    prices. Progress is reported as futures resolve.
+
+    Args:
+        client (DataForSEOClient): Client used for lookups
+        keywords (list): Deduplicated keywords
+        location (str): Location name
+        language (str): Language name
+        top_n (int): Organic results kept per keyword
+        mode (str): "queued" or "live", as for get_serp_data_many
+        on_progress (callable): Called with (fetched, total, cost)
+        should_stop (callable): Returns True to stop waiting; raise from it to abort
+
+    Returns:
+        tuple: (keyword -> URLs for every keyword whose lookup succeeded,
+            keywords whose lookup failed, summed API cost)
+    """
+    responses = client.get_serp_data_many(keywords, location, language, depth=top_n, mode=mode)
+    url_sets, failed, cost = {}, [], 0.0
+
+    def collect(keyword, response):
+        nonlocal cost
+        cost += response.get('cost') or 0
+        urls = serp_urls(response, top_n)
+        if urls is None:
+            failed.append(keyword)
+        else:
+            url_sets[keyword] = urls
+
+    if mode != "queued":
+        for keyword, response in responses.items():
+            collect(keyword, response)
+    else:
+        pending = {future: keyword for keyword, future in responses.items()}
+        while pending:
+            if should_stop is not None and should_stop():
+                break
+            done, _ = wait(pending, timeout=1.0)
+            for future in done:
+                keyword = pending.pop(future)
+                try:
+                    collect(keyword, future.result())
+                except Exception:
+                    failed.append(keyword)
+            if on_progress is not None:
+                on_progress(len(keywords) - len(pending), len(keywords), cost)
+        failed.extend(pending.values())
+    # Keep caller order, which pivot clustering treats as priority
+    return {keyword: url_sets[keyword] for keyword in keywords if keyword in url_sets}, failed, cost
+
+def jaccard_threshold(overlap):
+    """Jaccard similarity of two equal-size URL sets sharing an overlap fraction of their URLs."""
+    return overlap / (2 - overlap)
+
+def lsh_parameters(num_perm, threshold, false_positive_weight=0.3, false_negative_weight=0.7):
+    """
+    Choose LSH bands and rows per band for a Jaccard threshold
+
+    Minimizes the weighted area under the false positive and false negative
+    curves of the banding scheme. Missed pairs are weighted higher because
+    every candidate is verified exactly anyway.
+
+    Args:
+        num_perm (int): Signature length
+        threshold (float): Jaccard similarity to separate at
+        false_positive_weight (float): Weight of candidates below threshold
+        false_negative_weight (float): Weight of missed pairs above threshold
+
+    Returns:
+        tuple: (bands, rows)
+    """
+    best, best_error = (num_perm, 1), None
+    below = np.linspace(0, threshold, 101)
+    above = np.linspace(threshold, 1, 101)
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            false_positive = np.mean(1 - (1 - below ** rows) ** bands) * threshold
+            false_negative = np.mean((1 - above ** rows) ** bands) * (1 - threshold)
+            error = false_positive_weight * false_positive + false_negative_weight * false_negative
+            if best_error is None or error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+def minhash_signatures(owners, ids, count, num_perm=DEFAULT_NUM_PERM, seed=1):
+    """
+    MinHash signatures of many integer sets at once
+
+    Args:
+        owners (np.ndarray): Set index of each element, sorted ascending, every
+            set in range(count) having at least one element
+        ids (np.ndarray): Element ids, below MERSENNE_PRIME
+        count (int): Number of sets
+        num_perm (int): Signature length
+        seed (int): Seed for the hash functions
+
+    Returns:
+        np.ndarray: (count, num_perm) int64 signatures
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+    b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+    ids = ids.astype(np.int64)[:, None]
+    signatures = np.empty((count, num_perm), dtype=np.int64)
+    for block in range(0, num_perm, PERMUTATION_BLOCK):
+        end = min(block + PERMUTATION_BLOCK, num_perm)
+        hashed = (ids * a[block:end] + b[block:end]) % MERSENNE_PRIME
+        signatures[:, block:end] = np.minimum.reduceat(hashed, starts, axis=0)
+    return signatures
+
+def candidate_pairs(signatures, bands, rows, seed=2):
+    """
+    Pairs of sets sharing at least one LSH band bucket
+
+    Args:
+        signatures (np.ndarray): (count, num_perm) MinHash signatures
+        bands (int): Number of bands
+        rows (int): Signature rows per band
+        seed (int): Seed for the band hash
+
+    Returns:
+        np.ndarray: (pairs, 2) int64 array of unique (i, j) with i < j
+    """
+    count = len(signatures)
+    multipliers = np.random.default_rng(seed).integers(1, 1 << 62, size=rows, dtype=np.int64).astype(np.uint64)
+    found = []
+    for band in range(bands):
+        block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        # Wrapping uint64 arithmetic; a rare bucket collision only adds a candidate
+        keys = (block * multipliers).sum(axis=1)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        first = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+        bucket = np.cumsum(first) - 1
+        starts = np.flatnonzero(first)
+        sizes = np.diff(np.r_[starts, count])[bucket]
+        small = sizes <= MAX_BUCKET_PAIRS
+        # Every pair of a small bucket is (position, position + offset) within it
+        for offset in range(1, min(MAX_BUCKET_PAIRS, int(sizes.max()))):
+            left = np.flatnonzero(small[:-offset] & (bucket[:-offset] == bucket[offset:]))
+            if not len(left):
+                break
+            found.append(np.stack([order[left], order[left + offset]], axis=1))
+        large = np.flatnonzero(~small & ~first)
+        if len(large):
+            found.append(np.stack([order[starts[bucket[large]]], order[large]], axis=1))
+    if not found:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.concatenate(found).astype(np.int64)
+    pairs.sort(axis=1)
+    codes = np.unique(pairs[:, 0] * count + pairs[:, 1])
+    return np.stack([codes // count, codes % count], axis=1)
+
+def overlap_scores(padded, sizes, pairs):
+    """
+    Exact URL overlap of candidate pairs
+
+    Args:
+        padded (np.ndarray): (count, top_n) URL ids per set, padded with -1
+        sizes (np.ndarray): Number of URLs per set
+        pairs (np.ndarray): (pairs, 2) candidate pairs
+
+    Returns:
+        tuple: (shared URL counts, overlap = shared / smaller set size)
+    """
+    shared = np.empty(len(pairs), dtype=np.int64)
+    for start in range(0, len(pairs), VERIFY_BATCH):
+        batch = pairs[start:start + VERIFY_BATCH]
+        left, right = padded[batch[:, 0]], padded[batch[:, 1]]
+        matches = (left[:, :, None] == right[:, None, :]) & (left[:, :, None] >= 0)
+        shared[start:start + VERIFY_BATCH] = matches.any(axis=2).sum(axis=1)
+    smaller = np.minimum(sizes[pairs[:, 0]], sizes[pairs[:, 1]])
+    return shared, shared / np.maximum(smaller, 1)
+
+def _neighbours(count, pairs):
+    """CSR adjacency (offsets, neighbours) of an undirected pair list, neighbours ascending."""
+    edges = np.concatenate([pairs, pairs[:, ::-1]])
+    edges = edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+    offsets = np.searchsorted(edges[:, 0], np.arange(count + 1))
+    return offsets, edges[:, 1]
+
+def _pivot_groups(count, pairs):
+    """Greedy pivot clustering: each unassigned set, in input order, takes its unassigned neighbours."""
+    offsets, neighbours = _neighbours(count, pairs)
+    assigned = np.zeros(count, dtype=bool)
+    groups = []
+    for i in range(count):
+        if assigned[i]:
+            continue
+        members = neighbours[offsets[i]:offsets[i + 1]]
+        members = np.r_[i, members[~assigned[members]]]
+        assigned[members] = True
+        groups.append(members)
+    return groups
+
+def _connected_groups(count, pairs):
+    """Connected components of the overlap graph (single linkage)."""
+    parent = list(range(count))
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    for i, j in pairs.tolist():
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+    roots = np.array([find(i) for i in range(count)])
+    order = np.argsort(roots, kind='stable')
+    bounds = np.flatnonzero(np.r_[True, roots[order][1:] != roots[order][:-1], True])
+    return [order[bounds[k]:bounds[k + 1]] for k in range(len(bounds) - 1)]
+
+def cluster_url_sets(url_sets, threshold=DEFAULT_THRESHOLD, method="pivot", min_cluster_size=DEFAULT_MIN_CLUSTER_SIZE,
+                     num_perm=DEFAULT_NUM_PERM, seed=1):
+    """
+    Cluster keywords by the overlap of their ranking URLs
+
+    Args:
+        url_sets (dict): keyword -> list of its top URLs, in priority order
+            (e.g. by search volume); pivot clustering seeds clusters in this order
+        threshold (float): Minimum share of URLs two keywords must have in
+            common, relative to the smaller URL list (0.4 = 4 of 10)
+        method (str): "pivot" (every member overlaps the cluster's first
+            keyword) or "connected" (members are linked by a chain of overlaps)
+        min_cluster_size (int): Smaller groups are reported as unclustered
+        num_perm (int): MinHash signature length
+        seed (int): Seed for the hash functions
+
+    Returns:
+        tuple: (clusters sorted by size, largest first, each with its keywords
+            and most shared URLs; stats dict with counts and timings)
+    """
+    timings = {}
+    started = time.perf_counter()
+    keywords = [keyword for keyword, urls in url_sets.items() if urls]
+    vocabulary = {}
+    owners, ids, sizes = [], [], []
+    for index, keyword in enumerate(keywords):
+        urls = list(dict.fromkeys(url_sets[keyword]))
+        owners.extend([index] * len(urls))
+        ids.extend(vocabulary.setdefault(url, len(vocabulary)) for url in urls)
+        sizes.append(len(urls))
+    count = len(keywords)
+    stats = {
+        "keywords": len(url_sets),
+        "keywords_with_urls": count,
+        "distinct_urls": len(vocabulary),
+        "threshold": threshold,
+        "method": method,
+        "num_perm": num_perm
+    }
+    if count < 2:
+        stats.update(candidate_pairs=0, linked_pairs=0, clusters=0, unclustered=count, timings_ms={})
+        return [], stats
+
+    owners = np.asarray(owners, dtype=np.int64)
+    ids = np.asarray(ids, dtype=np.int64)
+    sizes = np.asarray(sizes, dtype=np.int64)
+    width = int(sizes.max())
+    padded = np.full((count, width), -1, dtype=np.int64)
+    padded[owners, np.arange(len(ids)) - np.repeat(np.cumsum(sizes) - sizes, sizes)] = ids
+    timings["index"] = time.perf_counter() - started
+
+    bands, rows = lsh_parameters(num_perm, jaccard_threshold(threshold))
+    step = time.perf_counter()
+    signatures = minhash_signatures(owners, ids, count, num_perm, seed)
+    timings["minhash"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    pairs = candidate_pairs(signatures, bands, rows, seed + 1)
+    timings["lsh"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    _, overlap = overlap_scores(padded, sizes, pairs)
+    linked = pairs[overlap >= threshold]
+    timings["verify"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    groups = _connected_groups(count, linked) if method == "connected" else _pivot_groups(count, linked)
+    urls = list(vocabulary)
+    clusters = []
+    unclustered = 0
+    for members in groups:
+        if len(members) < max(min_cluster_size, 2):
+            unclustered += len(members)
+            continue
+        members = np.sort(members) if method == "connected" else members
+        member_urls = padded[members]
+        url_counts = Counter(member_urls[member_urls >= 0].tolist())
+        clusters.append({
+            "keywords": [keywords[i] for i in members],
+            "size": len(members),
+            "top_urls": [
+                {"url": urls[url_id], "keywords": hits}
+                for url_id, hits in url_counts.most_common(TOP_URLS_PER_CLUSTER)
+            ]
+        })
+    clusters.sort(key=lambda cluster: -cluster["size"])
+    timings["group"] = time.perf_counter() - step
+
+    stats.update(
+        bands=bands,
+        rows_per_band=rows,
+        candidate_pairs=len(pairs),
+        linked_pairs=len(linked),
+        clusters=len(clusters),
+        unclustered=unclustered + len(url_sets) - count,
+        timings_ms={name: round(seconds * 1000, 1) for name, seconds in timings.items()}
+    )
+    return clusters, stats
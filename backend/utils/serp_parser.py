@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+SERP Parser
+This module reduces a DataForSEO organic SERP result to a compact structure
+in a single pass over its items: feature flags, the featured snippet owner,
+local pack entries, People Also Ask questions and organic positions as
+parallel arrays.
+"""
+
+# SERP item types reported as presence flags, named as DataForSEO types them
+FEATURE_FLAGS = (
+    "featured_snippet", "answer_box", "knowledge_graph", "local_pack", "map",
+    "people_also_ask", "images", "video", "top_stories", "shopping",
+    "popular_products", "twitter", "related_searches", "ai_overview", "paid"
+)
+
+def _featured_snippet(item, parsed):
+    if parsed["featured_snippet"] is None:
+        parsed["featured_snippet"] = {
+            "domain": item.get('domain'),
+            "url": item.get('url'),
+            "title": item.get('title'),
+            "rank_absolute": item.get('rank_absolute')
+        }
+
+def _local_pack(item, parsed):
+    rating = item.get('rating') or {}
+    parsed["local_pack"].append({
+        "title": item.get('title'),
+        "domain": item.get('domain'),
+        "url": item.get('url'),
+        "phone": item.get('phone'),
+        "rating": rating.get('value'),
+        "votes": rating.get('votes_count'),
+        "is_paid": item.get('is_paid', False),
+        "cid": item.get('cid'),
+        "rank_group": item.get('rank_group')
+    })
+
+def _people_also_ask(item, parsed):
+    questions = parsed["people_also_ask"]
+    for element in item.get('items') or ():
+        if element.get('title'):
+            questions.append(element['title'])
+
+# Item type -> handler; organic results are handled inline as the common case
+HANDLERS = {
+    "featured_snippet": _featured_snippet,
+    "local_pack": _local_pack,
+    "people_also_ask": _people_also_ask,
+}
+
+def parse_serp(result):
+    """
+    Parse one SERP result
+
+    Args:
+        result (dict): tasks[].result[] entry of a regular or advanced
+            serp/google/organic response
+
+    Returns:
+        dict: keyword, se_results_count, item_types (in page order), features
+            (FEATURE_FLAGS -> bool), featured_snippet (owner or None),
+            local_pack (entries), people_also_ask (questions) and organic
+            (position, rank_absolute, domain, url and title arrays)
+    """
+    position, rank_absolute, domain, url, title = [], [], [], [], []
+    parsed = {
+        "featured_snippet": None,
+        "local_pack": [],
+        "people_also_ask": []
+    }
+    seen = {}
+    handlers = HANDLERS
+    for item in result.get('items') or ():
+        item_type = item.get('type')
+        seen[item_type] = True
+        if item_type == 'organic':
+            position.append(item.get('rank_group'))
+            rank_absolute.append(item.get('rank_absolute'))
+            domain.append(item.get('domain'))
+            url.append(item.get('url'))
+            title.append(item.get('title'))
+            continue
+        handler = handlers.get(item_type)
+        if handler is not None:
+            handler(item, parsed)
+
+    # item_types also lists features beyond the requested depth
+    for item_type in result.get('item_types') or ():
+        seen.setdefault(item_type, True)
+    parsed.update(
+        keyword=result.get('keyword'),
+        se_results_count=result.get('se_results_count'),
+        item_types=list(seen),
+        features={flag: flag in seen for flag in FEATURE_FLAGS},
+        organic={
+            "position": position,
+            "rank_absolute": rank_absolute,
+            "domain": domain,
+            "url": url,
+            "title": title
+        }
+    )
+    return parsed
+
+def parse_response(response):
+    """
+    Parse the first result of a SERP response
+
+    Args:
+        response (dict): serp/google/organic response for one keyword
+
+    Returns:
+        dict: parse_serp() output, or None when the request failed
+    """
+    task = (response.get('tasks') or [{}])[0]
+    if response.get('status_code') != 20000 or task.get('status_code') != 20000:
+        return None
+    result = (task.get('result') or [None])[0]
+    return parse_serp(result) if result else None
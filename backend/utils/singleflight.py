@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Singleflight Request Coalescing
+This module lets concurrent callers asking for the same upstream request share
+one in-flight call instead of each sending their own.
+"""
+import copy
+import os
+import sqlite3
+import threading
+import time
+
+SINGLEFLIGHT_ENABLED = os.environ.get('DATAFORSEO_SINGLEFLIGHT_ENABLED', 'True').lower() == 'true'
+# Cross-worker leases live next to the shared cache tier unless configured separately
+DEFAULT_LEASE_DB = os.environ.get('DATAFORSEO_SINGLEFLIGHT_DB', os.environ.get('DATAFORSEO_CACHE_DB'))
+DEFAULT_LEASE_TTL = float(os.environ.get('DATAFORSEO_SINGLEFLIGHT_LEASE_TTL', 120))
+DEFAULT_POLL_INTERVAL = 0.1
+
+class WaitTimeout(TimeoutError):
+    """Raised to a caller whose wait for another caller's result ran out of time."""
+
+class _Call:
+    """An in-flight call that followers wait on."""
+    __slots__ = ('event', 'result', 'error', 'followers')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls.
+
+    Within a process, the first caller for a key runs the call and every
+    caller that arrives while it is in flight waits for its result. Each
+    follower gets its own copy, so callers may change what they get back.
+    When ``lease_db`` is set, the leader also takes a lease row in a SQLite
+    file; leaders in other gunicorn workers that find the lease taken poll
+    ``peek`` (normally the shared SQLite cache tier) for the result instead of
+    calling upstream, and take over if the lease expires.
+    """
+    def __init__(self, lease_db=None, lease_ttl=None, poll_interval=None):
+        """
+        Initialize the coalescer
+
+        Args:
+            lease_db (str): Optional path of the SQLite lease file for cross-worker coalescing
+            lease_ttl (float): Seconds after which an abandoned lease can be taken over
+            poll_interval (float): Seconds between checks while another worker holds the lease
+        """
+        self.lease_db = lease_db
+        self.lease_ttl = lease_ttl if lease_ttl is not None else DEFAULT_LEASE_TTL
+        self.poll_interval = poll_interval if poll_interval is not None else DEFAULT_POLL_INTERVAL
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.counters = {
+            "leaders": 0,
+            "coalesced": 0,
+            "cross_worker_coalesced": 0
+        }
+        if self.lease_db:
+            conn = self._db()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS singleflight_leases (
+                    key TEXT PRIMARY KEY,
+                    owner INTEGER NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.commit()
+
+    def _db(self):
+        """One SQLite connection per thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.lease_db, timeout=10, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def do(self, key, fn, peek=None, timeout=None):
+        """
+        Run fn once for all concurrent callers with the same key
+
+        Args:
+            key (str): Canonical identity of the call
+            fn (callable): Performs the upstream call and returns its result
+            peek (callable): Optional lookup of a result published by another worker
+            timeout (float): Longest this caller waits on a call someone else
+                is running (normally what is left of its request deadline);
+                None waits until that call finishes
+
+        Returns:
+            object: Result of fn; followers get a deep copy of the leader's
+
+        Raises:
+            WaitTimeout: The shared call did not finish within timeout
+        """
+        wait_until = time.monotonic() + timeout if timeout is not None else None
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                call.followers += 1
+                self.counters["coalesced"] += 1
+
+        if not leader:
+            if not call.event.wait(timeout if timeout is None else max(timeout, 0)):
+                raise WaitTimeout(f"Timed out waiting for an in-flight call to {key}")
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        result = None
+        try:
+            result = self._run(key, fn, peek, wait_until)
+            return result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            # Followers copy from a snapshot taken before the leader can change its result
+            if call.followers and call.error is None:
+                call.result = copy.deepcopy(result)
+            call.event.set()
+
+    def _run(self, key, fn, peek, wait_until=None):
+        """Run fn as the process leader, deferring to another worker's lease if one is held."""
+        if not self.lease_db:
+            with self._lock:
+                self.counters["leaders"] += 1
+            return fn()
+
+        waited = False
+        while True:
+            if self._acquire_lease(key):
+                try:
+                    # The previous holder may have published just before releasing
+                    result = peek() if waited and peek is not None else None
+                    if result is not None:
+                        with self._lock:
+                            self.counters["cross_worker_coalesced"] += 1
+                        return result
+                    with self._lock:
+                        self.counters["leaders"] += 1
+                    return fn()
+                finally:
+                    self._release_lease(key)
+
+            waited = True
+            left = wait_until - time.monotonic() if wait_until is not None else self.poll_interval
+            if left <= 0:
+                raise WaitTimeout(f"Timed out waiting for another worker's call to {key}")
+            time.sleep(min(self.poll_interval, left))
+            result = peek() if peek is not None else None
+            if result is not None:
+                with self._lock:
+                    self.counters["cross_worker_coalesced"] += 1
+                return result
+
+    def _acquire_lease(self, key):
+        now = time.time()
+        conn = self._db()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM singleflight_leases WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO singleflight_leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, os.getpid(), now + self.lease_ttl)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+
+    def _release_lease(self, key):
+        self._db().execute(
+            "DELETE FROM singleflight_leases WHERE key = ? AND owner = ?", (key, os.getpid())
+        )
+
+    def stats(self):
+        """
+        Get coalescing counters
+
+        Returns:
+            dict: Leader and coalesced call counts
+        """
+        with self._lock:
+            stats = dict(self.counters)
+            stats["in_flight"] = len(self._calls)
+        stats["cross_worker"] = bool(self.lease_db)
+        return stats
+
+_default_singleflight = None
+_default_singleflight_lock = threading.Lock()
+
+def get_default_singleflight():
+    """
+    Get the process-wide coalescer shared by every client, configured from the environment
+
+    Returns:
+        SingleFlight: Shared coalescer, or None when DATAFORSEO_SINGLEFLIGHT_ENABLED is false
+    """
+    global _default_singleflight
+    if not SINGLEFLIGHT_ENABLED:
+        return None
+    with _default_singleflight_lock:
+        if _default_singleflight is None:
+            _default_singleflight = SingleFlight(lease_db=DEFAULT_LEASE_DB)
+    return _default_singleflight
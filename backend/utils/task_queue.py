@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+DataForSEO Standard Task Queue
+This module runs tasks through DataForSEO's standard (non-live) queue:
+task_post to submit, one shared tasks_ready poll per endpoint family, and
+task_get to collect each finished task. Queued tasks are cheaper than live
+calls and do not hold a request thread while DataForSEO works on them.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from utils.batcher import chunked
+
+logger = logging.getLogger(__name__)
+
+# Live endpoint -> (standard endpoint family, task_get result type)
+QUEUED_ENDPOINTS = {
+    "serp/google/organic/live/regular": ("serp/google/organic", "regular"),
+    "serp/google/organic/live/advanced": ("serp/google/organic", "advanced"),
+    "keywords_data/google/search_volume/live": ("keywords_data/google/search_volume", None),
+}
+MAX_TASKS_PER_POST = 100
+DEFAULT_POLL_INTERVAL = float(os.environ.get('DATAFORSEO_TASK_POLL_INTERVAL', 5))
+DEFAULT_MAX_WAIT = float(os.environ.get('DATAFORSEO_TASK_MAX_WAIT', 3600))
+
+# DataForSEO status code for a successfully created task
+TASK_CREATED = 20100
+
+def supports_queue(endpoint):
+    """Whether a live endpoint has a standard task_post counterpart."""
+    return endpoint in QUEUED_ENDPOINTS
+
+class _Pending:
+    """A posted task waiting to show up in tasks_ready."""
+    __slots__ = ('future', 'endpoint', 'task', 'family', 'result_type', 'posted_at')
+
+    def __init__(self, future, endpoint, task, family, result_type):
+        self.future = future
+        self.endpoint = endpoint
+        self.task = task
+        self.family = family
+        self.result_type = result_type
+        self.posted_at = time.time()
+
+class TaskQueue:
+    """
+    Submit tasks through task_post and resolve futures as they finish.
+
+    A single background thread polls ``tasks_ready`` once per endpoint family
+    for all pending tasks, fetches the ready ones with ``task_get`` and stops
+    when nothing is pending. Finished results are written to the client's
+    response cache under the live endpoint, so later live calls for the same
+    task are answered locally.
+    """
+    def __init__(self, client, poll_interval=None, max_wait=None):
+        """
+        Initialize the queue
+
+        Args:
+            client (DataForSEOClient): Client whose transport and cache are used
+            poll_interval (float): Seconds between tasks_ready polls
+            max_wait (float): Seconds after which a pending task is failed
+        """
+        self.client = client
+        self.poll_interval = poll_interval if poll_interval is not None else DEFAULT_POLL_INTERVAL
+        self.max_wait = max_wait if max_wait is not None else DEFAULT_MAX_WAIT
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._poller = None
+        self.counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "polls": 0
+        }
+
+    def submit(self, endpoint, tasks):
+        """
+        Queue tasks for a live endpoint through its standard counterpart
+
+        Args:
+            endpoint (str): Live endpoint the tasks would otherwise be sent to
+            tasks (list): Task objects
+
+        Returns:
+            list: One Future per task resolving to a response shaped like the
+                live endpoint's single-task response
+        """
+        if not supports_queue(endpoint):
+            raise ValueError(f"No standard task queue for endpoint {endpoint}")
+        family, result_type = QUEUED_ENDPOINTS[endpoint]
+        futures = [Future() for _ in tasks]
+
+        to_post = []
+        for future, task in zip(futures, tasks):
+            cached = self.client.cache.get(endpoint, [task]) if self.client.cache is not None else None
+            if cached is not None:
+                future.set_result(cached)
+            else:
+                to_post.append((future, task))
+
+        for chunk in chunked(to_post, MAX_TASKS_PER_POST):
+            response = self.client._post(f"{family}/task_post", [task for _, task in chunk])
+            posted = response.get('tasks') or []
+            for i, (future, task) in enumerate(chunk):
+                posted_task = posted[i] if i < len(posted) else {}
+                if posted_task.get('status_code') != TASK_CREATED:
+                    future.set_result(dict(
+                        response,
+                        status_code=posted_task.get('status_code', response.get('status_code', 500)),
+                        status_message=posted_task.get('status_message', response.get('status_message')),
+                        tasks=[posted_task] if posted_task else []
+                    ))
+                    with self._lock:
+                        self.counters["failed"] += 1
+                    continue
+                with self._lock:
+                    self._pending[posted_task['id']] = _Pending(future, endpoint, task, family, result_type)
+                    self.counters["submitted"] += 1
+
+        self._ensure_poller()
+        return futures
+
+    def _ensure_poller(self):
+        with self._lock:
+            if self._pending and (self._poller is None or not self._poller.is_alive()):
+                self._poller = threading.Thread(target=self._poll_loop, name="dataforseo-task-poller", daemon=True)
+                self._poller.start()
+
+    def _poll_loop(self):
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                if not self._pending:
+                    self._poller = None
+                    return
+                families = {pending.family for pending in self._pending.values()}
+            for family in families:
+                try:
+                    self._poll_family(family)
+                except Exception:
+                    logger.exception("Error polling %s/tasks_ready", family)
+            self._expire()
+
+    def _poll_family(self, family):
+        """One tasks_ready call covers every pending task of a family."""
+        response = self.client._get(f"{family}/tasks_ready")
+        with self._lock:
+            self.counters["polls"] += 1
+        ready_ids = [
+            ready.get('id')
+            for task in response.get('tasks') or []
+            for ready in task.get('result') or []
+        ]
+        for task_id in ready_ids:
+            with self._lock:
+                pending = self._pending.pop(task_id, None)
+            if pending is None:
+                continue  # posted by another worker
+            self._collect(task_id, pending)
+
+    def _collect(self, task_id, pending):
+        """Fetch a ready task and resolve its future, with the error if the fetch fails."""
+        if pending.result_type:
+            path = f"{pending.family}/task_get/{pending.result_type}/{task_id}"
+        else:
+            path = f"{pending.family}/task_get/{task_id}"
+        try:
+            response = self.client._get(path)
+        except Exception as e:
+            logger.exception("Error collecting task %s", task_id)
+            with self._lock:
+                self.counters["failed"] += 1
+            pending.future.set_exception(e)
+            return
+        try:
+            self.client._remember(pending.endpoint, [pending.task], response)
+        except Exception:
+            logger.exception("Error caching task %s", task_id)
+        with self._lock:
+            self.counters["completed"] += 1
+        pending.future.set_result(response)
+
+    def _expire(self):
+        cutoff = time.time() - self.max_wait
+        with self._lock:
+            expired = [task_id for task_id, p in self._pending.items() if p.posted_at < cutoff]
+            expired = [(task_id, self._pending.pop(task_id)) for task_id in expired]
+            self.counters["failed"] += len(expired)
+        for task_id, pending in expired:
+            pending.future.set_result({
+                "status_code": 504,
+                "status_message": f"Task {task_id} was not ready after {int(self.max_wait)}s",
+                "tasks": []
+            })
+
+    def stats(self):
+        """
+        Get queue counters
+
+        Returns:
+            dict: Submitted, completed, failed and pending task counts
+        """
+        with self._lock:
+            stats = dict(self.counters)
+            stats["pending"] = len(self._pending)
+        return stats
@@ -41,6 +41,12 @@ export const keywordResearchApi = {
   getLongTailKeywords: (keyword: string, location: string = 'United States', language: string = 'English', limit: number = 50) => 
     apiClient.post('/keyword-research/long-tail', { keyword, location, language, limit }),
   
+  exploreKeywords: (keyword: string, location: string = 'United States', language: string = 'English', limit: number = 1000) => 
+    apiClient.post('/keyword-research/explore', { keyword, location, language, limit }),
+
+  scoreOpportunities: (params: { items?: object[]; keywords?: string[]; keyword?: string; weights?: Record<string, number>; filters?: [string, string, number | string][]; sort_by?: string; order?: 'asc' | 'desc'; offset?: number; limit?: number; location?: string; language?: string }) =>
+    apiClient.post('/keyword-research/opportunities', params),
+
   getAISuggestions: (keyword: string, industry: string = '', location: string = 'United States', language: string = 'English', limit: number = 15) => 
     apiClient.post('/keyword-research/ai-suggestions', { keyword, industry, location, language, limit }),
 };